@@ -0,0 +1,128 @@
+"""
+Supertonic Alignment Benchmark
+DTW 정렬과 Stable-TS Forced Alignment의 속도 / 라인 경계 오차 비교
+
+정답 경계를 알 수 있도록 "녹음"은 참조와 다른 음성·속도로 합성하고
+라인 사이에 임의 길이의 묵음을 넣어 만듦.
+
+사용법:
+    python benchmarks/bench_alignment.py --script 대본.txt --lang ko
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.utils import read_text_file
+from core.tts import get_tts_engine
+from core.subtitle import get_subtitle_generator
+from core.workspace import JobWorkspace
+
+
+SAMPLE_LINES = [
+    "오늘 아침에 공원을 산책했는데, 새소리와 바람 소리가 너무 기분 좋았어요.",
+    "점심으로는 친구와 함께 새로 생긴 식당에 갔습니다.",
+    "오후에는 도서관에서 책을 읽으며 조용한 시간을 보냈어요.",
+    "저녁이 되자 하늘이 붉게 물들며 해가 산 너머로 졌습니다.",
+    "내일은 조금 더 일찍 일어나서 운동을 해볼 생각이에요.",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="DTW vs Stable-TS alignment benchmark")
+    parser.add_argument("--script", type=str, default=None, help="대본 파일 (TXT/DOCX, 한 줄 = 자막 1개)")
+    parser.add_argument("--repeat", type=int, default=20, help="샘플 대본 반복 횟수 (--script 미지정 시)")
+    parser.add_argument("--lang", type=str, default="ko", help="언어 코드")
+    parser.add_argument("--rec-voice", type=str, default="M1", help="녹음 역할 음성")
+    parser.add_argument("--ref-voice", type=str, default="F1", help="DTW 참조 음성")
+    parser.add_argument("--rec-speed", type=float, default=0.9, help="녹음 역할 음성 속도")
+    parser.add_argument("--skip-stable-ts", action="store_true", help="Stable-TS 비교 생략")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def synthesize_recording(lines, lang, voice, speed, rng):
+    """라인별 합성 + 임의 묵음(0.1~1.2초) → (오디오, 정답 경계)"""
+    engine = get_tts_engine()
+    engine.init_model()
+    style = engine.load_voice_style(voice)
+
+    audio = []
+    bounds = []
+    t = 0.0
+    for i, line in enumerate(lines):
+        wav, duration = engine._infer([line], [lang], style, 5, speed)
+        w = wav[0, :int(engine.sample_rate * duration[0].item())]
+        audio.append(w)
+        bounds.append((t, t + len(w) / engine.sample_rate))
+        t += len(w) / engine.sample_rate
+        if i < len(lines) - 1:
+            gap = np.zeros(int(rng.uniform(0.1, 1.2) * engine.sample_rate), dtype=np.float32)
+            audio.append(gap)
+            t += len(gap) / engine.sample_rate
+
+    return np.concatenate(audio), bounds
+
+
+def boundary_errors(timings, bounds):
+    starts = np.array([t['start'] for t in timings])
+    truth = np.array([b[0] for b in bounds])
+    return np.abs(starts - truth)
+
+
+def report(name, elapsed, errors, audio_duration):
+    print(f"[{name}] {elapsed:.2f}s (실시간 대비 x{audio_duration / elapsed:.1f}) | "
+          f"시작 경계 오차 median {np.median(errors) * 1000:.0f}ms, "
+          f"p95 {np.percentile(errors, 95) * 1000:.0f}ms, max {errors.max() * 1000:.0f}ms")
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    if args.script:
+        text = read_text_file(args.script)
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+    else:
+        lines = SAMPLE_LINES * args.repeat
+
+    print(f"자막 {len(lines)}줄, 녹음 합성 중... (음성 {args.rec_voice}, 속도 {args.rec_speed})")
+    audio, bounds = synthesize_recording(lines, args.lang, args.rec_voice, args.rec_speed, rng)
+
+    engine = get_tts_engine()
+    audio_duration = len(audio) / engine.sample_rate
+    print(f"녹음 길이: {audio_duration:.1f}s")
+
+    generator = get_subtitle_generator()
+    subtitle_text = '\n'.join(lines)
+
+    with JobWorkspace('benchmark') as workspace:
+        audio_path = workspace.file("recording.wav")
+        sf.write(audio_path, audio, engine.sample_rate)
+
+        # 캐시를 피하기 위해 실행마다 다른 해시 사용
+        run_id = f"bench-{time.time()}"
+
+        t0 = time.time()
+        timings = generator.generate_timings_from_file(
+            audio_path, subtitle_text, args.lang,
+            audio_hash=run_id, method='dtw', voice_name=args.ref_voice
+        )
+        report("DTW", time.time() - t0, boundary_errors(timings, bounds), audio_duration)
+
+        if not args.skip_stable_ts:
+            generator.init_model()
+            t0 = time.time()
+            timings = generator.generate_timings_from_file(
+                audio_path, subtitle_text, args.lang, audio_hash=run_id, method='stable_ts'
+            )
+            report("Stable-TS", time.time() - t0, boundary_errors(timings, bounds), audio_duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Supertonic Render Benchmark
+원시 프레임 파이프 합성(단일/구간 병렬)과 MoviePy 합성의 인코딩 속도(fps) 비교
+
+TTS 없이 무음 오디오와 임의 자막 타이밍으로 create_video의 인코딩 단계만 측정함.
+
+사용법:
+    python benchmarks/bench_render.py --duration 60 --background color
+    python benchmarks/bench_render.py --background video --threads 4
+    python benchmarks/bench_render.py --duration 600 --modes pipe,segmented --segments 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.utils import get_font_path
+from core.video import get_video_generator
+from core.workspace import JobWorkspace
+from core.ffmpeg import run_ffmpeg
+from core.render import ShapeLayer
+
+
+FPS = 30
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="pipe vs MoviePy render benchmark")
+    parser.add_argument("--duration", type=float, default=60.0, help="영상 길이 (초)")
+    parser.add_argument("--resolution", type=str, default="1920x1080")
+    parser.add_argument("--background", choices=["color", "image", "video"], default="color")
+    parser.add_argument("--threads", type=int, default=0, help="인코더 스레드 수 (0 = 자동)")
+    parser.add_argument("--segments", type=int, default=0, help="segmented 모드 구간 수 (0 = 자동)")
+    parser.add_argument("--modes", type=str, default="pipe,moviepy",
+                        help="비교할 모드 (pipe, segmented, moviepy 쉼표 구분)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def make_timings(duration, rng):
+    """1.5~4초 길이 자막을 0.1~0.5초 간격으로 배치"""
+    timings = []
+    t = 0.0
+    i = 0
+    while t < duration:
+        length = rng.uniform(1.5, 4.0)
+        end = min(t + length, duration)
+        timings.append({'text': f"벤치마크 자막 {i + 1}번 줄입니다", 'start': t, 'end': end})
+        t = end + rng.uniform(0.1, 0.5)
+        i += 1
+    return timings
+
+
+def make_background(kind, workspace, width, height, duration):
+    """벤치마크용 배경 파일 생성 → (경로, 타입)"""
+    if kind == "color":
+        return None, None
+
+    if kind == "image":
+        path = workspace.file("background.png")
+        run_ffmpeg(['-f', 'lavfi', '-i', f"testsrc2=size={width}x{height}",
+                    '-frames:v', '1', path])
+        return path, 'image'
+
+    path = workspace.file("background.mp4")
+    run_ffmpeg(['-f', 'lavfi', '-i', f"testsrc2=size={width}x{height}:rate={FPS}",
+                '-t', f"{min(duration, 10.0):.1f}", '-c:v', 'libx264', '-preset', 'ultrafast',
+                '-pix_fmt', 'yuv420p', path])
+    return path, 'video'
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    width, height = map(int, args.resolution.split('x'))
+    n_frames = int(np.ceil(args.duration * FPS))
+
+    generator = get_video_generator()
+    timings = make_timings(args.duration, rng)
+    overlay = generator._build_subtitle_overlay(
+        timings, get_font_path(70), '하단-중앙', width, height, 0, 0
+    )
+    shape = ShapeLayer(generator._calculate_shape_rect(width, height, 10, 70, 90, 95), (0, 0, 0), 0.5)
+
+    print(f"{args.resolution}, {args.duration:.0f}초 ({n_frames} 프레임), "
+          f"자막 {len(timings)}개, 배경 {args.background}, 스레드 {args.threads or '자동'}")
+
+    with JobWorkspace('benchmark') as workspace:
+        audio_path = workspace.file("silence.wav")
+        sf.write(audio_path, np.zeros(int(args.duration * 44100), dtype=np.float32), 44100)
+        background_path, background_type = make_background(
+            args.background, workspace, width, height, args.duration
+        )
+
+        for mode in [m.strip() for m in args.modes.split(',') if m.strip()]:
+            filepath = workspace.file(f"out_{mode}.mp4")
+            t0 = time.time()
+
+            if mode in ('pipe', 'segmented'):
+                if mode == 'pipe':
+                    segments = 1
+                else:
+                    segments = args.segments or max(2, (os.cpu_count() or 2) // 2)
+                generator._encode_pipe(
+                    background_path, background_type, width, height,
+                    shape, overlay, args.duration, audio_path,
+                    filepath, workspace, fps=FPS, threads=args.threads, segments=segments
+                )
+            elif mode == 'moviepy':
+                generator._encode_moviepy(
+                    background_path, background_type, width, height,
+                    shape, overlay, args.duration, audio_path,
+                    filepath, workspace, threads=args.threads
+                )
+            else:
+                print(f"[{mode}] 알 수 없는 모드, 건너뜀")
+                continue
+
+            elapsed = time.time() - t0
+            print(f"[{mode}] {elapsed:.2f}s | {n_frames / elapsed:.1f} fps "
+                  f"(실시간 대비 x{args.duration / elapsed:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,10 @@ __all__ = [
     'ensure_korean_font',
     'get_tts_engine',
     'get_subtitle_generator',
-    'get_video_generator'
+    'get_video_generator',
+    'JobWorkspace',
+    'JobScheduler',
+    'get_job_scheduler'
 ]
 
 def __getattr__(name):
@@ -32,6 +35,9 @@ def __getattr__(name):
     elif name == 'get_video_generator':
         from .video import get_video_generator
         return get_video_generator
+    elif name in ('JobWorkspace', 'JobScheduler', 'get_job_scheduler'):
+        from . import workspace
+        return getattr(workspace, name)
     elif name in ('read_text_file', 'get_voice_list', 'ensure_korean_font'):
         from . import utils
         return getattr(utils, name)
@@ -0,0 +1,85 @@
+"""
+Supertonic ASS Subtitles
+자막 타이밍 → ASS(libass) 자막 파일 (PIL 자막 래스터와 같은 폰트/크기/외곽선/위치)
+"""
+import os
+
+
+def ass_timestamp(seconds: float) -> str:
+    """초 → ASS 시간 (H:MM:SS.cc)"""
+    cs = max(0, int(round(seconds * 100)))
+    h, cs = divmod(cs, 360000)
+    m, cs = divmod(cs, 6000)
+    s, cs = divmod(cs, 100)
+    return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
+
+
+def escape_ass_text(text: str) -> str:
+    """ASS 대사 이스케이프 (중괄호는 태그로 해석되므로 전각 괄호로, 역슬래시 뒤에는 단어 결합자 삽입)"""
+    text = text.replace('\\', '\\⁠').replace('{', '｛').replace('}', '｝')
+    return text.replace('\r', '').replace('\n', '\\N')
+
+
+def font_info(pil_font) -> tuple:
+    """
+    PIL 폰트 → (폰트 폴더, 패밀리 이름, 굵게 여부, ASS 폰트 크기)
+
+    libass의 Fontsize는 어센트+디센트 높이 기준이라 PIL의 em 크기와 다르므로
+    같은 크기로 보이도록 PIL 메트릭으로 환산함
+    """
+    path = getattr(pil_font, 'path', None)
+    if not path or not isinstance(path, str):
+        return None, 'Sans', True, getattr(pil_font, 'size', 70)
+
+    try:
+        family, style = pil_font.getname()
+    except Exception:
+        family, style = os.path.splitext(os.path.basename(path))[0], ''
+
+    ascent, descent = pil_font.getmetrics()
+    bold = 'bold' in (style or '').lower() or 'bold' in path.lower()
+    return os.path.dirname(path), family, bold, ascent + descent
+
+
+def write_ass_file(path: str, events: list, video_width: int, video_height: int,
+                   pil_font, outline_width: int = 3) -> str:
+    """
+    자막 이벤트를 ASS 파일로 저장
+
+    Args:
+        events: [{'start', 'end', 'text', 'x', 'y'}] - (x, y)는 줄 상자 상단 중앙 (\\an8)
+
+    Returns:
+        libass fontsdir로 넘길 폰트 폴더 (시스템 폰트 사용 시 None)
+    """
+    fonts_dir, family, bold, size = font_info(pil_font)
+
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {video_width}",
+        f"PlayResY: {video_height}",
+        "WrapStyle: 2",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, "
+        "BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, "
+        "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        f"Style: Default,{family},{size},&H00FFFFFF,&H00FFFFFF,&H00000000,&H00000000,"
+        f"{-1 if bold else 0},0,0,0,100,100,0,0,1,{outline_width},0,8,0,0,0,1",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+
+    for event in events:
+        lines.append(
+            f"Dialogue: 0,{ass_timestamp(event['start'])},{ass_timestamp(event['end'])},"
+            f"Default,,0,0,0,,{{\\pos({event['x']},{event['y']})}}{escape_ass_text(event['text'])}"
+        )
+
+    with open(path, 'w', encoding='utf-8-sig') as f:
+        f.write('\n'.join(lines) + '\n')
+
+    return fonts_dir
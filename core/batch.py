@@ -0,0 +1,320 @@
+"""
+Supertonic Batch Audiobook
+TXT/DOCX 문서 폴더를 일괄 음성 합성 (청크별 매니페스트로 중단/수정 후 재실행 시 이어서 처리)
+
+문서마다 <출력 폴더>/<입력 폴더 기준 상대 경로>/ 아래에 (a/ch1.txt, b/ch1.txt는 서로 다른 폴더)
+    chunks/<해시>.wav   청크별 음성 (텍스트 + 음성 설정 해시로 이름 지정)
+    manifest.json       청크 목록 (인덱스, 해시, 텍스트, 시작/길이)
+    <문서 이름>.wav      청크를 0.3초 간격으로 이은 최종 음성
+을 만듦. 다시 실행하면 해시가 같은 청크는 합성하지 않고 재사용함.
+
+사용법:
+    python -m core.batch books/ --voice F1 --lang ko
+    python -m core.batch books/ chapter1.docx --out outputs/audiobooks --batch-size 8 --workers 2
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import soundfile as sf
+
+from .utils import OUTPUT_DIR, read_text_file, get_max_length
+from .tts import chunk_text
+
+
+TEXT_EXTENSIONS = ('.txt', '.docx')
+CHUNK_GAP_SEC = 0.3
+
+
+def find_documents(inputs: list) -> list:
+    """
+    입력 경로(폴더/파일) → [(문서 경로, 출력 이름)] (폴더는 하위 폴더까지)
+
+    출력 이름은 입력 폴더 기준 상대 경로에서 확장자를 뺀 것 (파일 입력은 파일 이름).
+    이름이 겹치면 (ch1.txt/ch1.docx, 여러 입력의 같은 상대 경로) 확장자/번호를 붙여 구분
+    """
+    documents = {}
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(TEXT_EXTENSIONS) and not name.startswith('~$'):
+                        source = os.path.normpath(os.path.join(root, name))
+                        documents.setdefault(source, os.path.relpath(source, path))
+        elif path.lower().endswith(TEXT_EXTENSIONS):
+            documents.setdefault(os.path.normpath(path), os.path.basename(path))
+
+    result = []
+    used = set()
+    for source in sorted(documents):
+        rel = documents[source]
+        stem, ext = os.path.splitext(rel)
+        name = stem
+        if name.lower() in used:
+            name = f"{stem}_{ext.lstrip('.')}"
+        n = 2
+        while name.lower() in used:
+            name = f"{stem}_{n}"
+            n += 1
+        used.add(name.lower())
+        result.append((source, name))
+    return result
+
+
+def chunk_hash(text: str, voice_name: str, language: str, speed: float, quality: int) -> str:
+    """청크 해시 (텍스트 + 음성 설정이 같으면 같은 음성)"""
+    raw = json.dumps([text, voice_name, language, float(speed), int(quality)], ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def write_wav_atomic(path: str, audio: np.ndarray, sample_rate: int):
+    """WAV 저장 (임시 파일 → 교체, 중단되어도 반쯤 쓴 파일이 남지 않음)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    sf.write(tmp_path, audio, sample_rate, format='WAV')
+    os.replace(tmp_path, path)
+
+
+# ===== 워커 =====
+
+_engine = None
+
+
+def _get_engine():
+    """프로세스당 TTS 엔진 1개 (모델 1회 로드)"""
+    global _engine
+    if _engine is None:
+        from .tts import get_tts_engine
+        _engine = get_tts_engine()
+        _engine.init_model()
+    return _engine
+
+
+def synthesize_batch(texts: list, paths: list, language: str, voice_name: str,
+                     speed: float, quality: int, batch_size: int) -> list:
+    """청크들을 배치 합성해 각 경로에 저장 → [(경로, 길이)]"""
+    engine = _get_engine()
+    results = []
+    for i, audio in engine.synthesize_chunks(texts, language, voice_name, speed, quality, batch_size):
+        write_wav_atomic(paths[i], audio, engine.sample_rate)
+        results.append((paths[i], len(audio) / engine.sample_rate))
+    return results
+
+
+# ===== 문서 처리 =====
+
+class DocumentJob:
+    """문서 1개의 청크 분할/재사용 판단/최종 조립"""
+
+    def __init__(self, source: str, out_root: str, voice_name: str, language: str,
+                 speed: float, quality: int, name: str = None):
+        self.source = source
+        # 출력 이름 (find_documents의 상대 경로, 문서마다 고유)
+        self.name = name or os.path.splitext(os.path.basename(source))[0]
+        self.out_dir = os.path.join(out_root, self.name)
+        self.chunk_dir = os.path.join(self.out_dir, 'chunks')
+        self.manifest_path = os.path.join(self.out_dir, 'manifest.json')
+        self.output_path = os.path.join(self.out_dir, f"{os.path.basename(self.name)}.wav")
+        self.settings = {'voice_name': voice_name, 'language': language,
+                         'speed': float(speed), 'quality': int(quality)}
+        self.error = None
+
+        text = read_text_file(source)
+        if text.startswith(("파일 읽기 오류", "지원하지 않는 파일 형식")):
+            self.error = text
+            text = ""
+
+        self.chunks = [c for c in chunk_text(text, max_len=get_max_length(language)) if c.strip()]
+        self.hashes = [chunk_hash(c, voice_name, language, speed, quality) for c in self.chunks]
+        self.paths = [os.path.join(self.chunk_dir, f"{h}.wav") for h in self.hashes]
+
+    def missing(self) -> list:
+        """합성이 필요한 청크 인덱스 (같은 해시가 여러 번 나오면 한 번만)"""
+        seen = set()
+        result = []
+        for i, path in enumerate(self.paths):
+            if path in seen or os.path.exists(path):
+                continue
+            seen.add(path)
+            result.append(i)
+        return result
+
+    def is_current(self) -> bool:
+        """매니페스트/최종 음성이 현재 청크 해시와 일치하면 True (할 일 없음)"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return (os.path.exists(self.output_path)
+                and [c['hash'] for c in manifest.get('chunks', [])] == self.hashes
+                and all(os.path.exists(p) for p in self.paths))
+
+    def assemble(self) -> float:
+        """청크 음성을 간격을 두고 이어 최종 WAV + 매니페스트 저장 → 전체 길이 (초)"""
+        parts = []
+        entries = []
+        t = 0.0
+        sample_rate = None
+        for i, (text, h, path) in enumerate(zip(self.chunks, self.hashes, self.paths)):
+            audio, sample_rate = sf.read(path, dtype='float32')
+            if i > 0:
+                parts.append(np.zeros(int(CHUNK_GAP_SEC * sample_rate), dtype=np.float32))
+                t += CHUNK_GAP_SEC
+            duration = len(audio) / sample_rate
+            entries.append({'index': i, 'hash': h, 'text': text, 'file': os.path.basename(path),
+                            'start': round(t, 4), 'duration': round(duration, 4)})
+            parts.append(audio)
+            t += duration
+
+        if parts:
+            write_wav_atomic(self.output_path, np.concatenate(parts), sample_rate)
+
+        manifest = {
+            'source': os.path.abspath(self.source),
+            'settings': self.settings,
+            'sample_rate': sample_rate,
+            'duration': round(t, 4),
+            'output': os.path.basename(self.output_path),
+            'chunks': entries,
+            'updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+        # 수정으로 더 이상 쓰지 않는 청크 정리
+        used = {os.path.basename(p) for p in self.paths}
+        for name in os.listdir(self.chunk_dir):
+            if name.endswith('.wav') and name not in used:
+                try:
+                    os.remove(os.path.join(self.chunk_dir, name))
+                except OSError:
+                    pass
+
+        return t
+
+
+def run_batch(inputs: list, out_root: str, voice_name: str, language: str,
+              speed: float = 1.0, quality: int = 5, batch_size: int = 4, workers: int = 1):
+    """
+    문서들을 합성 - 바뀐 청크만 batch_size개씩 묶어 workers개 프로세스로 분산
+
+    합성 중 오류가 난 문서는 실패로 표시하고 나머지 문서는 계속 처리함
+
+    Returns:
+        실패한 DocumentJob 목록 (읽기 오류 포함)
+    """
+    documents = find_documents(inputs)
+    if not documents:
+        print("처리할 TXT/DOCX 문서가 없습니다.")
+        return []
+
+    jobs = [DocumentJob(path, out_root, voice_name, language, speed, quality, name)
+            for path, name in documents]
+
+    # 작업 단위: (문서, 청크 인덱스 묶음)
+    tasks = []
+    for job in jobs:
+        if job.error:
+            print(f"[{job.name}] 건너뜀: {job.error}")
+            continue
+        if job.is_current():
+            print(f"[{job.name}] 변경 없음 ({len(job.chunks)}개 청크)")
+            continue
+        os.makedirs(job.chunk_dir, exist_ok=True)
+        missing = job.missing()
+        print(f"[{job.name}] 청크 {len(job.chunks)}개 중 {len(missing)}개 합성 필요")
+        for start in range(0, len(missing), batch_size * 4):
+            tasks.append((job, missing[start:start + batch_size * 4]))
+
+    pending = {job: 0 for job in jobs}
+    for job, indices in tasks:
+        pending[job] += 1
+
+    total = sum(len(indices) for _, indices in tasks)
+    done = 0
+
+    def finish(job, results):
+        nonlocal done
+        done += len(results)
+        pending[job] -= 1
+        print(f"[{job.name}] 청크 {len(results)}개 완료 (전체 {done}/{total})", flush=True)
+
+    def fail(job, error):
+        pending[job] -= 1
+        if job.error is None:
+            job.error = f"합성 실패: {error}"
+        print(f"[{job.name}] {job.error}", flush=True)
+
+    def args_for(job, indices):
+        return ([job.chunks[i] for i in indices], [job.paths[i] for i in indices],
+                language, voice_name, speed, quality, batch_size)
+
+    if workers <= 1:
+        for job, indices in tasks:
+            try:
+                results = synthesize_batch(*args_for(job, indices))
+            except Exception as e:
+                fail(job, e)
+                continue
+            finish(job, results)
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(synthesize_batch, *args_for(job, indices)): (job, indices)
+                       for job, indices in tasks}
+            for future in as_completed(futures):
+                job, indices = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    # 워커가 죽으면 (BrokenProcessPool) 남은 작업도 모두 여기서 실패 처리됨
+                    fail(job, e)
+                    continue
+                finish(job, results)
+
+    for job in jobs:
+        if job.error or job.is_current() or pending[job] > 0 or not job.chunks:
+            continue
+        try:
+            duration = job.assemble()
+        except Exception as e:
+            job.error = f"조립 실패: {e}"
+            print(f"[{job.name}] {job.error}")
+            continue
+        print(f"[{job.name}] 완료: {job.output_path} ({duration:.1f}초)")
+
+    failed = [job for job in jobs if job.error]
+    if failed:
+        print(f"실패한 문서 {len(failed)}개:")
+        for job in failed:
+            print(f"  {job.source}: {job.error}")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Supertonic 오디오북 일괄 합성")
+    parser.add_argument("inputs", nargs='+', help="TXT/DOCX 파일 또는 폴더")
+    parser.add_argument("--out", type=str, default=os.path.join(OUTPUT_DIR, 'audiobooks'),
+                        help="출력 폴더")
+    parser.add_argument("--voice", type=str, default="F1", help="음성 (예: F1, M2)")
+    parser.add_argument("--lang", type=str, default="ko", help="언어 코드 (ko, en, es, pt, fr)")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--quality", type=int, default=5, help="디노이징 단계 수")
+    parser.add_argument("--batch-size", type=int, default=4, help="한 번에 추론할 청크 수")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="합성 프로세스 수 (프로세스마다 모델 로드, ONNX가 코어를 나눠 씀)")
+    args = parser.parse_args(argv)
+
+    failed = run_batch(args.inputs, args.out, args.voice, args.lang, args.speed, args.quality,
+                       max(1, args.batch_size), max(1, args.workers))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
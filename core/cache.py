@@ -0,0 +1,154 @@
+"""
+Supertonic Disk Cache
+앱 데이터 폴더 아래 영구 결과 캐시 (LRU 정리)
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+
+from .utils import APP_DATA_DIR
+
+
+CACHE_DIR = os.path.join(APP_DATA_DIR, 'cache')
+
+
+def make_key(*parts) -> str:
+    """캐시 키 생성 (JSON 직렬화 가능한 값들의 SHA-1)"""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """텍스트 SHA-1 해시"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """
+    파일 기반 영구 캐시
+
+    항목마다 파일 하나로 저장하고, 읽을 때 수정 시간을 갱신하여
+    max_entries / max_bytes 초과 시 가장 오래 사용하지 않은 항목부터 삭제.
+    min_age초 안에 사용한 항목은 제한을 넘어도 삭제하지 않음 (다른 작업이 쓰는 중일 수 있음)
+    """
+
+    def __init__(self, name: str, max_entries: int = 500, max_bytes: int = 200 * 1024 * 1024,
+                 min_age: float = 0):
+        self.name = name
+        self.dir = os.path.join(CACHE_DIR, name)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+        self._lock = threading.Lock()
+        os.makedirs(self.dir, exist_ok=True)
+
+    def path(self, key: str, suffix: str = '.json') -> str:
+        """캐시 항목 파일 경로"""
+        return os.path.join(self.dir, key + suffix)
+
+    def touch(self, path: str):
+        """사용 시간 갱신 (LRU)"""
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def get_json(self, key: str):
+        """JSON 항목 읽기 (없으면 None)"""
+        path = self.path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self.touch(path)
+        return value
+
+    def set_json(self, key: str, value, evict: bool = True):
+        """JSON 항목 저장 (원자적 교체, evict=False면 용량 정리 생략)"""
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        if evict:
+            self.evict()
+
+    def get_file(self, key: str, suffix: str):
+        """파일 항목 경로 (없으면 None)"""
+        path = self.path(key, suffix)
+        if not os.path.exists(path):
+            return None
+        self.touch(path)
+        return path
+
+    def tmp_path(self, key: str, suffix: str) -> str:
+        """파일 항목 작성용 임시 경로 (정리 대상에서 제외됨)"""
+        return f"{self.path(key, suffix)}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def set_file(self, key: str, suffix: str, tmp_path: str, evict: bool = True) -> str:
+        """
+        임시 파일을 항목으로 등록 (원자적 교체) 후 경로 반환
+
+        evict()는 폴더 전체를 훑으므로 여러 항목을 연달아 저장할 때는 evict=False로 저장하고
+        마지막에 evict()를 한 번 호출
+        """
+        path = self.path(key, suffix)
+        os.replace(tmp_path, path)
+        if evict:
+            self.evict(keep=path)
+        return path
+
+    def pin(self, path: str, dest: str) -> str:
+        """
+        항목을 작업 폴더에 하드 링크해 그 경로 반환 (작업 중 정리로 항목이 삭제되어도 파일 유지)
+
+        하드 링크를 만들 수 없으면 (다른 드라이브 등) 사용 시간만 갱신하고 원래 경로 반환
+        """
+        try:
+            os.link(path, dest)
+            return dest
+        except OSError:
+            self.touch(path)
+            return path
+
+    def evict(self, keep: str = None):
+        """용량/개수 제한 초과 시 오래된 항목 삭제 (keep 경로와 min_age 안에 사용한 항목은 제외)"""
+        recent = time.time() - self.min_age
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.dir):
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(self.dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+            entries.sort()
+            total_bytes = sum(size for _, size, _ in entries)
+            count = len(entries)
+
+            for mtime, size, path in entries:
+                if count <= self.max_entries and total_bytes <= self.max_bytes:
+                    break
+                if path == keep or mtime > recent:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                count -= 1
+                total_bytes -= size
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        for name in os.listdir(self.dir):
+            try:
+                os.remove(os.path.join(self.dir, name))
+            except OSError:
+                pass
@@ -0,0 +1,303 @@
+"""
+Supertonic DTW Aligner
+로컬 TTS 참조 음성 + 스펙트럼 특징 DTW 기반 대본 정렬 (Whisper 불필요, CPU 전용)
+"""
+import numpy as np
+import soundfile as sf
+
+from .tts import Style, get_tts_engine
+
+
+# 특징 추출 설정
+HOP_SEC = 0.04          # 정밀 단계 프레임 간격
+COARSE_FACTOR = 10      # 개략 단계는 프레임 10개 평균 (0.4초)
+COARSE_BAND = 0.15      # 개략 단계 대각선 밴드 폭 (전체 길이 비율)
+COARSE_MIN_BAND_SEC = 30.0
+FINE_BAND_SEC = 3.0     # 정밀 단계 밴드 폭 (개략 경로 기준 ±초)
+
+# 참조 음성 합성 설정
+REFERENCE_STEPS = 2     # 참조 음성은 대략적인 스펙트럼만 필요하므로 최소 스텝
+REFERENCE_BATCH = 8
+REFERENCE_GAP_SEC = 0.3
+
+
+def _mel_filterbank(sr: int, n_fft: int, n_mels: int = 40,
+                    fmin: float = 80.0, fmax: float = 7600.0) -> np.ndarray:
+    """삼각 멜 필터뱅크 (n_mels, n_fft // 2 + 1)"""
+    fmax = min(fmax, sr / 2)
+
+    def hz_to_mel(f):
+        return 2595.0 * np.log10(1.0 + f / 700.0)
+
+    def mel_to_hz(m):
+        return 700.0 * (10 ** (m / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(fmin), hz_to_mel(fmax), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sr).astype(int)
+
+    fb = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        center = max(center, left + 1)
+        right = max(right, center + 1)
+        fb[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        fb[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return fb
+
+
+class FeatureExtractor:
+    """
+    MFCC 특징 추출 (c1~c12)
+
+    샘플레이트별 FFT 크기와 멜 필터를 Hz 기준으로 맞추므로
+    TTS 출력과 녹음 파일의 샘플레이트가 달라도 같은 특징 공간을 가짐
+    """
+
+    def __init__(self, sr: int, hop_sec: float = HOP_SEC, n_mels: int = 40, n_mfcc: int = 13):
+        self.sr = sr
+        self.hop = max(1, int(round(sr * hop_sec)))
+        self.n_fft = 1 << int(np.ceil(np.log2(self.hop * 2)))
+        self.window = np.hanning(self.n_fft).astype(np.float32)
+        self.mel_fb = _mel_filterbank(sr, self.n_fft, n_mels)
+
+        k = np.arange(n_mels)
+        self.dct = np.cos(np.pi / n_mels * (k[None, :] + 0.5) * np.arange(1, n_mfcc)[:, None])
+        self.dct = self.dct.astype(np.float32)
+
+    def __call__(self, audio: np.ndarray, n_frames: int = None) -> np.ndarray:
+        """오디오 배열 → (n_frames, n_mfcc - 1), 프레임 k는 [k*hop, k*hop + n_fft) 구간"""
+        if audio.ndim > 1:
+            audio = audio.mean(axis=1)
+        if n_frames is None:
+            n_frames = len(audio) // self.hop
+        if n_frames <= 0:
+            return np.zeros((0, self.dct.shape[0]), dtype=np.float32)
+
+        need = (n_frames - 1) * self.hop + self.n_fft
+        if len(audio) < need:
+            audio = np.concatenate([audio, np.zeros(need - len(audio), dtype=audio.dtype)])
+
+        frames = np.lib.stride_tricks.sliding_window_view(audio[:need], self.n_fft)[::self.hop]
+        spec = np.abs(np.fft.rfft(frames * self.window, axis=1)) ** 2
+        log_mel = np.log(spec.astype(np.float32) @ self.mel_fb.T + 1e-8)
+        return log_mel @ self.dct.T
+
+    def from_file(self, audio_path: str) -> np.ndarray:
+        """파일을 블록 단위로 읽어 특징 추출 (긴 녹음도 메모리 사용량 일정)"""
+        block_frames = 2000
+        overlap = self.n_fft - self.hop
+        total = sf.info(audio_path).frames
+        total_frames = total // self.hop
+
+        feats = []
+        done = 0
+        for block in sf.blocks(audio_path, blocksize=block_frames * self.hop + overlap,
+                               overlap=overlap, dtype='float32', always_2d=True):
+            n = min(block_frames, total_frames - done)
+            if n <= 0:
+                break
+            feats.append(self(block.mean(axis=1), n))
+            done += n
+        return np.concatenate(feats) if feats else np.zeros((0, self.dct.shape[0]), dtype=np.float32)
+
+
+def _normalize_features(feats: np.ndarray) -> np.ndarray:
+    """평균/분산 정규화(CMVN) 후 행 단위 L2 정규화 (코사인 거리용)"""
+    feats = (feats - feats.mean(axis=0)) / (feats.std(axis=0) + 1e-6)
+    return feats / (np.linalg.norm(feats, axis=1, keepdims=True) + 1e-6)
+
+
+def banded_dtw(rows: np.ndarray, cols: np.ndarray, center: np.ndarray, width: int) -> np.ndarray:
+    """
+    밴드 제한 DTW (행 단위 벡터화)
+
+    스텝 패턴 (1,0), (1,1), (1,2)만 사용하여 각 셀이 이전 행에만 의존하므로
+    한 행 전체를 NumPy 연산 한 번으로 계산함. 경로는 행마다 정확히 한 셀을 지남.
+
+    Args:
+        rows, cols: L2 정규화된 특징 (N, d), (M, d) - N >= M / 2 이어야 함
+        center: 행별 밴드 중심 열 (N,)
+        width: 밴드 폭 (열 수)
+
+    Returns:
+        행별 정렬된 열 인덱스 (N,) - 단조 증가
+    """
+    n, m = len(rows), len(cols)
+    width = min(width, m)
+
+    # 행별 밴드 시작 열 (단조 증가, 마지막 행은 마지막 열 포함)
+    lo = np.clip(np.round(center).astype(np.int64) - width // 2, 0, m - width)
+    lo = np.maximum.accumulate(lo)
+    lo[-1] = m - width
+
+    inf = np.inf
+    back = np.zeros((n, width), dtype=np.int8)
+    prev = np.full(width, inf)
+    padded = np.full(width + 3, inf)
+    offs = np.arange(width)
+
+    for i in range(n):
+        cost = 1.0 - cols[lo[i]:lo[i] + width] @ rows[i]
+        if i == 0:
+            cur = np.full(width, inf)
+            if lo[0] == 0:
+                cur[0] = cost[0]
+        else:
+            # 이전 행 기준 인덱스 (범위 밖은 inf 위치)
+            base = offs + (lo[i] - lo[i - 1]) + 2
+            padded[2:width + 2] = prev
+            c0 = padded[np.minimum(base, width + 2)]        # (1,0)
+            c1 = padded[np.minimum(base - 1, width + 2)]    # (1,1)
+            c2 = padded[np.minimum(base - 2, width + 2)]    # (1,2)
+            stacked = np.stack([c0, c1, c2])
+            choice = np.argmin(stacked, axis=0)
+            back[i] = choice
+            cur = stacked[choice, offs] + cost
+        prev = cur
+
+    # 역추적 (마지막 행의 마지막 열에서 시작)
+    path = np.empty(n, dtype=np.int64)
+    j = m - 1
+    for i in range(n - 1, -1, -1):
+        path[i] = j
+        if i > 0:
+            j -= int(back[i, j - lo[i]])
+            j = min(max(j, lo[i - 1]), lo[i - 1] + width - 1)
+    return path
+
+
+def align_features(ref: np.ndarray, rec: np.ndarray) -> np.ndarray:
+    """
+    개략→정밀 2단계 DTW로 참조 프레임 → 녹음 프레임 매핑
+
+    Returns:
+        참조 프레임별 녹음 프레임 인덱스 (len(ref),)
+    """
+    # 행은 더 긴 쪽 (스텝 패턴상 행 1개당 열 최대 2개 진행)
+    swap = len(ref) > len(rec)
+    rows, cols = (ref, rec) if swap else (rec, ref)
+    n, m = len(rows), len(cols)
+
+    # 1단계: 프레임 평균으로 축소한 특징에서 넓은 대각선 밴드
+    f = COARSE_FACTOR
+    rows_c = _normalize_features(_pool_frames(rows, f))
+    cols_c = _normalize_features(_pool_frames(cols, f))
+    nc, mc = len(rows_c), len(cols_c)
+    band_c = int(max(COARSE_BAND * mc, COARSE_MIN_BAND_SEC / (HOP_SEC * f))) * 2 + 1
+    diag = np.arange(nc) * (mc - 1) / max(nc - 1, 1)
+    path_c = banded_dtw(rows_c, cols_c, diag, band_c)
+
+    # 2단계: 개략 경로 주변의 좁은 밴드
+    center = path_c[np.minimum(np.arange(n) // f, nc - 1)] * f + f / 2
+    band_f = int(FINE_BAND_SEC / HOP_SEC) * 2 + f
+    path = banded_dtw(_normalize_features(rows), _normalize_features(cols), center, band_f)
+
+    if swap:
+        return path
+    # 행=녹음이면 역매핑: 참조 프레임 j가 처음 나타나는 녹음 프레임
+    return np.minimum(np.searchsorted(path, np.arange(m)), n - 1)
+
+
+def _pool_frames(feats: np.ndarray, factor: int) -> np.ndarray:
+    n = len(feats) // factor * factor
+    pooled = feats[:n].reshape(-1, factor, feats.shape[1]).mean(axis=1)
+    if n < len(feats):
+        pooled = np.vstack([pooled, feats[n:].mean(axis=0, keepdims=True)])
+    return pooled
+
+
+class DTWAligner:
+    """
+    대본 기반 DTW 정렬기
+
+    로컬 ONNX TTS로 대본의 참조 음성을 합성하고(라인별 길이를 알고 있음),
+    참조와 녹음의 MFCC를 DTW로 맞춰 라인 경계를 녹음 시간으로 변환
+    """
+
+    def __init__(self):
+        self.tts_engine = get_tts_engine()
+
+    def reference_features(self, subtitle_lines: list, language: str,
+                           voice_name: str = 'F1', progress_callback=None) -> tuple:
+        """
+        참조 음성 특징과 라인별 (시작, 끝) 프레임 반환
+
+        라인을 길이순으로 묶어 배치 추론하고, 오디오는 특징으로 바꾼 뒤 바로 버림
+        """
+        engine = self.tts_engine
+        engine.init_model()
+        style = engine.load_voice_style(voice_name)
+        extractor = FeatureExtractor(engine.sample_rate)
+
+        line_feats = [None] * len(subtitle_lines)
+        order = sorted(range(len(subtitle_lines)), key=lambda i: len(subtitle_lines[i]))
+
+        for b in range(0, len(order), REFERENCE_BATCH):
+            idx = order[b:b + REFERENCE_BATCH]
+            texts = [subtitle_lines[i] for i in idx]
+            style_batch = Style(
+                np.repeat(style.ttl, len(idx), axis=0), np.repeat(style.dp, len(idx), axis=0)
+            )
+            wav, duration = engine._infer(texts, [language] * len(idx), style_batch,
+                                          REFERENCE_STEPS, 1.0)
+            for k, i in enumerate(idx):
+                w = wav[k, :int(engine.sample_rate * duration[k])]
+                line_feats[i] = extractor(w)
+
+            if progress_callback:
+                prog = 45 + int(min(b + REFERENCE_BATCH, len(order)) / len(order) * 5)
+                progress_callback(prog, f"참조 음성 합성 [{min(b + REFERENCE_BATCH, len(order))}/{len(order)}]")
+
+        gap = extractor(np.zeros(int(REFERENCE_GAP_SEC * engine.sample_rate), dtype=np.float32))
+
+        feats = []
+        spans = []
+        pos = 0
+        for i, lf in enumerate(line_feats):
+            spans.append((pos, pos + len(lf)))
+            feats.append(lf)
+            pos += len(lf)
+            if i < len(line_feats) - 1:
+                feats.append(gap)
+                pos += len(gap)
+
+        return np.concatenate(feats), spans
+
+    def align(self, audio_path: str, subtitle_lines: list, language: str = 'ko',
+              voice_name: str = 'F1', progress_callback=None) -> list:
+        """
+        녹음 파일과 대본 라인 정렬
+
+        Returns:
+            [{'text', 'start', 'end'}, ...] (match_subtitles_with_forced_alignment와 같은 형식)
+        """
+        audio_duration = sf.info(audio_path).duration
+
+        ref, spans = self.reference_features(subtitle_lines, language, voice_name, progress_callback)
+
+        if progress_callback:
+            progress_callback(52, "녹음 특징 추출 중...")
+        rec_extractor = FeatureExtractor(sf.info(audio_path).samplerate)
+        rec = rec_extractor.from_file(audio_path)
+
+        if progress_callback:
+            progress_callback(54, "DTW 정렬 중...")
+        ref_to_rec = align_features(ref, rec)
+
+        hop_sec = rec_extractor.hop / rec_extractor.sr
+        timings = []
+        for line, (start, end) in zip(subtitle_lines, spans):
+            start_t = ref_to_rec[min(start, len(ref_to_rec) - 1)] * hop_sec
+            end_t = ref_to_rec[min(max(end - 1, start), len(ref_to_rec) - 1)] * hop_sec + hop_sec
+            timings.append({'text': line, 'start': float(start_t), 'end': float(min(end_t, audio_duration))})
+
+        # 겹침 방지 및 마지막 자막은 오디오 끝까지
+        for i in range(1, len(timings)):
+            if timings[i]['start'] < timings[i - 1]['end']:
+                mid_point = (timings[i - 1]['end'] + timings[i]['start']) / 2
+                timings[i - 1]['end'] = mid_point
+                timings[i]['start'] = mid_point
+        if timings:
+            timings[-1]['end'] = audio_duration
+
+        return timings
@@ -0,0 +1,348 @@
+"""
+Supertonic Render Farm
+작업 폴더의 JSON 영상 작업을 여러 워커 프로세스로 일괄 렌더링 (SQLite 매니페스트로 중단 후 재개)
+
+작업 파일(*.json)은 create_video 인자와 같은 키를 사용함:
+    {"tts_text": "...", "voice_name": "F1", "background_path": "bg.mp4", "resolution": "1920x1080"}
+    - tts_text 대신 "text_file" (txt/docx) 사용 가능, 상대 경로는 작업 폴더 기준
+    - 생략한 화면 설정은 FARM_DEFAULTS 사용, "max_retries"로 작업별 재시도 횟수 지정
+
+사용법:
+    python -m core.farm jobs/ --workers 2
+    python -m core.farm jobs/ --watch            # 새 작업 파일을 계속 감시
+    python -m core.farm jobs/ --status
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import inspect
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+
+MANIFEST_NAME = 'farm_manifest.sqlite'
+
+# 작업 파일에서 생략한 create_video 인자의 기본값
+FARM_DEFAULTS = {
+    'subtitle_text': '',
+    'voice_name': 'F1',
+    'language': 'ko',
+    'speed': 1.0,
+    'quality': 5,
+    'background_path': None,
+    'resolution': '1920x1080',
+    'font_size': 70,
+    'subtitle_position': '하단-중앙',
+    'offset_x': 0,
+    'offset_y': 0,
+    'use_shape': False,
+    'shape_x1': 0,
+    'shape_y1': 0,
+    'shape_x2': 100,
+    'shape_y2': 100,
+    'shape_color': '#000000',
+    'shape_opacity': 0.5,
+}
+
+DEFAULT_MAX_RETRIES = 2
+
+
+class FarmManifest:
+    """
+    작업 상태 매니페스트 (SQLite)
+
+    상태: pending → running → done / failed (재시도 횟수 초과 시)
+    작업 파일 내용이 바뀌면 해시로 감지하여 다시 pending으로 되돌림
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                spec_hash TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_retries INTEGER NOT NULL DEFAULT 0,
+                output TEXT,
+                message TEXT,
+                updated REAL
+            )
+        """)
+        self._conn.commit()
+
+    def sync(self, jobs_dir: str) -> int:
+        """작업 폴더의 JSON 파일을 매니페스트에 반영 → 새로 대기열에 들어간 작업 수"""
+        added = 0
+        for name in sorted(os.listdir(jobs_dir)):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(jobs_dir, name)
+            try:
+                with open(path, 'rb') as f:
+                    raw = f.read()
+                spec = json.loads(raw.decode('utf-8-sig'))
+            except (OSError, ValueError) as e:
+                print(f"작업 파일 읽기 실패 ({name}): {e}")
+                continue
+
+            job_id = os.path.splitext(name)[0]
+            spec_hash = hashlib.sha1(raw).hexdigest()
+            max_retries = int(spec.get('max_retries', DEFAULT_MAX_RETRIES))
+
+            row = self._conn.execute(
+                "SELECT spec_hash FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, path, spec_hash, state, max_retries, updated) "
+                    "VALUES (?, ?, ?, 'pending', ?, ?)",
+                    (job_id, path, spec_hash, max_retries, time.time())
+                )
+                added += 1
+            elif row[0] != spec_hash:
+                self._conn.execute(
+                    "UPDATE jobs SET path = ?, spec_hash = ?, state = 'pending', attempts = 0, "
+                    "max_retries = ?, output = NULL, message = NULL, updated = ? WHERE id = ?",
+                    (path, spec_hash, max_retries, time.time(), job_id)
+                )
+                added += 1
+        self._conn.commit()
+        return added
+
+    def recover(self) -> int:
+        """이전 실행이 중단되어 running으로 남은 작업을 pending으로 복구"""
+        cur = self._conn.execute(
+            "UPDATE jobs SET state = 'pending', updated = ? WHERE state = 'running'", (time.time(),)
+        )
+        self._conn.commit()
+        return cur.rowcount
+
+    def next_pending(self, exclude: set):
+        """다음 대기 작업 (id, path) 또는 None"""
+        for job_id, path in self._conn.execute(
+                "SELECT id, path FROM jobs WHERE state = 'pending' ORDER BY id"):
+            if job_id not in exclude:
+                return job_id, path
+        return None
+
+    def mark_running(self, job_id: str):
+        self._conn.execute(
+            "UPDATE jobs SET state = 'running', attempts = attempts + 1, updated = ? WHERE id = ?",
+            (time.time(), job_id)
+        )
+        self._conn.commit()
+
+    def mark_result(self, job_id: str, output: str, message: str) -> str:
+        """작업 결과 기록 → 새 상태 (실패 시 재시도 횟수가 남았으면 pending)"""
+        if output:
+            state = 'done'
+        else:
+            attempts, max_retries = self._conn.execute(
+                "SELECT attempts, max_retries FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            state = 'pending' if attempts <= max_retries else 'failed'
+
+        self._conn.execute(
+            "UPDATE jobs SET state = ?, output = ?, message = ?, updated = ? WHERE id = ?",
+            (state, output, message, time.time(), job_id)
+        )
+        self._conn.commit()
+        return state
+
+    def counts(self) -> dict:
+        return dict(self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+
+    def rows(self) -> list:
+        return self._conn.execute(
+            "SELECT id, state, attempts, output, message FROM jobs ORDER BY id"
+        ).fetchall()
+
+    def close(self):
+        self._conn.close()
+
+
+# ===== 워커 프로세스 =====
+
+_generator = None
+
+
+def _init_worker():
+    """워커 시작 시 영상 생성기와 TTS 모델을 한 번만 로드"""
+    global _generator
+    from .video import get_video_generator
+
+    _generator = get_video_generator()
+    _generator.tts_engine.init_model()
+
+
+def load_job_spec(path: str) -> dict:
+    """작업 파일 → create_video 키워드 인자 (기본값/상대 경로 처리)"""
+    from .utils import read_text_file
+    from .video import VideoGenerator
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        spec = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    def resolve(p):
+        return p if not p or os.path.isabs(p) else os.path.join(base_dir, p)
+
+    if not spec.get('tts_text') and spec.get('text_file'):
+        spec['tts_text'] = read_text_file(resolve(spec['text_file']))
+    if spec.get('background_path'):
+        spec['background_path'] = resolve(spec['background_path'])
+
+    kwargs = dict(FARM_DEFAULTS)
+    kwargs['output_name'] = os.path.splitext(os.path.basename(path))[0]
+
+    allowed = set(inspect.signature(VideoGenerator.create_video).parameters) - {'self', 'progress_callback'}
+    kwargs.update({k: v for k, v in spec.items() if k in allowed})
+    return kwargs
+
+
+def _run_job(job_id: str, path: str) -> tuple:
+    """작업 1개 렌더링 (워커 프로세스) → (출력 경로 또는 None, 메시지)"""
+    try:
+        kwargs = load_job_spec(path)
+    except Exception as e:
+        return None, f"작업 파일 오류: {e}"
+
+    last = [-10]
+
+    def progress(pct, msg):
+        if pct >= last[0] + 10 or pct >= 100:
+            last[0] = pct
+            print(f"[{job_id}] {pct}% {msg}", flush=True)
+
+    return _generator.create_video(progress_callback=progress, **kwargs)
+
+
+# ===== 디스패처 =====
+
+def _first_line(message: str) -> str:
+    return (message or '').strip().split('\n')[0]
+
+
+def run_farm(jobs_dir: str, workers: int = 1, watch: bool = False, poll_interval: float = 5.0,
+             manifest_path: str = None):
+    """
+    작업 폴더를 처리 - 대기 작업을 workers개 프로세스에 나눠 실행
+
+    watch=False면 대기/실행 중인 작업이 없을 때 종료, True면 새 작업 파일을 계속 감시
+    """
+    manifest = FarmManifest(manifest_path or os.path.join(jobs_dir, MANIFEST_NAME))
+    recovered = manifest.recover()
+    if recovered:
+        print(f"중단된 작업 {recovered}개를 다시 대기열에 넣었습니다.")
+
+    manifest.sync(jobs_dir)
+    print(f"작업 상태: {manifest.counts()}")
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    running = {}
+    last_sync = time.time()
+
+    try:
+        while True:
+            if watch and time.time() - last_sync >= poll_interval:
+                added = manifest.sync(jobs_dir)
+                if added:
+                    print(f"새 작업 {added}개")
+                last_sync = time.time()
+
+            # 빈 워커 슬롯 채우기
+            while len(running) < workers:
+                job = manifest.next_pending(set(running.values()))
+                if job is None:
+                    break
+                job_id, path = job
+                manifest.mark_running(job_id)
+                print(f"[{job_id}] 시작")
+                running[pool.submit(_run_job, job_id, path)] = job_id
+
+            if not running:
+                if not watch:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            done, _ = wait(running, timeout=poll_interval if watch else None,
+                           return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                job_id = running.pop(future)
+                try:
+                    output, message = future.result()
+                except BrokenProcessPool:
+                    output, message = None, "워커 프로세스가 비정상 종료됨"
+                    broken = True
+                except Exception as e:
+                    output, message = None, f"오류 발생: {e}"
+
+                state = manifest.mark_result(job_id, output, message)
+                print(f"[{job_id}] {state}: {_first_line(message)}")
+
+            # 워커가 죽으면 풀을 새로 만들고 함께 실행 중이던 작업도 실패 1회로 기록
+            if broken:
+                for job_id in running.values():
+                    manifest.mark_result(job_id, None, "워커 프로세스가 비정상 종료됨")
+                running.clear()
+                pool.shutdown(wait=False)
+                pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+    except KeyboardInterrupt:
+        print("중단 요청 - 실행 중인 작업은 다음 실행 시 다시 시작합니다.")
+        pool.shutdown(wait=False, cancel_futures=True)
+        manifest.close()
+        raise
+
+    pool.shutdown(wait=True)
+    print(f"완료: {manifest.counts()}")
+    manifest.close()
+
+
+def print_status(jobs_dir: str, manifest_path: str = None):
+    manifest = FarmManifest(manifest_path or os.path.join(jobs_dir, MANIFEST_NAME))
+    for job_id, state, attempts, output, message in manifest.rows():
+        detail = output or _first_line(message)
+        print(f"{job_id:30s} {state:8s} 시도 {attempts}  {detail}")
+    print(manifest.counts())
+    manifest.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Supertonic 영상 일괄 렌더링")
+    parser.add_argument("jobs_dir", help="작업 JSON 파일 폴더")
+    parser.add_argument("--workers", type=int, default=1, help="워커 프로세스 수 (프로세스마다 모델 로드)")
+    parser.add_argument("--watch", action="store_true", help="새 작업 파일을 계속 감시")
+    parser.add_argument("--poll", type=float, default=5.0, help="감시 간격 (초)")
+    parser.add_argument("--manifest", type=str, default=None,
+                        help=f"매니페스트 경로 (기본: 작업 폴더/{MANIFEST_NAME})")
+    parser.add_argument("--status", action="store_true", help="작업 상태만 출력")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.jobs_dir):
+        print(f"작업 폴더가 없습니다: {args.jobs_dir}")
+        return 1
+
+    if args.status:
+        print_status(args.jobs_dir, args.manifest)
+        return 0
+
+    try:
+        run_farm(args.jobs_dir, max(1, args.workers), args.watch, args.poll, args.manifest)
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""
+Supertonic FFmpeg Helpers
+ffmpeg 실행 파일 탐색 및 실행
+"""
+import os
+import re
+import queue
+import shutil
+import socket
+import tempfile
+import threading
+import subprocess
+
+import numpy as np
+
+
+_ffmpeg_exe = None
+
+
+def get_ffmpeg_exe() -> str:
+    """ffmpeg 실행 파일 경로 (MoviePy와 같은 imageio-ffmpeg 바이너리 우선, 없으면 PATH)"""
+    global _ffmpeg_exe
+    if _ffmpeg_exe is None:
+        try:
+            import imageio_ffmpeg
+            _ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            _ffmpeg_exe = shutil.which('ffmpeg') or 'ffmpeg'
+    return _ffmpeg_exe
+
+
+def run_ffmpeg(args: list, cwd: str = None, audio=None):
+    """
+    ffmpeg 실행 (실패 시 stderr 끝부분을 담아 RuntimeError)
+
+    Args:
+        args: ffmpeg 인자 목록 (실행 파일 제외)
+        cwd: 작업 폴더 (concat 목록의 상대 경로 기준)
+        audio: args에 audio_input_args()로 넣은 오디오 (PCMAudio면 파이프를 상속시킴)
+    """
+    cmd = [get_ffmpeg_exe(), '-hide_banner', '-loglevel', 'error', '-y'] + list(args)
+    pass_fds = _audio_child_fds(audio)
+    try:
+        result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True,
+                                encoding='utf-8', errors='replace', pass_fds=pass_fds)
+    finally:
+        PCMAudio.close_fds(pass_fds)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg 실패: {result.stderr.strip()[-500:]}")
+    return result
+
+
+def probe_duration(path: str):
+    """미디어 길이(초) - ffmpeg -i 출력의 Duration 파싱 (알 수 없으면 None)"""
+    result = subprocess.run([get_ffmpeg_exe(), '-hide_banner', '-i', path],
+                            capture_output=True, text=True, encoding='utf-8', errors='replace')
+    match = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        return None
+    h, m, s = match.groups()
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+
+def escape_filter_path(path: str) -> str:
+    """
+    필터 옵션 값으로 넣을 파일 경로 이스케이프 (예: subtitles=filename=...)
+
+    옵션 단계(: ')와 필터그래프 단계(\\ ' , ; [ ]) 두 번 이스케이프함
+    """
+    path = path.replace('\\', '/')
+    path = path.replace(':', '\\:').replace("'", "\\'")
+    for ch in "\\',;[]":
+        path = path.replace(ch, '\\' + ch)
+    return path
+
+
+class PCMAudio:
+    """
+    메모리의 float32 PCM을 ffmpeg 오디오 입력으로 직접 공급 (임시 WAV 쓰기/다시 읽기 없음)
+
+    input_args()를 부를 때마다 입력 하나를 준비하고 전체 PCM을 처음부터 보내므로
+    한 작업의 여러 인코딩(출력 규격별, 구간 합치기)에 재사용 가능.
+    POSIX에서는 익명 파이프(pipe:N)를 ffmpeg에 상속시켜 다른 프로세스가 끼어들 수 없음.
+    Windows에서는 ffmpeg에 추가 파이프를 넘길 수 없어 127.0.0.1 소켓을 쓰되,
+    input_args() 호출 수만큼만 접속을 받고 그 이상은 바로 끊음.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.sample_rate = int(sample_rate)
+        self.channels = 1 if self.samples.ndim == 1 else self.samples.shape[1]
+
+        self._closed = False
+        self._lock = threading.Lock()
+        self._senders = []
+        # 아직 ffmpeg에 넘기지 않은 파이프 읽기 fd (input_args를 부른 스레드별)
+        self._child_fds = {}
+        self._conns = []
+        self._expected = 0
+        self._accepted = 0
+        self._server = None
+        self._thread = None
+        if os.name == 'nt':
+            self._server = socket.create_server(('127.0.0.1', 0))
+            self._server.settimeout(0.5)
+            self.port = self._server.getsockname()[1]
+            self._thread = threading.Thread(target=self._serve, daemon=True)
+            self._thread.start()
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    def input_args(self) -> list:
+        """ffmpeg 입력 인자 (-f f32le ... -i pipe:N 또는 tcp://...) - 호출마다 입력 하나"""
+        args = ['-f', 'f32le', '-ar', str(self.sample_rate), '-ac', str(self.channels)]
+        if self._server is not None:
+            with self._lock:
+                self._expected += 1
+            return args + ['-i', f"tcp://127.0.0.1:{self.port}"]
+
+        # 두 fd 모두 상속 불가(PEP 446)로 만들어지며 읽기 쪽만 pass_fds로 ffmpeg에 넘김.
+        # fork는 이 설정과 상관없이 복제하므로 앱의 프로세스 풀은 get_pool_context()로 시작함
+        read_fd, write_fd = os.pipe()
+        os.set_inheritable(write_fd, False)
+        with self._lock:
+            self._child_fds.setdefault(threading.get_ident(), []).append(read_fd)
+        self._start_sender(os.fdopen(write_fd, 'wb'))
+        return args + ['-i', f"pipe:{read_fd}"]
+
+    def take_child_fds(self) -> tuple:
+        """
+        이 스레드에서 input_args()로 준비한 파이프 읽기 fd (ffmpeg 실행 시 pass_fds로 넘김)
+
+        받은 쪽이 실행 후 close_fds()로 닫아야 함 (Windows 소켓 방식에서는 빈 튜플)
+        """
+        with self._lock:
+            return tuple(self._child_fds.pop(threading.get_ident(), ()))
+
+    @staticmethod
+    def close_fds(fds):
+        """ffmpeg에 넘긴 파이프 읽기 fd를 이쪽에서 닫음"""
+        for fd in fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _start_sender(self, stream):
+        thread = threading.Thread(target=self._send, args=(stream,), daemon=True)
+        with self._lock:
+            self._senders = [t for t in self._senders if t.is_alive()]
+            self._senders.append(thread)
+        thread.start()
+
+    def _serve(self):
+        while not self._closed:
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            with self._lock:
+                allowed = self._accepted < self._expected
+                if allowed:
+                    self._accepted += 1
+                    self._conns.append(conn)
+            if not allowed:
+                conn.close()
+                continue
+            conn.settimeout(None)
+            self._start_sender(conn)
+
+    def _send(self, stream):
+        with stream:
+            try:
+                if isinstance(stream, socket.socket):
+                    stream.sendall(memoryview(self.samples).cast('B'))
+                else:
+                    stream.write(memoryview(self.samples).cast('B'))
+            except (OSError, ValueError):
+                # ffmpeg가 -t 등으로 먼저 읽기를 끝냈거나 close()로 끊긴 경우
+                pass
+
+    def close(self):
+        """대기/전송 중지 - 넘기지 않은 파이프와 열린 접속을 닫고 전송 스레드 종료 대기"""
+        self._closed = True
+        with self._lock:
+            pending = [fd for fds in self._child_fds.values() for fd in fds]
+            self._child_fds.clear()
+            conns, self._conns = self._conns, []
+            senders, self._senders = self._senders, []
+        # 읽을 쪽이 없어지면 막혀 있던 전송이 BrokenPipe로 끝남
+        self.close_fds(pending)
+        for conn in conns:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._server.close()
+        for thread in senders:
+            thread.join(timeout=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def audio_input_args(audio) -> list:
+    """오디오 입력 인자 - 파일 경로 또는 PCMAudio"""
+    if isinstance(audio, PCMAudio):
+        return audio.input_args()
+    return ['-i', audio]
+
+
+def _audio_child_fds(audio) -> tuple:
+    """ffmpeg에 상속할 PCMAudio 파이프 fd (파일 경로면 빈 튜플)"""
+    if isinstance(audio, PCMAudio):
+        return audio.take_child_fds()
+    return ()
+
+
+# libx264 인코더 스레드 수 (0 = ffmpeg 자동)
+DEFAULT_ENCODER_THREADS = 0
+
+# 배경 동영상 앞당겨 읽기 프레임 수 (링 버퍼 슬롯)
+READ_AHEAD_FRAMES = 6
+
+
+def _stderr_tail(stderr_file) -> str:
+    """임시 파일로 받은 ffmpeg stderr 끝부분"""
+    try:
+        stderr_file.seek(0)
+        return stderr_file.read().decode('utf-8', errors='replace').strip()[-500:]
+    except (OSError, ValueError):
+        return ''
+
+
+class FrameWriter:
+    """
+    원시 rgb24 프레임을 ffmpeg stdin으로 직접 보내 인코딩
+
+    프레임 버퍼(H, W, 3 uint8, C-contiguous)를 그대로 write하므로
+    프레임당 추가 복사/변환이 없음. audio_path는 파일 경로 또는 PCMAudio
+    (오디오는 같은 ffmpeg에서 영상과 함께 AAC로 인코딩/먹싱)
+    """
+
+    def __init__(self, filepath: str, width: int, height: int, fps: float = 30,
+                 audio_path: str = None, threads: int = None,
+                 codec: str = 'libx264', preset: str = 'medium', extra_args: list = None):
+        self.filepath = filepath
+        self.frame_bytes = width * height * 3
+        self.frames_written = 0
+
+        if threads is None:
+            threads = DEFAULT_ENCODER_THREADS
+
+        args = [
+            get_ffmpeg_exe(), '-hide_banner', '-loglevel', 'error', '-y',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+            '-s', f"{width}x{height}", '-r', str(fps), '-i', '-',
+        ]
+        if audio_path is not None:
+            args += audio_input_args(audio_path) + ['-map', '0:v', '-map', '1:a', '-c:a', 'aac']
+        args += [
+            '-c:v', codec, '-preset', preset, '-pix_fmt', 'yuv420p',
+            '-threads', str(int(threads)),
+        ]
+        args += list(extra_args or [])
+        args += ['-movflags', '+faststart', filepath]
+
+        # stderr는 파이프가 차서 멈추지 않도록 임시 파일로 받음
+        self._stderr = tempfile.TemporaryFile()
+        pass_fds = _audio_child_fds(audio_path)
+        try:
+            self._proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                          stderr=self._stderr, pass_fds=pass_fds)
+        finally:
+            PCMAudio.close_fds(pass_fds)
+
+    def write(self, frame: np.ndarray):
+        """프레임 1장 기록"""
+        try:
+            self._proc.stdin.write(memoryview(frame).cast('B'))
+        except (BrokenPipeError, OSError):
+            self._proc.wait()
+            raise RuntimeError(f"ffmpeg 인코딩 실패: {_stderr_tail(self._stderr)}")
+        self.frames_written += 1
+
+    def close(self):
+        """입력 종료 후 인코딩 완료 대기 (실패 시 RuntimeError)"""
+        try:
+            self._proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        returncode = self._proc.wait()
+        message = _stderr_tail(self._stderr)
+        self._stderr.close()
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg 인코딩 실패: {message}")
+
+    def abort(self):
+        """인코딩 중단 (예외 처리용)"""
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+        self._stderr.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class FrameReader:
+    """
+    동영상을 지정 해상도/fps의 원시 rgb24 프레임으로 디코딩
+
+    ffmpeg가 스케일/fps 변환/반복 재생(-stream_loop, 끊김 없이 처음으로)을 처리하고,
+    프레임은 호출자의 버퍼로 바로 읽어들임.
+
+    read_ahead > 0 이면 디코딩 스레드가 미리 할당한 프레임 링 버퍼(read_ahead개 슬롯)를
+    계속 채워 두므로, 합성 루프는 정상 상태에서 디코딩을 기다리지 않고 준비된 프레임만 복사함.
+    """
+
+    def __init__(self, path: str, width: int, height: int, fps: float = 30,
+                 duration: float = None, loop: bool = True, start: float = 0.0,
+                 read_ahead: int = 0):
+        self.frame_bytes = width * height * 3
+
+        args = [get_ffmpeg_exe(), '-hide_banner', '-loglevel', 'error']
+        if loop:
+            args += ['-stream_loop', '-1']
+        if start > 0:
+            args += ['-ss', f"{start:.3f}"]
+        args += ['-i', path]
+        if duration is not None:
+            args += ['-t', f"{duration:.3f}"]
+        args += [
+            '-an', '-vf', f"scale={width}:{height},fps={fps}",
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-'
+        ]
+
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(args, stdin=subprocess.DEVNULL,
+                                      stdout=subprocess.PIPE, stderr=self._stderr)
+
+        self._thread = None
+        if read_ahead > 0:
+            self._slots = np.empty((read_ahead, height, width, 3), dtype=np.uint8)
+            self._free = queue.Queue()
+            self._ready = queue.Queue()
+            for i in range(read_ahead):
+                self._free.put(i)
+            self._thread = threading.Thread(target=self._decode_loop, daemon=True)
+            self._thread.start()
+
+    def _read_pipe(self, frame: np.ndarray) -> bool:
+        n = self._proc.stdout.readinto(memoryview(frame).cast('B'))
+        return n == self.frame_bytes
+
+    def _decode_loop(self):
+        """디코딩 스레드 - 빈 슬롯에 다음 프레임을 읽어 준비 큐에 넣음 (끝/중단 시 None)"""
+        while True:
+            i = self._free.get()
+            if i is None:
+                break
+            try:
+                ok = self._read_pipe(self._slots[i])
+            except (OSError, ValueError):
+                ok = False
+            if not ok:
+                break
+            self._ready.put(i)
+        self._ready.put(None)
+
+    def read_into(self, frame: np.ndarray) -> bool:
+        """다음 프레임을 frame 버퍼에 읽기 (끝이면 False)"""
+        if self._thread is None:
+            return self._read_pipe(frame)
+
+        i = self._ready.get()
+        if i is None:
+            self._ready.put(None)
+            return False
+        np.copyto(frame, self._slots[i])
+        self._free.put(i)
+        return True
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.kill()
+        if self._thread is not None:
+            self._free.put(None)
+            self._thread.join()
+        self._proc.stdout.close()
+        self._proc.wait()
+        self._stderr.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
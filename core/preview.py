@@ -0,0 +1,135 @@
+"""
+Supertonic Preview Engine
+자막 미리보기 증분 합성 (배경/도형/자막 레이어를 세션 동안 메모리에 유지)
+"""
+import io
+import os
+import threading
+
+import numpy as np
+from PIL import Image as PILImage
+
+from .utils import get_font_path
+from .render import ShapeLayer, blend_premultiplied
+from .ffmpeg import FrameReader
+
+
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
+DEFAULT_BACKGROUND = (26, 26, 46)
+
+
+class PreviewEngine:
+    """
+    증분 미리보기 엔진
+
+    레이어별 입력 키를 기억해 두고 바뀐 레이어만 다시 만듦:
+        배경 (경로, 수정 시간, 해상도) → 디코딩/스케일된 배경 프레임
+        도형 (사각형, 색상, 투명도)     → 배경 + 도형 기본 프레임
+        자막 (텍스트, 폰트 크기)        → 프리멀티플라이드 자막 래스터
+    위치(offset)만 바뀐 경우에는 이전 자막 영역만 기본 프레임으로 되돌리고 새 위치에 합성함.
+    결과는 파일 대신 JPEG/WebP/PNG 바이트로 반환.
+    """
+
+    def __init__(self, video_generator):
+        self.video_generator = video_generator
+        self._lock = threading.Lock()
+
+        self._bg_key = None
+        self._bg_frame = None
+        self._base_key = None
+        self._base_frame = None
+        self._raster_key = None
+        self._raster = None
+        self._frame = None
+        self._dirty = None   # 현재 프레임에서 자막이 그려진 영역 (x0, y0, x1, y1)
+
+    def _background(self, background_path: str, video_width: int, video_height: int) -> np.ndarray:
+        """배경 프레임 (경로/수정 시간/해상도가 같으면 재사용)"""
+        mtime = None
+        if background_path and os.path.exists(background_path):
+            mtime = os.path.getmtime(background_path)
+        else:
+            background_path = None
+
+        key = (background_path, mtime, video_width, video_height)
+        if key != self._bg_key:
+            if background_path is None:
+                frame = np.empty((video_height, video_width, 3), dtype=np.uint8)
+                frame[...] = DEFAULT_BACKGROUND
+            elif os.path.splitext(background_path)[1].lower() in VIDEO_EXTENSIONS:
+                # 첫 프레임만 ffmpeg로 디코딩 (스케일 포함)
+                frame = np.empty((video_height, video_width, 3), dtype=np.uint8)
+                with FrameReader(background_path, video_width, video_height,
+                                 duration=1.0, loop=False) as reader:
+                    if not reader.read_into(frame):
+                        raise RuntimeError("배경 영상 첫 프레임 디코딩 실패")
+            else:
+                frame = self.video_generator._load_static_background(
+                    background_path, video_width, video_height
+                )
+            self._bg_key = key
+            self._bg_frame = frame
+            self._base_key = self._base_frame = None
+
+        return self._bg_frame
+
+    def _base(self, bg_frame: np.ndarray, shape: ShapeLayer) -> np.ndarray:
+        """배경 + 도형 기본 프레임 (도형이 같으면 재사용)"""
+        key = shape and (shape.rect, shape.rgb, shape.opacity)
+        if self._base_frame is None or key != self._base_key:
+            base = bg_frame.copy()
+            if shape is not None:
+                shape.apply(base)
+            self._base_key = key
+            self._base_frame = base
+            self._frame = base.copy()
+            self._dirty = None
+        return self._base_frame
+
+    def _subtitle_raster(self, text: str, font_size: int) -> tuple:
+        """자막 래스터 (텍스트/크기가 같으면 재사용, 디스크 캐시도 사용)"""
+        key = (text, font_size)
+        if key != self._raster_key:
+            self._raster = self.video_generator._get_subtitle_raster(text, get_font_path(font_size))
+            self._raster_key = key
+        return self._raster
+
+    def render(self, subtitle_text: str, background_path: str, resolution: str,
+               font_size: int, subtitle_position: str, offset_x: float, offset_y: float,
+               shape: ShapeLayer = None, image_format: str = 'JPEG', quality: int = 85) -> bytes:
+        """미리보기 합성 → 인코딩된 이미지 바이트"""
+        with self._lock:
+            video_width, video_height = map(int, (resolution or "1920x1080").split('x'))
+
+            bg_frame = self._background(background_path, video_width, video_height)
+            base = self._base(bg_frame, shape)
+
+            # 이전 자막 영역만 기본 프레임으로 복원
+            frame = self._frame
+            if self._dirty is not None:
+                x0, y0, x1, y1 = self._dirty
+                frame[y0:y1, x0:x1] = base[y0:y1, x0:x1]
+                self._dirty = None
+
+            if subtitle_text:
+                premul, alpha, crop_x, crop_y, img_width, img_height = \
+                    self._subtitle_raster(subtitle_text, font_size)
+                clip_x, clip_y = self.video_generator._calculate_subtitle_position(
+                    subtitle_position, video_width, video_height,
+                    img_width, img_height, offset_x, offset_y
+                )
+                x, y = clip_x + crop_x, clip_y + crop_y
+                blend_premultiplied(frame, premul, alpha, x, y)
+
+                h, w = alpha.shape[:2]
+                x0, y0 = min(max(x, 0), video_width), min(max(y, 0), video_height)
+                x1, y1 = min(max(x + w, 0), video_width), min(max(y + h, 0), video_height)
+                self._dirty = (x0, y0, x1, y1)
+
+            buffer = io.BytesIO()
+            image = PILImage.fromarray(frame)
+            if image_format.upper() == 'PNG':
+                image.save(buffer, format='PNG', compress_level=1)
+            else:
+                image.save(buffer, format=image_format.upper(), quality=quality)
+            return buffer.getvalue()
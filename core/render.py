@@ -0,0 +1,462 @@
+"""
+Supertonic Render Layers
+영상 프레임 합성용 레이어 (자막 오버레이 등)
+"""
+import os
+
+import numpy as np
+
+
+def blend_premultiplied(frame: np.ndarray, premul: np.ndarray, alpha: np.ndarray, x: int, y: int):
+    """
+    프리멀티플라이드 RGBA 래스터를 프레임에 직접 합성 (프레임 밖으로 나간 부분은 잘라냄)
+
+    out = premul + frame * (255 - alpha) / 255
+    """
+    h, w = alpha.shape[:2]
+    fh, fw = frame.shape[:2]
+
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, fw), min(y + h, fh)
+    if x0 >= x1 or y0 >= y1:
+        return frame
+
+    sx, sy = x0 - x, y0 - y
+    src_pre = premul[sy:sy + (y1 - y0), sx:sx + (x1 - x0)]
+    src_inv = 255 - alpha[sy:sy + (y1 - y0), sx:sx + (x1 - x0)].astype(np.uint16)
+
+    region = frame[y0:y1, x0:x1]
+    region[...] = np.minimum(src_pre + (region * src_inv + 127) // 255, 255)
+    return frame
+
+
+def premultiply(rgba: np.ndarray) -> tuple:
+    """
+    RGBA 래스터 → 투명 여백을 잘라낸 프리멀티플라이드 (rgb, alpha, 잘라낸 x, y 오프셋)
+
+    Returns:
+        (premul uint8 (h, w, 3), alpha uint8 (h, w, 1), crop_x, crop_y)
+    """
+    alpha = rgba[..., 3]
+    ys, xs = np.nonzero(alpha)
+    if len(ys) == 0:
+        return (np.zeros((0, 0, 3), dtype=np.uint8), np.zeros((0, 0, 1), dtype=np.uint8), 0, 0)
+
+    y0, y1 = ys.min(), ys.max() + 1
+    x0, x1 = xs.min(), xs.max() + 1
+    crop = rgba[y0:y1, x0:x1]
+
+    a = crop[..., 3:4].astype(np.uint16)
+    premul = ((crop[..., :3].astype(np.uint16) * a + 127) // 255).astype(np.uint8)
+    return premul, crop[..., 3:4].copy(), int(x0), int(y0)
+
+
+def draw_subtitle_image(text: str, font, outline_width: int = 3) -> tuple:
+    """
+    자막 이미지 (흰 글자 + 검은 외곽선, 투명 배경 RGBA)
+
+    Returns:
+        (RGBA uint8 배열, 이미지 너비, 이미지 높이)
+    """
+    from PIL import Image, ImageDraw
+
+    bbox = font.getbbox(text)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+    bbox_offset_x = bbox[0]
+    bbox_offset_y = bbox[1]
+
+    img_width = text_width + outline_width * 2 + 20
+    img_height = text_height + outline_width * 2 + 20
+
+    subtitle_img = Image.new('RGBA', (img_width, img_height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(subtitle_img)
+
+    text_x = (img_width - text_width) // 2 - bbox_offset_x
+    text_y = (img_height - text_height) // 2 - bbox_offset_y
+
+    # PIL stroke 기능 사용
+    try:
+        draw.text((text_x, text_y), text, font=font,
+                  fill=(255, 255, 255, 255),
+                  stroke_width=outline_width,
+                  stroke_fill=(0, 0, 0, 255))
+    except TypeError:
+        # stroke 미지원 버전 폴백
+        for dx, dy in [(-outline_width, 0), (outline_width, 0),
+                       (0, -outline_width), (0, outline_width),
+                       (-outline_width, -outline_width), (outline_width, -outline_width),
+                       (-outline_width, outline_width), (outline_width, outline_width)]:
+            draw.text((text_x + dx, text_y + dy), text, font=font, fill=(0, 0, 0, 255))
+        draw.text((text_x, text_y), text, font=font, fill=(255, 255, 255, 255))
+
+    return np.array(subtitle_img), img_width, img_height
+
+
+def save_subtitle_raster(path: str, raster: tuple):
+    """자막 래스터 (premul, alpha, crop_x, crop_y, img_w, img_h) → 압축 .npz 파일"""
+    premul, alpha, crop_x, crop_y, img_width, img_height = raster
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, premul=premul, alpha=alpha,
+                            meta=np.array([crop_x, crop_y, img_width, img_height]))
+
+
+def rasterize_subtitles_worker(font_path: str, font_index: int, font_size: int,
+                               texts: list, outline_width: int = 3,
+                               cache_paths: list = None) -> tuple:
+    """
+    자막 래스터 일괄 생성 워커 (프로세스 풀에서 실행)
+
+    결과를 줄마다 따로 보내지 않고 하나의 바이트 배열(premul + alpha 연속 배치)로 묶어 반환.
+    cache_paths가 있으면 영구 캐시 파일도 워커에서 바로 저장 (압축을 주 프로세스에서 하지 않음)
+
+    Returns:
+        (packed uint8 1차원 배열, meta int64 (n, 7): offset, h, w, crop_x, crop_y, img_w, img_h)
+    """
+    from PIL import ImageFont
+
+    font = ImageFont.truetype(font_path, font_size, index=font_index)
+
+    chunks = []
+    meta = np.zeros((len(texts), 7), dtype=np.int64)
+    offset = 0
+    for i, text in enumerate(texts):
+        rgba, img_width, img_height = draw_subtitle_image(text, font, outline_width)
+        premul, alpha, crop_x, crop_y = premultiply(rgba)
+        h, w = alpha.shape[:2]
+
+        if cache_paths and cache_paths[i]:
+            tmp_path = f"{cache_paths[i]}.{os.getpid()}.tmp"
+            try:
+                save_subtitle_raster(tmp_path, (premul, alpha, crop_x, crop_y, img_width, img_height))
+                os.replace(tmp_path, cache_paths[i])
+            except OSError:
+                pass
+
+        chunks += [premul.ravel(), alpha.ravel()]
+        meta[i] = (offset, h, w, crop_x, crop_y, img_width, img_height)
+        offset += h * w * 4
+
+    packed = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint8)
+    return packed, meta
+
+
+def unpack_subtitle_rasters(packed: np.ndarray, meta: np.ndarray) -> list:
+    """rasterize_subtitles_worker 결과 → [(premul, alpha, crop_x, crop_y, img_w, img_h)] (복사 없는 뷰)"""
+    rasters = []
+    for offset, h, w, crop_x, crop_y, img_width, img_height in meta.tolist():
+        premul = packed[offset:offset + h * w * 3].reshape(h, w, 3)
+        alpha = packed[offset + h * w * 3:offset + h * w * 4].reshape(h, w, 1)
+        rasters.append((premul, alpha, crop_x, crop_y, img_width, img_height))
+    return rasters
+
+
+class ShapeLayer:
+    """
+    반투명 단색 사각형 레이어
+
+    알파 계수와 색상 항을 8비트 고정소수점으로 미리 계산하고 작업 버퍼를 재사용하여,
+    프레임마다 영역 하나에 대한 정수 곱셈/덧셈/시프트만 수행함
+
+    out = (frame * (256 - a) + rgb * a + 128) >> 8,  a = round(opacity * 256)
+    """
+
+    def __init__(self, rect: tuple, rgb: tuple, opacity: float):
+        self.rect = tuple(int(v) for v in rect)
+        self.rgb = tuple(int(v) for v in rgb)
+        self.opacity = float(opacity)
+
+        a = int(round(self.opacity * 256))
+        self._inv = np.uint16(256 - a)
+        self._color = (np.array(self.rgb, dtype=np.uint16) * a + 128).astype(np.uint16)
+        self._buffer = None
+
+    def __getstate__(self):
+        # 작업 버퍼는 프로세스마다 새로 할당
+        state = self.__dict__.copy()
+        state['_buffer'] = None
+        return state
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """프레임(H, W, 3 uint8)에 합성 (in-place, 프레임 밖은 잘라냄)"""
+        fh, fw = frame.shape[:2]
+        x0, y0 = max(self.rect[0], 0), max(self.rect[1], 0)
+        x1, y1 = min(self.rect[2], fw), min(self.rect[3], fh)
+        if x0 >= x1 or y0 >= y1:
+            return frame
+
+        region = frame[y0:y1, x0:x1]
+        if self._buffer is None or self._buffer.shape != region.shape:
+            self._buffer = np.empty(region.shape, dtype=np.uint16)
+
+        buf = self._buffer
+        np.multiply(region, self._inv, out=buf)
+        buf += self._color
+        buf >>= 8
+        region[...] = buf
+        return frame
+
+
+class SubtitleOverlay:
+    """
+    구간 인덱스 기반 자막 오버레이 레이어
+
+    자막 래스터는 텍스트별로 한 번만 저장하고, 시작/끝 시간 배열을 정렬해 두어
+    프레임마다 searchsorted로 O(log n)에 활성 자막을 찾음.
+    자막 수와 관계없이 프레임당 비용이 일정함.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._rasters = []      # [(premul, alpha, x, y)]
+        self._raster_ids = {}   # key -> raster index
+        self._entries = []      # [(start, end, raster index)]
+        self.starts = np.zeros(0)
+        self.ends = np.zeros(0)
+        self.ids = np.zeros(0, dtype=np.int64)
+
+    def has_raster(self, key) -> bool:
+        return key in self._raster_ids
+
+    def add_raster(self, key, rgba: np.ndarray, x: int, y: int) -> int:
+        """자막 래스터 등록 (x, y는 래스터 좌상단의 프레임 좌표)"""
+        if key in self._raster_ids:
+            return self._raster_ids[key]
+        premul, alpha, cx, cy = premultiply(rgba)
+        self._rasters.append((premul, alpha, x + cx, y + cy))
+        self._raster_ids[key] = len(self._rasters) - 1
+        return self._raster_ids[key]
+
+    def add_premultiplied(self, key, premul: np.ndarray, alpha: np.ndarray, x: int, y: int) -> int:
+        """이미 프리멀티플라이드된 래스터 등록 (x, y는 잘라낸 래스터의 프레임 좌표)"""
+        if key in self._raster_ids:
+            return self._raster_ids[key]
+        self._rasters.append((premul, alpha, x, y))
+        self._raster_ids[key] = len(self._rasters) - 1
+        return self._raster_ids[key]
+
+    def add(self, start: float, end: float, key):
+        """[start, end) 구간에 key 래스터 표시"""
+        if end > start:
+            self._entries.append((start, end, self._raster_ids[key]))
+
+    def build(self):
+        """구간 인덱스 생성 (add 후 한 번 호출)"""
+        self._entries.sort(key=lambda e: e[0])
+        self.starts = np.array([e[0] for e in self._entries], dtype=np.float64)
+        self.ends = np.array([e[1] for e in self._entries], dtype=np.float64)
+        self.ids = np.array([e[2] for e in self._entries], dtype=np.int64)
+        return self
+
+    def active_index(self, t: float) -> int:
+        """t 시점 활성 구간 인덱스 (없으면 -1)"""
+        i = int(np.searchsorted(self.starts, t, side='right')) - 1
+        if i >= 0 and t < self.ends[i]:
+            return i
+        return -1
+
+    def segments(self, duration: float) -> list:
+        """
+        [0, duration) 를 화면이 바뀌지 않는 구간으로 분할
+
+        Returns:
+            [(start, end, raster index 또는 -1)] - 같은 래스터가 이어지는 구간은 병합됨
+        """
+        points = np.concatenate([[0.0, duration], self.starts, self.ends])
+        points = np.unique(np.clip(points, 0.0, duration))
+
+        result = []
+        for start, end in zip(points[:-1], points[1:]):
+            i = self.active_index((start + end) / 2)
+            raster_id = int(self.ids[i]) if i >= 0 else -1
+            if result and result[-1][2] == raster_id:
+                result[-1] = (result[-1][0], float(end), raster_id)
+            else:
+                result.append((float(start), float(end), raster_id))
+        return result
+
+    def composite_raster(self, frame: np.ndarray, raster_id: int) -> np.ndarray:
+        """지정 래스터를 프레임에 합성 (in-place, -1이면 그대로)"""
+        if raster_id >= 0:
+            premul, alpha, x, y = self._rasters[raster_id]
+            blend_premultiplied(frame, premul, alpha, x, y)
+        return frame
+
+    def composite(self, frame: np.ndarray, t: float) -> np.ndarray:
+        """t 시점 활성 자막을 프레임(H, W, 3 uint8)에 합성 (in-place)"""
+        i = self.active_index(t)
+        if i >= 0:
+            premul, alpha, x, y = self._rasters[self.ids[i]]
+            blend_premultiplied(frame, premul, alpha, x, y)
+        return frame
+
+    def moviepy_filter(self, get_frame, t):
+        """MoviePy clip.fl()용 필터 - 배경 프레임에 활성 자막 합성"""
+        frame = np.array(get_frame(t), dtype=np.uint8, copy=True)
+        return self.composite(frame, t)
+
+
+class ClockRenderer:
+    """
+    글리프 아틀라스 기반 디지털 시계 프레임 생성기
+
+    숫자 0-9와 ':' 를 한 번만 래스터화해 두고, 프레임마다 시계 영역만 배경색으로 지운 뒤
+    글리프 8개를 재사용 버퍼에 합성함 (메모리 일정, 1080p 기준 프레임당 약 1ms)
+    """
+
+    GLYPHS = '0123456789:'
+
+    def __init__(self, width: int, height: int, font, bg_rgb: tuple, clock_rgb: tuple):
+        from PIL import Image, ImageDraw
+
+        self.frame = np.empty((height, width, 3), dtype=np.uint8)
+        self.frame[...] = bg_rgb
+        self.bg_rgb = np.array(bg_rgb, dtype=np.uint8)
+
+        # 글리프별 (premul, alpha, x 오프셋, y 오프셋, 전진 폭)
+        ascent, descent = font.getmetrics()
+        pad = max(4, ascent // 4)
+        self._atlas = {}
+        for ch in self.GLYPHS:
+            advance = font.getlength(ch)
+            img = Image.new('RGBA', (int(advance) + pad * 2, ascent + descent + pad * 2), (0, 0, 0, 0))
+            ImageDraw.Draw(img).text((pad, pad), ch, font=font, fill=(*clock_rgb, 255))
+            premul, alpha, cx, cy = premultiply(np.array(img))
+            self._atlas[ch] = (premul, alpha, cx - pad, cy - pad, advance)
+
+        # 기존 렌더링과 같은 세로 위치 (textbbox 높이 기준 가운데)
+        bbox = font.getbbox('00:00:00')
+        self.y = (height - (bbox[3] - bbox[1])) // 2
+        self.width = width
+        self._dirty = None
+
+    def render(self, seconds: int) -> np.ndarray:
+        """seconds 시점 시계 프레임 (재사용 버퍼 반환)"""
+        h = seconds // 3600
+        m = (seconds % 3600) // 60
+        s = seconds % 60
+        time_str = f"{h:02d}:{m:02d}:{s:02d}"
+
+        # 이전 시계 영역 지우기
+        if self._dirty is not None:
+            x0, y0, x1, y1 = self._dirty
+            self.frame[y0:y1, x0:x1] = self.bg_rgb
+
+        total = sum(self._atlas[ch][4] for ch in time_str)
+        x = (self.width - total) / 2
+
+        fh, fw = self.frame.shape[:2]
+        x0, y0, x1, y1 = fw, fh, 0, 0
+        for ch in time_str:
+            premul, alpha, cx, cy, advance = self._atlas[ch]
+            gx, gy = int(round(x)) + cx, self.y + cy
+            blend_premultiplied(self.frame, premul, alpha, gx, gy)
+            x0, y0 = min(x0, gx), min(y0, gy)
+            x1, y1 = max(x1, gx + alpha.shape[1]), max(y1, gy + alpha.shape[0])
+            x += advance
+
+        self._dirty = (max(x0, 0), max(y0, 0), max(x1, 0), max(y1, 0))
+        return self.frame
+
+
+def render_frames(writer, first_frame: int, last_frame: int, fps: float,
+                  overlay: SubtitleOverlay, base_frame: np.ndarray = None,
+                  reader=None, shape: ShapeLayer = None, progress=None):
+    """
+    [first_frame, last_frame) 프레임을 재사용 버퍼 하나에 합성하여 writer로 전송
+
+    Args:
+        base_frame: 정지 배경 (도형까지 합성된 프레임) - reader가 없을 때 사용
+        reader: 동영상 배경 FrameReader
+        shape: 동영상 배경 프레임마다 합성할 ShapeLayer
+        progress: progress(완료 프레임 수) 콜백
+    """
+    height, width = overlay.height, overlay.width
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    total = last_frame - first_frame
+    step = max(1, total // 20)
+    last_index = None
+
+    for n in range(first_frame, last_frame):
+        t = n / fps
+
+        if reader is not None:
+            if not reader.read_into(frame):
+                raise RuntimeError("배경 영상 디코딩 실패")
+            if shape is not None:
+                shape.apply(frame)
+            overlay.composite(frame, t)
+        else:
+            # 정지 배경은 활성 자막이 바뀔 때만 다시 합성
+            index = overlay.active_index(t)
+            if index != last_index:
+                np.copyto(frame, base_frame)
+                overlay.composite(frame, t)
+                last_index = index
+
+        writer.write(frame)
+
+        if progress and (n - first_frame) % step == 0:
+            progress(n - first_frame)
+
+
+def plan_segments(overlay: SubtitleOverlay, duration: float, fps: float, n_segments: int) -> list:
+    """
+    프레임 구간을 n개로 분할 - 균등 분할 지점에 가장 가까운 자막 전환 시점에서 자름
+
+    구간마다 별도 인코더로 인코딩하므로 각 구간의 첫 프레임이 키프레임이 됨
+
+    Returns:
+        [(first_frame, last_frame)]
+    """
+    n_frames = int(np.ceil(duration * fps))
+    n_segments = max(1, min(n_segments, n_frames))
+
+    change_frames = np.unique(np.round(
+        np.array([start for start, _, _ in overlay.segments(duration)]) * fps
+    ).astype(np.int64))
+    change_frames = change_frames[(change_frames > 0) & (change_frames < n_frames)]
+
+    cuts = [0]
+    for k in range(1, n_segments):
+        target = k * n_frames / n_segments
+        if len(change_frames):
+            cut = int(change_frames[np.argmin(np.abs(change_frames - target))])
+        else:
+            cut = int(round(target))
+        if cuts[-1] < cut < n_frames:
+            cuts.append(cut)
+    cuts.append(n_frames)
+
+    return list(zip(cuts[:-1], cuts[1:]))
+
+
+def render_segment_worker(filepath: str, first_frame: int, last_frame: int, fps: float,
+                          overlay: SubtitleOverlay, base_frame: np.ndarray = None,
+                          background_path: str = None, background_duration: float = None,
+                          shape: ShapeLayer = None, threads: int = None,
+                          preset: str = 'medium', extra_args: list = None) -> str:
+    """구간 하나를 합성/인코딩하는 워커 (오디오 없음, 프로세스 풀에서 실행)"""
+    from .ffmpeg import FrameWriter, FrameReader, READ_AHEAD_FRAMES
+
+    reader = None
+    if background_path:
+        start = first_frame / fps
+        if background_duration:
+            start %= background_duration
+        # fps 변환 반올림으로 프레임이 모자라지 않도록 1프레임 여유
+        reader = FrameReader(background_path, overlay.width, overlay.height, fps,
+                             (last_frame - first_frame + 1) / fps, start=start,
+                             read_ahead=READ_AHEAD_FRAMES)
+
+    try:
+        with FrameWriter(filepath, overlay.width, overlay.height, fps, threads=threads,
+                         preset=preset, extra_args=extra_args) as writer:
+            render_frames(writer, first_frame, last_frame, fps, overlay,
+                          base_frame=base_frame, reader=reader, shape=shape)
+    finally:
+        if reader is not None:
+            reader.close()
+
+    return filepath
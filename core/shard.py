@@ -0,0 +1,736 @@
+"""
+Supertonic Sharded Synthesis
+긴 문서 1개를 샤드(연속 청크 범위)로 나눠 여러 작업 노드에서 합성하고 코디네이터가 합침
+
+코디네이터: 문서 → chunk_text → 샤드 대기열 등록 → 샤드별 PCM/청크 길이 수집 → 최종 WAV + 타임코드
+워커:       대기열에서 샤드를 선점해 합성 → PCM과 청크별 샘플 수를 반환
+
+전송 계층은 교체 가능 (ShardTransport, TRANSPORTS에 등록):
+    sqlite:<경로>   SQLite 대기열 (한 머신의 여러 프로세스용, PCM은 BLOB으로 저장)
+    dir:<경로>      공유 폴더 대기열 (여러 머신용 NFS/SMB 등, 배타적 파일 생성으로 샤드 선점)
+
+결정성: 청크마다 (seed, 청크 인덱스) 시드로 잡음을 만들고, 배치는 샤드 구성과 무관하게
+챕터 안에서 batch_size개씩 고정으로 묶음. 따라서 같은 seed면 샤드/워커 수와 관계없이
+단일 노드 실행(local)과 같은 결과가 나옴 (노드 간에는 같은 onnxruntime/CPU 계열 기준).
+
+사용법:
+    python -m core.shard run book.txt --queue dir:/mnt/shared/queue --out book.wav --seed 42
+    python -m core.shard work --queue dir:/mnt/shared/queue               # 작업 노드마다 실행
+    python -m core.shard run book.docx --chapters --queue sqlite:queue.sqlite --local-workers 2 --out book.wav
+    python -m core.shard local book.txt --seed 42 --out book.wav          # 단일 노드 (기준 결과)
+"""
+import os
+import re
+import abc
+import io
+import sys
+import json
+import time
+import socket
+import sqlite3
+import hashlib
+import argparse
+import multiprocessing
+
+import numpy as np
+import soundfile as sf
+
+from .utils import read_text_file, get_max_length
+from .tts import chunk_text
+from .batch import CHUNK_GAP_SEC
+
+
+# 챕터 제목 줄 (제1장, 1장, Chapter 3, Part 2, 마크다운 제목)
+CHAPTER_PATTERN = re.compile(
+    r'^[ \t]*(?:제\s*\d+\s*[장편부화]|\d+\s*[장화]\b|(?:chapter|part)\s+(?:\d+|[ivxlc]+)\b|#{1,3}\s)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+DEFAULT_SHARD_CHUNKS = 32
+DEFAULT_MAX_RETRIES = 2
+# 선점 후 이 시간 안에 결과가 없으면 워커가 죽은 것으로 보고 다른 워커에 다시 배정
+SHARD_LEASE_SEC = 1800
+LEASE_EXPIRED_MESSAGE = "워커 응답 없음 (선점 시간 초과)"
+
+
+# ===== 분할 계획 =====
+
+def split_chapters(text: str) -> list:
+    """챕터 제목 줄 기준으로 텍스트 분할 (제목이 없으면 전체가 한 챕터)"""
+    starts = [m.start() for m in CHAPTER_PATTERN.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    bounds = starts + [len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:]) if text[a:b].strip()]
+
+
+class ShardPlan:
+    """
+    문서 1개의 청크/배치/샤드 구성
+
+    배치: 챕터 안의 연속 청크 batch_size개 (샤드 구성과 무관하게 고정)
+    샤드: 같은 챕터의 연속 배치들을 청크 shard_chunks개 이상이 되도록 묶은 것
+    """
+
+    def __init__(self, text: str, language: str, batch_size: int = 4,
+                 shard_chunks: int = DEFAULT_SHARD_CHUNKS, by_chapter: bool = False):
+        max_len = get_max_length(language)
+        sections = split_chapters(text) if by_chapter else [text]
+
+        self.chunks = []
+        self.chapters = []
+        self.shards = []    # [[배치(청크 인덱스 목록), ...], ...]
+
+        for chapter, section in enumerate(sections):
+            start = len(self.chunks)
+            for chunk in chunk_text(section, max_len=max_len):
+                if chunk.strip():
+                    self.chunks.append(chunk)
+                    self.chapters.append(chapter)
+
+            indices = list(range(start, len(self.chunks)))
+            shard = []
+            for b in range(0, len(indices), batch_size):
+                shard.append(indices[b:b + batch_size])
+                if sum(len(batch) for batch in shard) >= shard_chunks:
+                    self.shards.append(shard)
+                    shard = []
+            if shard:
+                self.shards.append(shard)
+
+    def shard_specs(self, settings: dict) -> list:
+        """샤드 작업 명세 목록 (워커에 보내는 JSON, job_id는 명세 전체의 해시)"""
+        specs = []
+        for k, batches in enumerate(self.shards):
+            indices = [i for batch in batches for i in batch]
+            specs.append(dict(settings, shard=k, batches=batches,
+                              texts=[self.chunks[i] for i in indices]))
+
+        raw = json.dumps(specs, ensure_ascii=False, sort_keys=True)
+        job_id = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+        for spec in specs:
+            spec['job_id'] = job_id
+        return specs
+
+
+# ===== 워커 =====
+
+_engine = None
+
+
+def _get_engine():
+    """프로세스당 TTS 엔진 1개 (모델 1회 로드)"""
+    global _engine
+    if _engine is None:
+        from .tts import get_tts_engine
+        _engine = get_tts_engine()
+        _engine.init_model()
+    return _engine
+
+
+def synthesize_shard(spec: dict) -> tuple:
+    """샤드 1개 합성 → (청크 순서대로 이은 PCM float32, {'sample_rate', 'lengths'})"""
+    engine = _get_engine()
+    indices = [i for batch in spec['batches'] for i in batch]
+    texts = dict(zip(indices, spec['texts']))
+
+    audio = {}
+    for batch in spec['batches']:
+        for j, wav in engine.synthesize_chunks(
+                [texts[i] for i in batch], spec['language'], spec['voice_name'],
+                spec['speed'], spec['quality'], batch_size=len(batch),
+                seeds=[[spec['seed'], i] for i in batch]):
+            audio[batch[j]] = wav.astype(np.float32, copy=False)
+
+    parts = [audio[i] for i in indices]
+    pcm = np.concatenate(parts) if parts else np.array([], dtype=np.float32)
+    return pcm, {'sample_rate': engine.sample_rate, 'lengths': [len(p) for p in parts]}
+
+
+def run_worker(queue: str, worker_id: str = None, poll_interval: float = 5.0,
+               exit_when_idle: bool = False) -> int:
+    """대기열에서 샤드를 가져와 합성 (exit_when_idle=False면 계속 대기) → 처리한 샤드 수"""
+    transport = open_transport(queue)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    processed = 0
+
+    try:
+        while True:
+            spec = transport.claim(worker_id)
+            if spec is None:
+                if exit_when_idle:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            name = f"[{spec['job_id']}#{spec['shard']}]"
+            print(f"{name} 합성 시작 (청크 {len(spec['texts'])}개, {worker_id})", flush=True)
+            try:
+                pcm, meta = synthesize_shard(spec)
+            except Exception as e:
+                state = transport.fail(spec['job_id'], spec['shard'], f"오류 발생: {e}")
+                print(f"{name} {state}: {e}", flush=True)
+                continue
+
+            transport.complete(spec['job_id'], spec['shard'], pcm, meta)
+            processed += 1
+            print(f"{name} 완료 ({len(pcm) / meta['sample_rate']:.1f}초)", flush=True)
+    finally:
+        transport.close()
+
+    return processed
+
+
+# ===== 전송 계층 =====
+
+class ShardTransport(abc.ABC):
+    """
+    코디네이터 ↔ 워커 전송 계층 인터페이스
+
+    샤드 상태: pending → running → done / failed
+    시도 횟수는 선점할 때마다 1씩 늘고, 실패 기록 또는 선점 만료(lease초 동안 결과 없음) 시
+    시도 횟수가 max_retries를 넘었으면 failed, 아니면 다시 pending이 됨
+    """
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, lease: float = SHARD_LEASE_SEC):
+        self.max_retries = max_retries
+        self.lease = lease
+
+    @abc.abstractmethod
+    def submit(self, job_id: str, specs: list):
+        """샤드 등록 (이미 있는 샤드는 그대로 두므로 재실행 시 이어서 처리)"""
+
+    @abc.abstractmethod
+    def claim(self, worker_id: str):
+        """처리할 샤드 명세 1개를 선점 → dict 또는 None"""
+
+    @abc.abstractmethod
+    def complete(self, job_id: str, shard: int, pcm: np.ndarray, meta: dict):
+        """샤드 결과(PCM, 청크별 샘플 수 등 meta) 저장 → done"""
+
+    @abc.abstractmethod
+    def fail(self, job_id: str, shard: int, message: str) -> str:
+        """실패 기록 → 새 상태 (재시도 횟수가 남았으면 pending)"""
+
+    @abc.abstractmethod
+    def release(self, worker_id: str, message: str) -> int:
+        """worker_id가 선점 중인 샤드를 실패로 기록 (워커 비정상 종료 시) → 샤드 수"""
+
+    @abc.abstractmethod
+    def counts(self, job_id: str) -> dict:
+        """상태별 샤드 수 (만료된 선점은 pending/failed로 반영)"""
+
+    @abc.abstractmethod
+    def fetch(self, job_id: str, shard: int) -> tuple:
+        """완료된 샤드 결과 → (PCM float32, meta)"""
+
+    @abc.abstractmethod
+    def errors(self, job_id: str) -> list:
+        """실패한 샤드의 (샤드 번호, 메시지) 목록"""
+
+    def close(self):
+        pass
+
+
+class SQLiteTransport(ShardTransport):
+    """
+    SQLite 대기열 (한 머신의 여러 프로세스용)
+
+    NFS/SMB 같은 네트워크 드라이브에서는 SQLite 잠금을 믿을 수 없으므로
+    여러 머신이 함께 쓰는 대기열은 dir: 전송 계층을 사용
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # isolation_level=None: 선점은 BEGIN IMMEDIATE로 직접 잠금
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS shards (
+                job_id TEXT NOT NULL,
+                shard INTEGER NOT NULL,
+                spec TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                claimed REAL,
+                message TEXT,
+                meta TEXT,
+                pcm BLOB,
+                PRIMARY KEY (job_id, shard)
+            )
+        """)
+
+    def _expire(self):
+        """선점 만료 샤드 → 시도 횟수에 따라 pending / failed"""
+        self._conn.execute(
+            "UPDATE shards SET state = CASE WHEN attempts <= ? THEN 'pending' ELSE 'failed' END, "
+            "message = ? WHERE state = 'running' AND claimed < ?",
+            (self.max_retries, LEASE_EXPIRED_MESSAGE, time.time() - self.lease)
+        )
+
+    def submit(self, job_id: str, specs: list):
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO shards (job_id, shard, spec, state) VALUES (?, ?, ?, 'pending')",
+            [(job_id, spec['shard'], json.dumps(spec, ensure_ascii=False)) for spec in specs]
+        )
+        self._conn.execute("COMMIT")
+
+    def claim(self, worker_id: str):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._expire()
+            row = self._conn.execute(
+                "SELECT job_id, shard, spec FROM shards WHERE state = 'pending' "
+                "ORDER BY job_id, shard LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE shards SET state = 'running', attempts = attempts + 1, worker = ?, "
+                    "claimed = ? WHERE job_id = ? AND shard = ?",
+                    (worker_id, time.time(), row[0], row[1])
+                )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return json.loads(row[2]) if row else None
+
+    def complete(self, job_id: str, shard: int, pcm: np.ndarray, meta: dict):
+        self._conn.execute(
+            "UPDATE shards SET state = 'done', meta = ?, pcm = ?, message = NULL "
+            "WHERE job_id = ? AND shard = ?",
+            (json.dumps(meta), sqlite3.Binary(np.ascontiguousarray(pcm, dtype=np.float32).tobytes()),
+             job_id, shard)
+        )
+
+    def fail(self, job_id: str, shard: int, message: str) -> str:
+        attempts, = self._conn.execute(
+            "SELECT attempts FROM shards WHERE job_id = ? AND shard = ?", (job_id, shard)
+        ).fetchone()
+        state = 'pending' if attempts <= self.max_retries else 'failed'
+        self._conn.execute(
+            "UPDATE shards SET state = ?, message = ? WHERE job_id = ? AND shard = ?",
+            (state, message, job_id, shard)
+        )
+        return state
+
+    def release(self, worker_id: str, message: str) -> int:
+        rows = self._conn.execute(
+            "SELECT job_id, shard FROM shards WHERE state = 'running' AND worker = ?", (worker_id,)
+        ).fetchall()
+        for job_id, shard in rows:
+            self.fail(job_id, shard, message)
+        return len(rows)
+
+    def counts(self, job_id: str) -> dict:
+        self._expire()
+        return dict(self._conn.execute(
+            "SELECT state, COUNT(*) FROM shards WHERE job_id = ? GROUP BY state", (job_id,)
+        ))
+
+    def fetch(self, job_id: str, shard: int) -> tuple:
+        meta, pcm = self._conn.execute(
+            "SELECT meta, pcm FROM shards WHERE job_id = ? AND shard = ? AND state = 'done'",
+            (job_id, shard)
+        ).fetchone()
+        return np.frombuffer(pcm, dtype=np.float32), json.loads(meta)
+
+    def errors(self, job_id: str) -> list:
+        return self._conn.execute(
+            "SELECT shard, message FROM shards WHERE job_id = ? AND state = 'failed' ORDER BY shard",
+            (job_id,)
+        ).fetchall()
+
+    def close(self):
+        self._conn.close()
+
+
+class DirectoryTransport(ShardTransport):
+    """
+    공유 폴더 대기열 (여러 머신용) - <폴더>/<job_id>/ 아래 샤드마다
+        00000.json      명세
+        00000.claim     선점 표시 (배타적 생성, 내용은 워커 ID, 수정 시간이 lease보다 오래되면 만료)
+        00000.attempts  시도 기록 (선점마다 한 줄)
+        00000.npz       결과 (pcm, meta)
+        00000.err       실패 메시지 (실패마다 한 줄)
+    """
+
+    def __init__(self, root: str, **kwargs):
+        super().__init__(**kwargs)
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, job_id: str, shard: int, ext: str) -> str:
+        return os.path.join(self.root, job_id, f"{shard:05d}{ext}")
+
+    def _lines(self, job_id: str, shard: int, ext: str) -> list:
+        try:
+            with open(self._path(job_id, shard, ext), 'r', encoding='utf-8') as f:
+                return f.read().splitlines()
+        except OSError:
+            return []
+
+    def _state(self, job_id: str, shard: int) -> str:
+        if os.path.exists(self._path(job_id, shard, '.npz')):
+            return 'done'
+        try:
+            if time.time() - os.path.getmtime(self._path(job_id, shard, '.claim')) < self.lease:
+                return 'running'
+        except OSError:
+            pass
+        # 선점 표시가 없거나 만료됨
+        if len(self._lines(job_id, shard, '.attempts')) > self.max_retries:
+            return 'failed'
+        return 'pending'
+
+    def _shards(self, job_id: str) -> list:
+        try:
+            names = os.listdir(os.path.join(self.root, job_id))
+        except OSError:
+            return []
+        return sorted(int(name[:-5]) for name in names if name.endswith('.json'))
+
+    def submit(self, job_id: str, specs: list):
+        os.makedirs(os.path.join(self.root, job_id), exist_ok=True)
+        for spec in specs:
+            path = self._path(job_id, spec['shard'], '.json')
+            if not os.path.exists(path):
+                with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+                    json.dump(spec, f, ensure_ascii=False)
+                os.replace(f"{path}.tmp", path)
+
+    def claim(self, worker_id: str):
+        for job_id in sorted(os.listdir(self.root)):
+            for shard in self._shards(job_id):
+                if self._state(job_id, shard) != 'pending':
+                    continue
+                claim_path = self._path(job_id, shard, '.claim')
+                if os.path.exists(claim_path):
+                    # 만료된 선점은 이름을 바꿔 치움 (동시에 시도해도 한 워커만 성공)
+                    stale = f"{claim_path}.{worker_id.replace(':', '_')}.stale"
+                    try:
+                        os.replace(claim_path, stale)
+                        if time.time() - os.path.getmtime(stale) < self.lease:
+                            # 그 사이 다른 워커가 새로 선점한 표시였으면 되돌림
+                            os.replace(stale, claim_path)
+                            continue
+                        os.remove(stale)
+                    except OSError:
+                        continue
+                try:
+                    fd = os.open(claim_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                except FileExistsError:
+                    continue
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(worker_id)
+                with open(self._path(job_id, shard, '.attempts'), 'a', encoding='utf-8') as f:
+                    f.write(f"{worker_id} {time.time():.0f}\n")
+                with open(self._path(job_id, shard, '.json'), 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        return None
+
+    def complete(self, job_id: str, shard: int, pcm: np.ndarray, meta: dict):
+        path = self._path(job_id, shard, '.npz')
+        buffer = io.BytesIO()
+        np.savez(buffer, pcm=np.asarray(pcm, dtype=np.float32), meta=json.dumps(meta))
+        with open(f"{path}.tmp", 'wb') as f:
+            f.write(buffer.getvalue())
+        os.replace(f"{path}.tmp", path)
+        try:
+            os.remove(self._path(job_id, shard, '.claim'))
+        except OSError:
+            pass
+
+    def fail(self, job_id: str, shard: int, message: str) -> str:
+        with open(self._path(job_id, shard, '.err'), 'a', encoding='utf-8') as f:
+            f.write(message.replace('\n', ' ') + '\n')
+        try:
+            os.remove(self._path(job_id, shard, '.claim'))
+        except OSError:
+            pass
+        return self._state(job_id, shard)
+
+    def release(self, worker_id: str, message: str) -> int:
+        released = 0
+        for job_id in sorted(os.listdir(self.root)):
+            for shard in self._shards(job_id):
+                if self._lines(job_id, shard, '.claim') == [worker_id]:
+                    self.fail(job_id, shard, message)
+                    released += 1
+        return released
+
+    def counts(self, job_id: str) -> dict:
+        result = {}
+        for shard in self._shards(job_id):
+            state = self._state(job_id, shard)
+            result[state] = result.get(state, 0) + 1
+        return result
+
+    def fetch(self, job_id: str, shard: int) -> tuple:
+        with np.load(self._path(job_id, shard, '.npz')) as data:
+            return data['pcm'], json.loads(str(data['meta']))
+
+    def errors(self, job_id: str) -> list:
+        result = []
+        for shard in self._shards(job_id):
+            if self._state(job_id, shard) == 'failed':
+                if os.path.exists(self._path(job_id, shard, '.claim')):
+                    message = LEASE_EXPIRED_MESSAGE
+                else:
+                    message = (self._lines(job_id, shard, '.err') or [LEASE_EXPIRED_MESSAGE])[-1]
+                result.append((shard, message))
+        return result
+
+
+# 대기열 주소 접두어 → 전송 계층 (다른 전송 계층은 여기에 등록)
+TRANSPORTS = {
+    'sqlite': SQLiteTransport,
+    'dir': DirectoryTransport,
+}
+
+
+def open_transport(queue: str) -> ShardTransport:
+    """대기열 주소 → 전송 계층 ('sqlite:경로', 'dir:경로', 접두어 없으면 확장자로 판단)"""
+    scheme, sep, target = queue.partition(':')
+    if sep and scheme in TRANSPORTS:
+        return TRANSPORTS[scheme](target)
+    if queue.endswith(('.sqlite', '.db')):
+        return SQLiteTransport(queue)
+    return DirectoryTransport(queue)
+
+
+# ===== 조립 =====
+
+def assemble_shards(plan: ShardPlan, results, out_path: str, settings: dict) -> float:
+    """
+    샤드 결과를 청크 순서대로 0.3초 간격으로 이어 WAV + 타임코드 JSON 저장 → 전체 길이 (초)
+
+    results: 샤드 순서대로 (PCM, meta)를 내는 반복자 (샤드 1개씩만 메모리에 올림)
+    """
+    out_dir = os.path.dirname(out_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    entries = []
+    writer = None
+    sample_rate = None
+    position = 0
+
+    try:
+        for k, (pcm, meta) in enumerate(results):
+            if writer is None:
+                sample_rate = meta['sample_rate']
+                writer = sf.SoundFile(tmp_path, 'w', samplerate=sample_rate, channels=1, format='WAV')
+                gap = np.zeros(int(CHUNK_GAP_SEC * sample_rate), dtype=np.float32)
+
+            indices = [i for batch in plan.shards[k] for i in batch]
+            offset = 0
+            for i, length in zip(indices, meta['lengths']):
+                if i > 0:
+                    writer.write(gap)
+                    position += len(gap)
+                writer.write(pcm[offset:offset + length])
+                entries.append({'index': i, 'chapter': plan.chapters[i], 'shard': k,
+                                'text': plan.chunks[i],
+                                'start': round(position / sample_rate, 4),
+                                'duration': round(length / sample_rate, 4)})
+                offset += length
+                position += length
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        raise RuntimeError("합성된 샤드가 없습니다.")
+    os.replace(tmp_path, out_path)
+
+    duration = position / sample_rate
+    index = {
+        'settings': settings,
+        'sample_rate': sample_rate,
+        'duration': round(duration, 4),
+        'output': os.path.basename(out_path),
+        'chunks': entries,
+    }
+    index_path = f"{os.path.splitext(out_path)[0]}.json"
+    with open(f"{index_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(f"{index_path}.tmp", index_path)
+
+    return duration
+
+
+# ===== 코디네이터 =====
+
+def _load_plan(source: str, language: str, batch_size: int, shard_chunks: int,
+               by_chapter: bool) -> ShardPlan:
+    text = read_text_file(source)
+    if text.startswith(("파일 읽기 오류", "지원하지 않는 파일 형식")):
+        raise ValueError(text)
+    plan = ShardPlan(text, language, batch_size, shard_chunks, by_chapter)
+    if not plan.chunks:
+        raise ValueError(f"합성할 텍스트가 없습니다: {source}")
+    return plan
+
+
+def run_local(source: str, out_path: str, voice_name: str, language: str, speed: float = 1.0,
+              quality: int = 5, seed: int = 0, batch_size: int = 4,
+              shard_chunks: int = DEFAULT_SHARD_CHUNKS, by_chapter: bool = False) -> float:
+    """단일 노드 실행 (같은 계획을 이 프로세스에서 순서대로 합성) → 전체 길이 (초)"""
+    plan = _load_plan(source, language, batch_size, shard_chunks, by_chapter)
+    settings = {'language': language, 'voice_name': voice_name, 'speed': float(speed),
+                'quality': int(quality), 'seed': int(seed)}
+    specs = plan.shard_specs(settings)
+
+    def results():
+        for spec in specs:
+            print(f"[{spec['shard'] + 1}/{len(specs)}] 청크 {len(spec['texts'])}개 합성", flush=True)
+            yield synthesize_shard(spec)
+
+    return assemble_shards(plan, results(), out_path, settings)
+
+
+def run_coordinator(source: str, out_path: str, queue: str, voice_name: str, language: str,
+                    speed: float = 1.0, quality: int = 5, seed: int = 0, batch_size: int = 4,
+                    shard_chunks: int = DEFAULT_SHARD_CHUNKS, by_chapter: bool = False,
+                    local_workers: int = 0, poll_interval: float = 2.0) -> float:
+    """
+    샤드를 대기열에 올리고 모두 끝나면 조립 → 전체 길이 (초)
+
+    같은 인자로 다시 실행하면 job_id가 같으므로 완료된 샤드는 다시 합성하지 않음.
+    local_workers > 0이면 이 머신에서도 워커 프로세스를 띄움.
+    """
+    plan = _load_plan(source, language, batch_size, shard_chunks, by_chapter)
+    settings = {'language': language, 'voice_name': voice_name, 'speed': float(speed),
+                'quality': int(quality), 'seed': int(seed)}
+    specs = plan.shard_specs(settings)
+    job_id = specs[0]['job_id']
+
+    transport = open_transport(queue)
+    transport.submit(job_id, specs)
+    print(f"작업 {job_id}: 청크 {len(plan.chunks)}개 → 샤드 {len(specs)}개 ({queue})", flush=True)
+
+    # 로컬 워커는 워커마다 별도 프로세스 (한 워커가 죽어도 다른 워커의 샤드에는 영향 없음)
+    workers = {}    # 워커 ID → Process
+    spawned = 0
+    last = None
+
+    try:
+        while True:
+            # 끝난 로컬 워커 정리 - 비정상 종료면 선점 중이던 샤드를 실패 1회로 기록
+            for worker_id, process in list(workers.items()):
+                if process.is_alive():
+                    continue
+                process.join()
+                del workers[worker_id]
+                if process.exitcode != 0:
+                    released = transport.release(
+                        worker_id, f"로컬 워커 비정상 종료 (종료 코드 {process.exitcode})"
+                    )
+                    print(f"로컬 워커 {worker_id} 비정상 종료 (종료 코드 {process.exitcode}, "
+                          f"샤드 {released}개 반환)", flush=True)
+
+            counts = transport.counts(job_id)
+            if counts != last:
+                print(f"작업 {job_id}: {counts}", flush=True)
+                last = counts
+
+            if counts.get('failed'):
+                shard, message = transport.errors(job_id)[0]
+                raise RuntimeError(f"샤드 {shard} 실패: {message}")
+            if counts.get('done', 0) == len(specs):
+                break
+
+            # 로컬 워커는 대기열이 비면 끝나므로 재시도/선점 만료로 돌아온 샤드가 있으면 다시 띄움
+            if counts.get('pending'):
+                while len(workers) < local_workers:
+                    spawned += 1
+                    worker_id = f"{socket.gethostname()}:{os.getpid()}:local{spawned}"
+                    process = multiprocessing.Process(
+                        target=run_worker, args=(queue, worker_id, poll_interval, True)
+                    )
+                    process.start()
+                    workers[worker_id] = process
+
+            time.sleep(poll_interval)
+    except BaseException:
+        for process in workers.values():
+            process.terminate()
+        transport.close()
+        raise
+    finally:
+        for process in workers.values():
+            process.join()
+
+    try:
+        results = (transport.fetch(job_id, k) for k in range(len(specs)))
+        return assemble_shards(plan, results, out_path, settings)
+    finally:
+        transport.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Supertonic 긴 문서 분산 합성")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_document_args(p):
+        p.add_argument("source", help="TXT/DOCX 문서")
+        p.add_argument("--out", type=str, required=True, help="최종 WAV 경로 (타임코드는 같은 이름의 .json)")
+        p.add_argument("--voice", type=str, default="F1", help="음성 (예: F1, M2)")
+        p.add_argument("--lang", type=str, default="ko", help="언어 코드 (ko, en, es, pt, fr)")
+        p.add_argument("--speed", type=float, default=1.0)
+        p.add_argument("--quality", type=int, default=5, help="디노이징 단계 수")
+        p.add_argument("--seed", type=int, default=0, help="잡음 시드 (같으면 같은 결과)")
+        p.add_argument("--batch-size", type=int, default=4, help="한 번에 추론할 청크 수")
+        p.add_argument("--shard-chunks", type=int, default=DEFAULT_SHARD_CHUNKS, help="샤드당 청크 수")
+        p.add_argument("--chapters", action="store_true", help="챕터 경계에서 샤드를 나눔")
+
+    p_run = sub.add_parser("run", help="코디네이터: 샤드 등록 → 수집 → 조립")
+    add_document_args(p_run)
+    p_run.add_argument("--queue", type=str, required=True, help="대기열 (여러 머신은 dir:공유 폴더, 한 머신은 sqlite:경로)")
+    p_run.add_argument("--local-workers", type=int, default=0, help="이 머신에서 띄울 워커 프로세스 수")
+    p_run.add_argument("--poll", type=float, default=2.0, help="상태 확인 간격 (초)")
+
+    p_local = sub.add_parser("local", help="단일 노드 실행")
+    add_document_args(p_local)
+
+    p_work = sub.add_parser("work", help="워커: 대기열의 샤드를 합성")
+    p_work.add_argument("--queue", type=str, required=True, help="대기열 (여러 머신은 dir:공유 폴더, 한 머신은 sqlite:경로)")
+    p_work.add_argument("--worker-id", type=str, default=None)
+    p_work.add_argument("--poll", type=float, default=5.0, help="대기열 확인 간격 (초)")
+    p_work.add_argument("--exit-when-idle", action="store_true", help="대기열이 비면 종료")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "work":
+            count = run_worker(args.queue, args.worker_id, args.poll, args.exit_when_idle)
+            print(f"샤드 {count}개 처리")
+            return 0
+
+        common = dict(voice_name=args.voice, language=args.lang, speed=args.speed,
+                      quality=args.quality, seed=args.seed, batch_size=max(1, args.batch_size),
+                      shard_chunks=max(1, args.shard_chunks), by_chapter=args.chapters)
+        if args.command == "run":
+            duration = run_coordinator(args.source, args.out, args.queue,
+                                       local_workers=max(0, args.local_workers),
+                                       poll_interval=args.poll, **common)
+        else:
+            duration = run_local(args.source, args.out, **common)
+    except (ValueError, RuntimeError) as e:
+        print(f"오류 발생: {e}")
+        return 1
+    except KeyboardInterrupt:
+        return 130
+
+    print(f"완료: {args.out} ({duration:.1f}초)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,8 +5,45 @@ Stable-TS 기반 Forced Alignment 자막 타이밍 생성 (CPU 전용)
 import os
 import numpy as np
 import soundfile as sf
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-from .utils import TEMP_DIR
+from .utils import hash_file
+from .cache import DiskCache, make_key, hash_text
+from .workspace import JobWorkspace, get_pool_context
+
+
+# Stable-TS 모델 (small - base보다 정확도 높음)
+STABLE_TS_MODEL = "small"
+
+# 문장별 WAV 병합 시 사이에 들어가는 묵음 길이 (export_merged_audio와 동일)
+CLIP_GAP_SEC = 0.3
+
+
+def mergeable_clips(clip_paths: list) -> list:
+    """
+    병합 WAV에 실제로 들어가는 클립 여부 목록 (export_merged_audio와 같은 규칙)
+
+    파일이 없거나 첫 클립과 샘플레이트가 다른 클립은 병합에서 빠짐
+    """
+    result = []
+    sample_rate = None
+    for path in clip_paths:
+        if not path or not os.path.exists(path):
+            result.append(False)
+            continue
+        sr = sf.info(path).samplerate
+        if sample_rate is None:
+            sample_rate = sr
+        result.append(sr == sample_rate)
+    return result
+
+
+# 윈도우 분할 정렬 설정
+WINDOWED_MIN_DURATION = 600.0   # 이 길이(초) 이상의 오디오는 윈도우 분할 정렬 사용
+WINDOW_TARGET_SEC = 120.0       # 윈도우 목표 길이(초)
+WINDOW_OVERLAP_LINES = 3        # 이웃 윈도우와 겹쳐 정렬하는 라인 수 (경계 오차 흡수)
+WINDOW_MIN_COVERAGE = 0.6       # 자기 구간 발화 시간 중 정렬된 라인이 덮어야 하는 최소 비율
+WINDOW_MIN_LINE_SEC = 0.05      # 정렬된 라인 길이가 이보다 짧으면 오디오에 없는 텍스트로 판단
 
 
 class SubtitleGenerator:
@@ -14,6 +51,8 @@ class SubtitleGenerator:
 
     def __init__(self):
         self.stable_model = None
+        # 정렬/인식 결과 영구 캐시 (오디오 해시 + 자막 해시 + 언어 + 모델)
+        self.result_cache = DiskCache('alignment', max_entries=1000)
 
     def init_model(self):
         """Stable-TS 모델 초기화 (CPU 강제)"""
@@ -21,11 +60,11 @@ class SubtitleGenerator:
             return
 
         import stable_whisper
-        print("Stable-TS 모델 로드 중... (CPU 모드, small)")
+        print(f"Stable-TS 모델 로드 중... (CPU 모드, {STABLE_TS_MODEL})")
 
-        # CPU 강제 설정 - small 모델 사용 (base보다 정확도 높음)
-        self.stable_model = stable_whisper.load_model("small", device="cpu")
-        print("Stable-TS 모델 로드 완료! (CPU, small)")
+        # CPU 강제 설정
+        self.stable_model = stable_whisper.load_model(STABLE_TS_MODEL, device="cpu")
+        print(f"Stable-TS 모델 로드 완료! (CPU, {STABLE_TS_MODEL})")
 
     def transcribe_with_alignment(self, audio_path: str, language: str = 'ko') -> dict:
         """Stable-TS로 오디오 분석하여 단어별 정확한 타임스탬프 추출"""
@@ -62,6 +101,396 @@ class SubtitleGenerator:
         )
         return result
 
+    def _cache_key(self, audio_hash: str, mode: str, language: str, transcript: str = '') -> str:
+        """결과 캐시 키 (mode: 'align' / 'transcribe' / 'sentences')"""
+        return make_key(audio_hash, hash_text(transcript), language, STABLE_TS_MODEL, mode)
+
+    def get_cached_sentences(self, audio_hash: str, language: str = 'ko'):
+        """캐시된 음성 인식 문장 목록 반환 (없으면 None)"""
+        return self.result_cache.get_json(self._cache_key(audio_hash, 'sentences', language))
+
+    def transcribe_sentences(self, audio_path: str, language: str = 'ko',
+                             audio_hash: str = None) -> list:
+        """
+        음성 인식 후 세그먼트별 문장 목록 반환 (결과 캐싱)
+
+        audio_hash를 주면 원본 파일(예: 오디오 추출 전 동영상) 기준으로 캐싱
+        """
+        audio_hash = audio_hash or hash_file(audio_path)
+        key = self._cache_key(audio_hash, 'sentences', language)
+        cached = self.result_cache.get_json(key)
+        if cached is not None:
+            print("음성 인식 캐시 사용")
+            return cached
+
+        self.init_model()
+        lang_map = {'ko': 'ko', 'en': 'en', 'es': 'es', 'pt': 'pt', 'fr': 'fr'}
+        whisper_lang = lang_map.get(language, 'ko')
+
+        result = self.stable_model.transcribe(
+            audio_path,
+            language=whisper_lang,
+            word_timestamps=True,
+            vad=True
+        )
+
+        sentences = []
+        for segment in result.segments:
+            text = segment.text.strip() if hasattr(segment, 'text') else ''
+            if text:
+                sentences.append(text)
+
+        self.result_cache.set_json(key, sentences)
+        return sentences
+
+    def plan_alignment_windows(self, silences: list, audio_duration: float,
+                               subtitle_lines: list,
+                               target_sec: float = WINDOW_TARGET_SEC,
+                               overlap_lines: int = WINDOW_OVERLAP_LINES) -> list:
+        """
+        묵음 구간에서 오디오를 자르고 자막 라인을 윈도우별로 분배
+
+        - 윈도우 길이가 target_sec 전후(0.5~1.5배)인 묵음 중에서 절단점 선택
+        - 파일 안쪽 묵음 수가 (라인 수 - 1)과 같으면 묵음 = 라인 사이 간격으로 보고
+          절단한 묵음의 순번으로 라인을 나눔 (정확)
+        - 아니면 절단할 때마다 남은 오디오의 발화 시간과 남은 라인의 글자 수 비율을 다시 계산해
+          가장 잘 맞는 라인 경계에서 나눔 (발화 속도 차이로 인한 오차가 뒤로 누적되지 않음)
+        - 각 윈도우는 앞뒤로 overlap_lines 라인(과 그만큼의 오디오)을 더 포함해 정렬하고,
+          결과에서는 자기 라인(line_start~line_end)만 사용 (경계 라인의 오차를 흡수)
+
+        Returns:
+            [{'start', 'end', 'line_start', 'line_end',
+              'audio_start', 'audio_end', 'text_start', 'text_end'}, ...]
+            start/end와 line_start/line_end는 윈도우 자신의 구간,
+            audio_*/text_*는 겹침을 포함해 실제로 정렬할 구간
+        """
+        n_lines = len(subtitle_lines)
+        single = [{'start': 0.0, 'end': audio_duration, 'line_start': 0, 'line_end': n_lines,
+                   'audio_start': 0.0, 'audio_end': audio_duration,
+                   'text_start': 0, 'text_end': n_lines}]
+        # 파일 처음/끝에 붙은 묵음은 라인 사이 간격이 아님
+        silences = [(s, e) for s, e in silences if s > 0.01 and e < audio_duration - 0.01]
+        if not silences or n_lines < 2:
+            return single
+
+        sil_starts = np.array([s for s, _ in silences], dtype=np.float64)
+        sil_ends = np.array([e for _, e in silences], dtype=np.float64)
+        sil_lengths = sil_ends - sil_starts
+        mids = (sil_starts + sil_ends) / 2
+
+        # 각 묵음 위치까지의 발화 시간 (앞선 묵음 길이 제외)
+        silence_before = np.concatenate([[0.0], np.cumsum(sil_lengths)])
+        speech_pos = sil_starts - silence_before[:-1]
+        total_speech = max(audio_duration - sil_lengths.sum(), 1e-6)
+
+        def speech_to_time(pos):
+            # 발화 시간 → 오디오 시간 (그 앞의 묵음 길이를 더함)
+            return pos + silence_before[np.searchsorted(speech_pos, pos, side='right')]
+
+        char_counts = np.array(
+            [max(1, len(self._normalize_text(line))) for line in subtitle_lines], dtype=np.float64
+        )
+        exact = len(silences) == n_lines - 1
+
+        # 라인 경계 k (라인 k 앞)의 예상 시간 - 겹침 오디오 범위 계산용
+        boundary_time = np.zeros(n_lines + 1, dtype=np.float64)
+        boundary_time[-1] = audio_duration
+        if exact:
+            boundary_time[1:-1] = mids
+
+        def estimate_boundaries(line_start, start_speech):
+            # 남은 라인의 글자 수 비율로 남은 발화 시간을 나눈 경계 k (line_start < k < n_lines)
+            counts = char_counts[line_start:]
+            rest = np.cumsum(counts)[:-1] / counts.sum() * max(total_speech - start_speech, 1e-6)
+            return start_speech + rest
+
+        windows = []
+        win_start, win_speech, line_start = 0.0, 0.0, 0
+
+        while audio_duration - win_start >= target_sec * 1.5 and line_start < n_lines - 1:
+            lo, hi = win_start + target_sec * 0.5, win_start + target_sec * 1.5
+            cand = np.where((mids > lo) & (mids < hi))[0]
+            if len(cand) == 0:
+                # 범위 내 묵음이 없으면 이후 첫 묵음 사용
+                cand = np.where(mids >= hi)[0][:1]
+                if len(cand) == 0:
+                    break
+
+            if exact:
+                # 묵음 j 뒤가 라인 j + 1 - 목표 길이에 가장 가까운 묵음에서 절단
+                j = int(cand[np.argmin(np.abs(mids[cand] - (win_start + target_sec)))])
+                line_end = j + 1
+            else:
+                avail = estimate_boundaries(line_start, win_speech)
+                boundary_time[line_start + 1:n_lines] = speech_to_time(avail)
+                dists = np.abs(avail[None, :] - speech_pos[cand][:, None])
+                best = np.unravel_index(np.argmin(dists), dists.shape)
+                j = int(cand[best[0]])
+                line_end = line_start + 1 + int(best[1])
+            if line_end <= line_start:
+                break
+
+            cut = float(mids[j])
+            windows.append({'start': win_start, 'end': cut,
+                            'line_start': line_start, 'line_end': line_end})
+            win_start, win_speech, line_start = cut, float(speech_pos[j]), line_end
+            boundary_time[line_end] = cut
+
+        if not exact and line_start < n_lines - 1:
+            boundary_time[line_start + 1:n_lines] = speech_to_time(
+                estimate_boundaries(line_start, win_speech)
+            )
+        windows.append({'start': win_start, 'end': audio_duration,
+                        'line_start': line_start, 'line_end': n_lines})
+
+        if len(windows) == 1:
+            return single
+
+        # 겹침 - 추정 경계는 오차가 있으므로 오디오를 넉넉히 (1.5배) 포함
+        slack = 1.0 if exact else 1.5
+        for win in windows:
+            win['text_start'] = max(0, win['line_start'] - overlap_lines)
+            win['text_end'] = min(n_lines, win['line_end'] + overlap_lines)
+            before = win['start'] - boundary_time[win['text_start']]
+            after = boundary_time[win['text_end']] - win['end']
+            win['audio_start'] = float(max(0.0, win['start'] - max(0.0, before) * slack))
+            win['audio_end'] = float(min(audio_duration, win['end'] + max(0.0, after) * slack))
+        return windows
+
+    def _group_words_by_line(self, words: list, lines: list) -> list:
+        """단어 목록을 라인별로 나눔 (match_subtitles_with_forced_alignment와 같은 글자 수 기준)"""
+        groups = []
+        word_idx = 0
+        for line_idx, line in enumerate(lines):
+            target_chars = len(self._normalize_text(line))
+            group = []
+            chars = 0
+            while word_idx < len(words) and chars < target_chars:
+                group.append(words[word_idx])
+                chars += len(self._normalize_text(words[word_idx]['word']))
+                word_idx += 1
+            if line_idx == len(lines) - 1:
+                group.extend(words[word_idx:])
+            groups.append(group)
+        return groups
+
+    def _window_coverage(self, groups: list, win: dict, silences: list) -> float:
+        """
+        윈도우 자기 라인의 정렬 범위가 자기 구간 발화 시간을 덮는 비율 (0~1)
+
+        오디오에 없는 텍스트가 배정되면 단어가 한쪽으로 몰려 비율이 낮아짐
+        """
+        speech = win['end'] - win['start']
+        for s, e in silences:
+            speech -= max(0.0, min(e, win['end']) - max(s, win['start']))
+        if speech <= 0:
+            return 1.0
+        covered = 0.0
+        for group in groups:
+            if group:
+                start = max(group[0]['start'], win['start'])
+                end = min(group[-1]['end'], win['end'])
+                covered += max(0.0, end - start)
+        return min(1.0, covered / speech)
+
+    def align_transcript_windowed(self, audio_path: str, subtitle_lines: list,
+                                  language: str = 'ko', max_workers: int = None,
+                                  progress_callback=None) -> list:
+        """
+        윈도우 분할 병렬 Forced Alignment (긴 오디오용)
+
+        묵음 구간에서 오디오를 나누고 각 윈도우를 (이웃 라인과 겹쳐) 프로세스 풀에서
+        독립적으로 정렬한 뒤, 윈도우마다 자기 라인의 단어만 골라 시작 시간을 더해 합침.
+        자기 구간을 충분히 덮지 못했거나 길이 0으로 몰린 라인이 있는 윈도우가 있으면
+        RuntimeError (잘못 배정된 텍스트로 정렬된 타임스탬프를 조용히 쓰지 않음)
+
+        Returns:
+            _extract_words_from_result와 같은 형식의 단어 목록
+        """
+        info = sf.info(audio_path)
+        sr = info.samplerate
+
+        silences = detect_silences(audio_path)
+        windows = self.plan_alignment_windows(silences, info.duration, subtitle_lines)
+
+        if len(windows) == 1:
+            result = self.align_transcript(audio_path, '\n'.join(subtitle_lines), language)
+            return self._extract_words_from_result(result)
+
+        if max_workers is None:
+            max_workers = max(1, min(4, (os.cpu_count() or 2) // 2))
+        max_workers = min(max_workers, len(windows))
+        threads = max(1, (os.cpu_count() or 1) // max_workers)
+
+        print(f"윈도우 분할 정렬: {len(windows)}개 윈도우, 워커 {max_workers}개")
+
+        window_words = [None] * len(windows)
+        with JobWorkspace('alignment') as workspace:
+            paths = []
+            for i, win in enumerate(windows):
+                data, _ = sf.read(audio_path, start=int(win['audio_start'] * sr),
+                                  stop=int(win['audio_end'] * sr), dtype='float32')
+                window_path = workspace.file(f"window_{i:04d}.wav")
+                sf.write(window_path, data, sr)
+                paths.append(window_path)
+
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_pool_context(),
+                                     initializer=_init_align_worker,
+                                     initargs=(threads,)) as pool:
+                futures = {
+                    pool.submit(_align_window_worker, path,
+                                '\n'.join(subtitle_lines[win['text_start']:win['text_end']]),
+                                language): i
+                    for i, (win, path) in enumerate(zip(windows, paths))
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    window_words[futures[future]] = future.result()
+                    if progress_callback:
+                        prog = 45 + int(done / len(windows) * 5)
+                        progress_callback(prog, f"윈도우 정렬 [{done}/{len(windows)}]")
+
+        # 겹친 라인은 버리고 자기 라인의 단어만 전역 타임스탬프로 변환
+        all_words = []
+        for i, (win, words) in enumerate(zip(windows, window_words)):
+            offset = win['audio_start']
+            words = [{'word': w['word'], 'start': w['start'] + offset, 'end': w['end'] + offset}
+                     for w in words]
+            groups = self._group_words_by_line(
+                words, subtitle_lines[win['text_start']:win['text_end']]
+            )
+            own = groups[win['line_start'] - win['text_start']:win['line_end'] - win['text_start']]
+
+            # 오디오에 없는 텍스트는 윈도우 끝에 길이 0 근처로 몰림
+            collapsed = [
+                win['line_start'] + k + 1 for k, group in enumerate(own)
+                if len(self._normalize_text(subtitle_lines[win['line_start'] + k])) >= 2
+                and (not group or group[-1]['end'] - group[0]['start'] < WINDOW_MIN_LINE_SEC)
+            ]
+            coverage = self._window_coverage(own, win, silences)
+            if coverage < WINDOW_MIN_COVERAGE or collapsed:
+                raise RuntimeError(
+                    f"윈도우 {i + 1}/{len(windows)} 정렬 실패 "
+                    f"({win['start']:.1f}~{win['end']:.1f}초, 라인 {win['line_start'] + 1}~"
+                    f"{win['line_end']}, 발화 {coverage:.0%} 덮음, 길이 0 라인 {collapsed[:5]})"
+                )
+            for group in own:
+                all_words.extend(group)
+
+        return all_words
+
+    def partition_lines_to_clips(self, subtitle_lines: list, clip_texts: list) -> list:
+        """
+        자막 라인을 음성 클립별로 분배 (자막과 음성 문장이 따로 나뉘어 있는 경우)
+
+        정규화된 누적 글자 수 기준으로 각 라인의 중간 지점이 속하는 클립에 배정
+        """
+        clip_chars = np.cumsum([len(self._normalize_text(t)) for t in clip_texts], dtype=np.float64)
+        line_chars = np.array([len(self._normalize_text(l)) for l in subtitle_lines], dtype=np.float64)
+
+        if not len(clip_chars) or clip_chars[-1] == 0 or line_chars.sum() == 0:
+            return [list(subtitle_lines)] + [[] for _ in clip_texts[1:]]
+
+        # 자막 전체 글자 수를 음성 전체 글자 수 비율로 맞춤
+        line_mids = (np.cumsum(line_chars) - line_chars / 2) / line_chars.sum() * clip_chars[-1]
+        clip_idx = np.minimum(np.searchsorted(clip_chars, line_mids), len(clip_texts) - 1)
+
+        clip_lines = [[] for _ in clip_texts]
+        for line, idx in zip(subtitle_lines, clip_idx):
+            clip_lines[idx].append(line)
+        return clip_lines
+
+    def align_clips(self, clip_paths: list, clip_lines: list, language: str = 'ko',
+                    max_workers: int = None, progress_callback=None) -> list:
+        """
+        문장별 WAV 병렬 Forced Alignment
+
+        각 클립을 워커 풀에서 독립적으로 정렬하고(클립 내용 해시로 캐싱), 병합 WAV와 같은
+        순서/묵음 간격으로 누적 오프셋을 더해 전체 타이밍 생성.
+        문장 하나만 수정된 경우 해당 클립만 다시 정렬함.
+
+        병합에서 빠지는 클립(mergeable_clips)은 오프셋에 더하지 않고, 그 자막은
+        해당 위치에 길이 0으로 둠 (자막 수는 그대로 유지).
+
+        Args:
+            clip_paths: 순서대로 정렬된 문장별 WAV 경로
+            clip_lines: 클립별 자막 라인 목록 (clip_paths와 같은 길이)
+
+        Returns:
+            [{'text', 'start', 'end'}, ...] 병합 오디오 기준 타이밍
+        """
+        merged = mergeable_clips(clip_paths)
+        durations = [sf.info(path).duration if ok else 0.0 for path, ok in zip(clip_paths, merged)]
+
+        # 캐시 확인
+        keys = []
+        pending = []
+        clip_words = [None] * len(clip_paths)
+        for i, (path, lines) in enumerate(zip(clip_paths, clip_lines)):
+            if not lines or not merged[i]:
+                keys.append(None)
+                continue
+            key = self._cache_key(hash_file(path), 'align', language, '\n'.join(lines))
+            keys.append(key)
+            words = self.result_cache.get_json(key)
+            if words is None:
+                pending.append(i)
+            else:
+                clip_words[i] = words
+
+        print(f"문장별 정렬: {len(clip_paths)}개 클립, 정렬 필요 {len(pending)}개")
+
+        if len(pending) == 1:
+            # 한 문장만 변경된 경우 로드된 모델로 바로 정렬
+            i = pending[0]
+            result = self.align_transcript(clip_paths[i], '\n'.join(clip_lines[i]), language)
+            clip_words[i] = self._extract_words_from_result(result)
+            self.result_cache.set_json(keys[i], clip_words[i])
+        elif pending:
+            if max_workers is None:
+                max_workers = max(1, min(4, (os.cpu_count() or 2) // 2))
+            max_workers = min(max_workers, len(pending))
+            threads = max(1, (os.cpu_count() or 1) // max_workers)
+
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_pool_context(),
+                                     initializer=_init_align_worker,
+                                     initargs=(threads,)) as pool:
+                futures = {
+                    pool.submit(_align_window_worker, clip_paths[i], '\n'.join(clip_lines[i]), language): i
+                    for i in pending
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    clip_words[i] = future.result()
+                    self.result_cache.set_json(keys[i], clip_words[i])
+                    if progress_callback:
+                        prog = 45 + int(done / len(pending) * 10)
+                        progress_callback(prog, f"문장별 정렬 [{done}/{len(pending)}]")
+
+        # 클립별 매칭 후 누적 오프셋 적용 (병합된 클립 사이에만 묵음)
+        timings = []
+        offset = 0.0
+        placed = False
+        for i, lines in enumerate(clip_lines):
+            if not merged[i]:
+                timings.extend({'text': line, 'start': offset, 'end': offset} for line in lines)
+                continue
+            if placed:
+                offset += CLIP_GAP_SEC
+            if lines:
+                clip_timings = self.match_subtitles_with_forced_alignment(
+                    clip_words[i], lines, durations[i]
+                )
+                for t in clip_timings:
+                    timings.append({
+                        'text': t['text'],
+                        'start': t['start'] + offset,
+                        'end': t['end'] + offset
+                    })
+            offset += durations[i]
+            placed = True
+
+        return timings
+
     def _normalize_text(self, text: str) -> str:
         """텍스트 정규화 (비교용)"""
         import re
@@ -229,14 +658,42 @@ class SubtitleGenerator:
                          subtitle_text: str, language: str = 'ko',
                          progress_callback=None) -> list:
         """오디오 배열에서 자막 타이밍 생성 (Forced Alignment 방식)"""
+        subtitle_lines = [line.strip() for line in subtitle_text.split('\n') if line.strip()]
+
+        if not subtitle_lines:
+            return []
+
+        # 작업별 임시 폴더에 오디오 저장 (동시 작업 간 파일 충돌 방지)
+        with JobWorkspace('alignment') as workspace:
+            temp_audio_path = workspace.file("whisper_audio.wav")
+            sf.write(temp_audio_path, audio_array, sample_rate)
+
+            return self.generate_timings_from_file(
+                temp_audio_path, subtitle_text, language, progress_callback
+            )
+
+    def generate_timings_from_file(self, audio_path: str, subtitle_text: str,
+                                    language: str = 'ko', progress_callback=None,
+                                    windowed: bool = None, audio_hash: str = None,
+                                    method: str = 'stable_ts', voice_name: str = 'F1') -> list:
+        """
+        오디오 파일에서 직접 자막 타이밍 생성 (외부 오디오 파일용)
+
+        method:
+            'stable_ts' - Whisper Forced Alignment (기본)
+            'dtw' - 로컬 TTS 참조 음성과 스펙트럼 DTW 정렬 (Whisper 없이 수 초 내 완료,
+                    실패 시 Stable-TS로 폴백)
+
+        windowed가 None이면 WINDOWED_MIN_DURATION 이상의 오디오에 윈도우 분할 정렬 사용.
+        단어 목록은 오디오 해시(audio_hash, 없으면 파일 내용 해시) + 자막 + 언어 + 모델로 캐싱
+        """
         if progress_callback:
             progress_callback(42, "Stable-TS 모델 로드 중...")
 
-        # 임시 오디오 파일 저장
-        temp_audio_path = os.path.join(TEMP_DIR, "temp_whisper_audio.wav")
-        sf.write(temp_audio_path, audio_array, sample_rate)
+        # 오디오 길이 계산
+        audio_info = sf.info(audio_path)
+        audio_duration = audio_info.duration
 
-        audio_duration = len(audio_array) / sample_rate
         subtitle_lines = [line.strip() for line in subtitle_text.split('\n') if line.strip()]
 
         if not subtitle_lines:
@@ -245,18 +702,52 @@ class SubtitleGenerator:
         if progress_callback:
             progress_callback(45, "Forced Alignment 분석 중...")
 
-        try:
-            # 전체 자막 텍스트를 합쳐서 Forced Alignment 수행
-            full_transcript = '\n'.join(subtitle_lines)
+        if windowed is None:
+            windowed = audio_duration >= WINDOWED_MIN_DURATION
+
+        audio_hash = audio_hash or hash_file(audio_path)
+        full_transcript = '\n'.join(subtitle_lines)
+        # 윈도우 분할 결과는 따로 캐싱 (이전 방식의 윈도우 정렬 결과는 재사용하지 않음)
+        align_key = self._cache_key(audio_hash, 'align:windowed' if windowed else 'align',
+                                    language, full_transcript)
+
+        if method == 'dtw':
+            dtw_key = self._cache_key(audio_hash, f'dtw:{voice_name}', language, full_transcript)
+            timings = self.result_cache.get_json(dtw_key)
+            if timings is not None:
+                print("DTW 정렬 캐시 사용")
+                return timings
+            try:
+                from .dtw import DTWAligner
+                timings = DTWAligner().align(
+                    audio_path, subtitle_lines, language, voice_name, progress_callback
+                )
+                self.result_cache.set_json(dtw_key, timings)
+                print(f"DTW 정렬 완료: {len(timings)}개")
+                return timings
+            except Exception as e:
+                print(f"DTW 정렬 실패, Stable-TS 방식 시도: {e}")
 
-            # Stable-TS로 Forced Alignment
-            result = self.align_transcript(temp_audio_path, full_transcript, language)
+        try:
+            all_words = self.result_cache.get_json(align_key)
+            if all_words is not None:
+                print("Forced Alignment 캐시 사용")
+            elif windowed:
+                # 긴 오디오: 묵음 기준 윈도우 분할 후 병렬 정렬
+                all_words = self.align_transcript_windowed(
+                    audio_path, subtitle_lines, language, progress_callback=progress_callback
+                )
+                self.result_cache.set_json(align_key, all_words)
+            else:
+                # Stable-TS로 Forced Alignment (전체 자막 텍스트)
+                result = self.align_transcript(audio_path, full_transcript, language)
 
-            if progress_callback:
-                progress_callback(50, "단어별 타임코드 추출 중...")
+                if progress_callback:
+                    progress_callback(50, "단어별 타임코드 추출 중...")
 
-            # 단어 목록 추출
-            all_words = self._extract_words_from_result(result)
+                # 단어 목록 추출
+                all_words = self._extract_words_from_result(result)
+                self.result_cache.set_json(align_key, all_words)
 
             if progress_callback:
                 progress_callback(55, "자막 라인 매칭 중...")
@@ -272,8 +763,12 @@ class SubtitleGenerator:
                 if progress_callback:
                     progress_callback(48, "음성 인식 분석 중... (fallback)")
 
-                result = self.transcribe_with_alignment(temp_audio_path, language)
-                all_words = self._extract_words_from_result(result)
+                transcribe_key = self._cache_key(audio_hash, 'transcribe', language)
+                all_words = self.result_cache.get_json(transcribe_key)
+                if all_words is None:
+                    result = self.transcribe_with_alignment(audio_path, language)
+                    all_words = self._extract_words_from_result(result)
+                    self.result_cache.set_json(transcribe_key, all_words)
 
                 if progress_callback:
                     progress_callback(55, "자막 라인 매칭 중...")
@@ -288,78 +783,64 @@ class SubtitleGenerator:
                     for i, line in enumerate(subtitle_lines)
                 ]
 
-        # 임시 파일 정리
-        try:
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
-        except:
-            pass
-
         return timings
 
-    def generate_timings_from_file(self, audio_path: str, subtitle_text: str,
-                                    language: str = 'ko', progress_callback=None) -> list:
-        """오디오 파일에서 직접 자막 타이밍 생성 (외부 오디오 파일용)"""
-        if progress_callback:
-            progress_callback(42, "Stable-TS 모델 로드 중...")
 
-        # 오디오 길이 계산
-        import soundfile as sf
-        audio_info = sf.info(audio_path)
-        audio_duration = audio_info.duration
+def detect_silences(audio_path: str, frame_sec: float = 0.02,
+                    min_silence_sec: float = 0.25, threshold_db: float = -35.0) -> list:
+    """
+    에너지 기반 묵음 구간 검출 (TTS 문장 사이 0.3초 묵음 포함)
 
-        subtitle_lines = [line.strip() for line in subtitle_text.split('\n') if line.strip()]
+    파일을 블록 단위로 읽어 프레임 RMS를 계산하므로 긴 오디오도 메모리 사용량이 일정함.
+    상위 5% 프레임 에너지 대비 threshold_db 이하가 min_silence_sec 이상 이어지면 묵음으로 판단.
 
-        if not subtitle_lines:
-            return []
-
-        if progress_callback:
-            progress_callback(45, "Forced Alignment 분석 중...")
-
-        try:
-            # 전체 자막 텍스트를 합쳐서 Forced Alignment 수행
-            full_transcript = '\n'.join(subtitle_lines)
-
-            # Stable-TS로 Forced Alignment
-            result = self.align_transcript(audio_path, full_transcript, language)
+    Returns:
+        [(start_sec, end_sec), ...]
+    """
+    sr = sf.info(audio_path).samplerate
+    hop = max(1, int(sr * frame_sec))
+    frame_sec = hop / sr
 
-            if progress_callback:
-                progress_callback(50, "단어별 타임코드 추출 중...")
-
-            # 단어 목록 추출
-            all_words = self._extract_words_from_result(result)
+    energies = []
+    for block in sf.blocks(audio_path, blocksize=hop * 1000, dtype='float32', always_2d=True):
+        mono = block.mean(axis=1)
+        n = len(mono) // hop
+        if n:
+            frames = mono[:n * hop].reshape(n, hop)
+            energies.append(np.sqrt((frames ** 2).mean(axis=1)))
 
-            if progress_callback:
-                progress_callback(55, "자막 라인 매칭 중...")
+    if not energies:
+        return []
 
-            # Word-Level Grouping으로 자막 타이밍 생성
-            timings = self.match_subtitles_with_forced_alignment(all_words, subtitle_lines, audio_duration)
+    db = 20 * np.log10(np.concatenate(energies) + 1e-10)
+    silent = db < np.percentile(db, 95) + threshold_db
 
-        except Exception as e:
-            print(f"Forced Alignment 실패, transcribe 방식 시도: {e}")
+    padded = np.concatenate([[0], silent.astype(np.int8), [0]])
+    edges = np.diff(padded)
+    starts = np.where(edges == 1)[0]
+    ends = np.where(edges == -1)[0]
+    keep = (ends - starts) * frame_sec >= min_silence_sec
 
-            try:
-                # Fallback: transcribe 방식
-                if progress_callback:
-                    progress_callback(48, "음성 인식 분석 중... (fallback)")
+    return [(float(s * frame_sec), float(e * frame_sec)) for s, e in zip(starts[keep], ends[keep])]
 
-                result = self.transcribe_with_alignment(audio_path, language)
-                all_words = self._extract_words_from_result(result)
 
-                if progress_callback:
-                    progress_callback(55, "자막 라인 매칭 중...")
+# 윈도우 정렬 워커 프로세스 (프로세스당 모델 1회 로드)
+_worker_generator = None
 
-                timings = self.match_subtitles_with_forced_alignment(all_words, subtitle_lines, audio_duration)
+def _init_align_worker(threads: int):
+    global _worker_generator
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_generator = SubtitleGenerator()
+    _worker_generator.init_model()
 
-            except Exception as e2:
-                print(f"Transcribe도 실패, 균등 분배 사용: {e2}")
-                time_per_line = audio_duration / len(subtitle_lines)
-                timings = [
-                    {'text': line, 'start': i * time_per_line, 'end': (i + 1) * time_per_line}
-                    for i, line in enumerate(subtitle_lines)
-                ]
 
-        return timings
+def _align_window_worker(audio_path: str, transcript: str, language: str) -> list:
+    result = _worker_generator.align_transcript(audio_path, transcript, language)
+    return _worker_generator._extract_words_from_result(result)
 
 
 # 싱글톤 인스턴스
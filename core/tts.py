@@ -237,20 +237,30 @@ class TTSEngine:
 
         return Style(ttl_style, dp_style)
 
-    def sample_noisy_latent(self, duration: np.ndarray) -> tuple:
+    def sample_noisy_latent(self, duration: np.ndarray, seeds: list = None) -> tuple:
         bsz = len(duration)
         wav_len_max = duration.max() * self.sample_rate
         wav_lengths = (duration * self.sample_rate).astype(np.int64)
         chunk_size = self.base_chunk_size * self.chunk_compress_factor
         latent_len = ((wav_len_max + chunk_size - 1) / chunk_size).astype(np.int32)
         latent_dim = self.ldim * self.chunk_compress_factor
-        noisy_latent = np.random.randn(bsz, latent_dim, latent_len).astype(np.float32)
+        if seeds is None:
+            noisy_latent = np.random.randn(bsz, latent_dim, latent_len).astype(np.float32)
+        else:
+            # 행마다 자기 시드로 자기 길이만큼만 생성 (배치의 다른 청크와 무관하게 같은 잡음)
+            noisy_latent = np.zeros((bsz, latent_dim, latent_len), dtype=np.float32)
+            row_lengths = (wav_lengths + chunk_size - 1) // chunk_size
+            for b, seed in enumerate(seeds):
+                n = min(int(row_lengths[b]), int(latent_len))
+                rng = np.random.default_rng(seed)
+                noisy_latent[b, :, :n] = rng.standard_normal((latent_dim, n), dtype=np.float32)
         latent_mask = get_latent_mask(wav_lengths, self.base_chunk_size, self.chunk_compress_factor)
         noisy_latent = noisy_latent * latent_mask
         return noisy_latent, latent_mask
 
-    def _infer(self, text_list: list, lang_list: list, style: Style, total_step: int, speed: float) -> tuple:
-        """단일 배치 추론"""
+    def _infer(self, text_list: list, lang_list: list, style: Style, total_step: int, speed: float,
+               seeds: list = None) -> tuple:
+        """단일 배치 추론 (seeds: 행별 잡음 시드, None이면 전역 난수)"""
         bsz = len(text_list)
         m = self.model
 
@@ -265,7 +275,7 @@ class TTSEngine:
             None, {"text_ids": text_ids, "style_ttl": style.ttl, "text_mask": text_mask}
         )
 
-        xt, latent_mask = self.sample_noisy_latent(dur_onnx)
+        xt, latent_mask = self.sample_noisy_latent(dur_onnx, seeds)
         total_step_np = np.array([total_step] * bsz, dtype=np.float32)
 
         for step in range(total_step):
@@ -366,6 +376,67 @@ class TTSEngine:
             traceback.print_exc()
             return None, f"오류 발생: {str(e)}"
 
+    def iter_synthesize_lines(self, lines: list, language: str, voice_name: str,
+                              speed: float = 1.0, quality: int = 5):
+        """
+        줄 단위 순차 합성 (파이프라인 영상 생성용)
+
+        줄마다 완성된 오디오를 바로 내보내므로 호출자는 합성이 끝나기 전에
+        앞부분 타이밍/인코딩을 시작할 수 있음. 긴 줄은 chunk_text로 나누고 0.3초 묵음으로 이음.
+
+        Yields:
+            (줄 인덱스, 오디오 배열)
+        """
+        self.init_model()
+
+        style = self.load_voice_style(voice_name)
+        max_len = get_max_length(language)
+        silence = np.zeros(int(0.3 * self.sample_rate), dtype=np.float32)
+
+        for i, line in enumerate(lines):
+            parts = []
+            for chunk in chunk_text(line, max_len=max_len):
+                if not chunk.strip():
+                    continue
+                if parts:
+                    parts.append(silence)
+                wav, duration = self._infer([chunk], [language], style, quality, speed)
+                parts.append(wav[0, :int(self.sample_rate * duration[0].item())])
+
+            if len(parts) > 1:
+                yield i, np.concatenate(parts)
+            else:
+                yield i, parts[0] if parts else np.array([], dtype=np.float32)
+
+    def synthesize_chunks(self, chunks: list, language: str, voice_name: str,
+                          speed: float = 1.0, quality: int = 5, batch_size: int = 4,
+                          seeds: list = None):
+        """
+        청크 목록 배치 합성 (일괄 처리용)
+
+        길이가 비슷한 청크끼리 batch_size개씩 묶어 한 번에 추론하고 (스타일은 배치 크기만큼 반복),
+        각 청크는 예측 길이만큼 잘라서 내보냄. 순서는 입력 순서와 다를 수 있음.
+        seeds를 주면 청크마다 해당 시드로 잡음을 만들어 같은 입력/배치에서 같은 음성이 나옴.
+
+        Yields:
+            (청크 인덱스, 오디오 배열)
+        """
+        self.init_model()
+
+        style = self.load_voice_style(voice_name)
+        order = sorted(range(len(chunks)), key=lambda i: len(chunks[i]))
+
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            bsz = len(indices)
+            batch_style = Style(np.repeat(style.ttl, bsz, axis=0), np.repeat(style.dp, bsz, axis=0))
+
+            wav, duration = self._infer([chunks[i] for i in indices], [language] * bsz,
+                                        batch_style, quality, speed,
+                                        seeds and [seeds[i] for i in indices])
+            for j, i in enumerate(indices):
+                yield i, wav[j, :int(self.sample_rate * duration[j].item())]
+
     def synthesize_to_array(self, text: str, language: str, voice_name: str,
                             speed: float = 1.0, quality: int = 5,
                             progress_callback=None) -> tuple:
@@ -6,6 +6,7 @@ import os
 import sys
 import re
 import platform
+import threading
 from docx import Document
 
 
@@ -85,6 +86,16 @@ def read_text_file(file_path: str) -> str:
         return f"파일 읽기 오류: {str(e)}"
 
 
+def hash_file(file_path: str) -> str:
+    """파일 내용의 SHA-1 해시 반환 (캐시 키용)"""
+    import hashlib
+    h = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
 def get_voice_list() -> list:
     """사용 가능한 음성 목록 반환"""
     voice_dir = os.path.join(ASSETS_DIR, 'voice_styles')
@@ -209,8 +220,21 @@ def setup_imagemagick():
     return None
 
 
-def get_font_path(font_size: int = 70):
-    """PIL 폰트 객체 반환"""
+_font_file = None
+# (경로, 크기)별 폰트 객체 - FreeType 얼굴 객체는 스레드 안전하지 않으므로 스레드마다 따로 둠
+_font_local = threading.local()
+
+
+def get_font_file():
+    """
+    사용할 폰트 파일 (경로, TTC 인덱스) - 처음 한 번만 파일 시스템을 탐색 (없으면 None)
+
+    번들 폰트가 나중에 설치(ensure_korean_font)될 수 있으므로 찾지 못한 경우는 기억하지 않음
+    """
+    global _font_file
+    if _font_file is not None:
+        return _font_file
+
     from PIL import ImageFont
 
     font_candidates = [
@@ -227,21 +251,41 @@ def get_font_path(font_size: int = 70):
         '/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc',
     ]
 
-    # TTF 먼저 시도
-    for font_path in font_candidates:
+    # TTF 먼저 시도, 그다음 TTC
+    candidates = [(path, 0) for path in font_candidates] + [(path, 1) for path in ttc_candidates]
+    for font_path, index in candidates:
         if os.path.exists(font_path):
             try:
-                return ImageFont.truetype(font_path, font_size)
+                ImageFont.truetype(font_path, 10, index=index)
             except Exception:
                 continue
+            _font_file = (font_path, index)
+            return _font_file
 
-    # TTC 시도
-    for font_path in ttc_candidates:
-        if os.path.exists(font_path):
-            try:
-                return ImageFont.truetype(font_path, font_size, index=1)
-            except Exception:
-                continue
+    return None
+
+
+def get_font_path(font_size: int = 70):
+    """
+    PIL 폰트 객체 반환 (스레드마다 (경로, 크기)별 1회만 로드)
 
-    # 기본 폰트
-    return ImageFont.load_default()
+    같은 객체를 여러 스레드가 동시에 그리기/측정에 쓰면 안전하지 않으므로
+    작업 스레드마다 자기 폰트 객체를 받음
+    """
+    from PIL import ImageFont
+
+    font_file = get_font_file()
+    key = (font_file, font_size)
+
+    cache = getattr(_font_local, 'cache', None)
+    if cache is None:
+        cache = _font_local.cache = {}
+    font = cache.get(key)
+    if font is None:
+        if font_file:
+            font = ImageFont.truetype(font_file[0], font_size, index=font_file[1])
+        else:
+            # 기본 폰트
+            font = ImageFont.load_default()
+        cache[key] = font
+    return font
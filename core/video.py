@@ -4,16 +4,31 @@ Supertonic Video Generator
 """
 import os
 import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import soundfile as sf
-from PIL import Image as PILImage, ImageDraw, ImageFont
+from PIL import Image as PILImage, ImageFont
 
 from .utils import (
-    OUTPUT_DIR, TEMP_DIR, FONTS_DIR,
-    hex_to_rgb, get_font_path, setup_imagemagick
+    OUTPUT_DIR, FONTS_DIR,
+    hex_to_rgb, hash_file, get_font_path, setup_imagemagick
 )
 from .tts import get_tts_engine
 from .subtitle import get_subtitle_generator
+from .workspace import JobWorkspace, get_pool_context
+from .cache import DiskCache, make_key
+from .render import (
+    SubtitleOverlay, ShapeLayer, ClockRenderer, premultiply, render_frames, plan_segments,
+    render_segment_worker, draw_subtitle_image, rasterize_subtitles_worker, unpack_subtitle_rasters,
+    save_subtitle_raster
+)
+from .ffmpeg import (
+    run_ffmpeg, probe_duration, escape_filter_path, FrameWriter, FrameReader,
+    PCMAudio, audio_input_args, READ_AHEAD_FRAMES
+)
+from .ass import write_ass_file
+from .preview import PreviewEngine
 
 # Pillow 호환성 패치
 if not hasattr(PILImage, 'ANTIALIAS'):
@@ -22,6 +37,27 @@ if not hasattr(PILImage, 'ANTIALIAS'):
 # ImageMagick 설정
 setup_imagemagick()
 
+# 이 길이(초) 이상이면 'pipe' 모드를 구간 분할 병렬 인코딩
+SEGMENTED_MIN_DURATION = 120.0
+
+# 캐시에 없는 자막 줄이 이 수 이상이면 래스터를 프로세스 풀에서 병렬 생성
+PARALLEL_RASTER_MIN = 64
+
+# 파이프라인 모드에서 합성된 오디오가 이만큼(초) 쌓이면 구간 인코딩 시작
+PIPELINE_SEGMENT_SEC = 30.0
+
+# 검토용 초안 렌더링 (해상도 배율, fps, libx264 프리셋/비트레이트)
+DRAFT_SCALE = 0.5
+DRAFT_FPS = 15
+DRAFT_PRESET = 'ultrafast'
+DRAFT_VIDEO_ARGS = ['-b:v', '600k', '-maxrate', '600k', '-bufsize', '1200k']
+
+# 이 시간(초) 안에 사용한 배경 캐시는 정리하지 않음 (작업 폴더에 하드 링크할 수 없을 때의 보호)
+BACKGROUND_CACHE_MIN_AGE = 3600
+
+# 시계 없는 단색 영상의 반복 구간 길이 (초, 1fps)
+SOLID_SEGMENT_SEC = 600
+
 
 class VideoGenerator:
     """CPU 전용 영상 생성기"""
@@ -29,40 +65,157 @@ class VideoGenerator:
     def __init__(self):
         self.tts_engine = get_tts_engine()
         self.subtitle_gen = get_subtitle_generator()
+        # 최근 미리보기 작업 폴더 (호출자가 파일을 읽기 전에 삭제되지 않도록 일부 유지)
+        self._preview_workspaces = deque()
+        # 목표 해상도/fps로 변환한 배경 동영상 캐시
+        self.background_cache = DiskCache('backgrounds', max_entries=20, max_bytes=4 * 1024 ** 3,
+                                          min_age=BACKGROUND_CACHE_MIN_AGE)
+        # 자막 래스터 영구 캐시 (프리멀티플라이드, 투명 여백 제거)
+        self.raster_cache = DiskCache('subtitle_rasters', max_entries=20000, max_bytes=500 * 1024 * 1024)
+        self._font_hashes = {}
+        # 초안 렌더링의 음성(WAV) + 자막 타이밍/설정(JSON) - 최종 렌더링에서 재사용
+        self.draft_cache = DiskCache('drafts', max_entries=40, max_bytes=2 * 1024 ** 3)
+        # 미리보기 레이어 (세션 동안 유지)
+        self.preview_engine = PreviewEngine(self)
 
     def _create_subtitle_image(self, text: str, font, outline_width: int = 3) -> tuple:
         """자막 이미지 생성 (캐싱용)"""
-        bbox = font.getbbox(text)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        bbox_offset_x = bbox[0]
-        bbox_offset_y = bbox[1]
-
-        img_width = text_width + outline_width * 2 + 20
-        img_height = text_height + outline_width * 2 + 20
+        return draw_subtitle_image(text, font, outline_width)
 
-        subtitle_img = PILImage.new('RGBA', (img_width, img_height), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(subtitle_img)
+    def _subtitle_raster_key(self, text: str, font, outline_width: int):
+        """자막 래스터 캐시 키 (텍스트, 폰트 파일 해시, 크기, 외곽선, 색상) - 파일 폰트가 아니면 None"""
+        font_path = getattr(font, 'path', None)
+        if not isinstance(font_path, str):
+            return None
 
-        text_x = (img_width - text_width) // 2 - bbox_offset_x
-        text_y = (img_height - text_height) // 2 - bbox_offset_y
+        font_hash = self._font_hashes.get(font_path)
+        if font_hash is None:
+            try:
+                font_hash = hash_file(font_path)
+            except OSError:
+                return None
+            self._font_hashes[font_path] = font_hash
+
+        return make_key('subtitle_raster', text, font_hash, getattr(font, 'index', 0), font.size,
+                        outline_width, (255, 255, 255, 255), (0, 0, 0, 255))
+
+    def _load_cached_raster(self, key: str):
+        """영구 캐시의 자막 래스터 (없거나 손상되면 None)"""
+        path = self.raster_cache.get_file(key, '.npz')
+        if not path:
+            return None
+        try:
+            with np.load(path) as data:
+                crop_x, crop_y, img_width, img_height = (int(v) for v in data['meta'])
+                return data['premul'], data['alpha'], crop_x, crop_y, img_width, img_height
+        except (OSError, ValueError, KeyError):
+            return None
 
-        # PIL stroke 기능 사용
+    def _store_cached_raster(self, key: str, raster: tuple, evict: bool = True):
+        """자막 래스터를 영구 캐시에 저장 (evict=False면 용량 정리는 호출자가 한 번에)"""
+        tmp_path = self.raster_cache.tmp_path(key, '.npz')
         try:
-            draw.text((text_x, text_y), text, font=font,
-                      fill=(255, 255, 255, 255),
-                      stroke_width=outline_width,
-                      stroke_fill=(0, 0, 0, 255))
-        except TypeError:
-            # stroke 미지원 버전 폴백
-            for dx, dy in [(-outline_width, 0), (outline_width, 0),
-                           (0, -outline_width), (0, outline_width),
-                           (-outline_width, -outline_width), (outline_width, -outline_width),
-                           (-outline_width, outline_width), (outline_width, outline_width)]:
-                draw.text((text_x + dx, text_y + dy), text, font=font, fill=(0, 0, 0, 255))
-            draw.text((text_x, text_y), text, font=font, fill=(255, 255, 255, 255))
-
-        return np.array(subtitle_img), img_width, img_height
+            save_subtitle_raster(tmp_path, raster)
+            self.raster_cache.set_file(key, '.npz', tmp_path, evict=evict)
+        except OSError as e:
+            print(f"자막 래스터 캐시 저장 실패: {e}")
+
+    def _render_subtitle_raster(self, text: str, font, outline_width: int = 3) -> tuple:
+        """자막 래스터화 (캐시 확인/저장 없음)"""
+        img_array, img_width, img_height = self._create_subtitle_image(text, font, outline_width)
+        premul, alpha, crop_x, crop_y = premultiply(img_array)
+        return premul, alpha, crop_x, crop_y, img_width, img_height
+
+    def _get_subtitle_raster(self, text: str, font, outline_width: int = 3) -> tuple:
+        """
+        자막 래스터 (프리멀티플라이드) - 영구 캐시에 있으면 텍스트 래스터화 생략
+
+        Returns:
+            (premul, alpha, crop_x, crop_y, img_width, img_height)
+            crop_x/y는 _create_subtitle_image 이미지 안에서 잘라낸 래스터의 위치
+        """
+        key = self._subtitle_raster_key(text, font, outline_width)
+
+        if key is not None:
+            raster = self._load_cached_raster(key)
+            if raster is not None:
+                return raster
+
+        raster = self._render_subtitle_raster(text, font, outline_width)
+        if key is not None:
+            self._store_cached_raster(key, raster)
+
+        return raster
+
+    def _prerender_subtitle_rasters(self, lines: list, font, outline_width: int = 3,
+                                    progress_callback=None) -> dict:
+        """
+        자막 래스터 사전 생성 - 중복 줄을 제거하고 캐시에 없는 줄만 래스터화
+
+        캐시에 없는 줄이 PARALLEL_RASTER_MIN개 이상이면 프로세스 풀에서 묶음 단위로 병렬 생성
+        (결과는 묶음마다 하나의 바이트 배열로 받음). 합성 시작 전에 모두 준비됨.
+
+        Returns:
+            {텍스트: (premul, alpha, crop_x, crop_y, img_width, img_height)}
+        """
+        texts = list(dict.fromkeys(line for line in lines if line))
+        rasters = {}
+        missing = []
+        for text in texts:
+            key = self._subtitle_raster_key(text, font, outline_width)
+            raster = self._load_cached_raster(key) if key is not None else None
+            if raster is not None:
+                rasters[text] = raster
+            else:
+                missing.append((text, key))
+
+        if not missing:
+            return rasters
+
+        def report(done):
+            if progress_callback:
+                progress_callback(60 + int((done / len(missing)) * 12),
+                                  f"자막 래스터 생성 중... [{done}/{len(missing)}]")
+
+        font_path = getattr(font, 'path', None)
+        if len(missing) < PARALLEL_RASTER_MIN or not isinstance(font_path, str):
+            for i, (text, key) in enumerate(missing):
+                if i % 50 == 0:
+                    report(i)
+                # 캐시에 없는 것으로 이미 확인했으므로 바로 래스터화
+                try:
+                    rasters[text] = raster = self._render_subtitle_raster(text, font, outline_width)
+                    if key is not None:
+                        self._store_cached_raster(key, raster, evict=False)
+                except Exception as e:
+                    print(f"자막 래스터 생성 실패: {e}")
+            self.raster_cache.evict()
+            return rasters
+
+        max_workers = max(1, min(8, os.cpu_count() or 1))
+        batch_size = max(8, min(64, len(missing) // (max_workers * 4) or 1))
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        print(f"자막 래스터 병렬 생성: {len(missing)}줄, 워커 {max_workers}개")
+
+        done = 0
+        report(0)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_pool_context()) as pool:
+            futures = {
+                pool.submit(rasterize_subtitles_worker, font_path, getattr(font, 'index', 0),
+                            font.size, [text for text, _ in batch], outline_width,
+                            [key and self.raster_cache.path(key, '.npz') for _, key in batch]): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                for (text, _), raster in zip(batch, unpack_subtitle_rasters(*future.result())):
+                    rasters[text] = raster
+                done += len(batch)
+                report(done)
+
+        # 캐시 파일은 워커가 저장했으므로 용량 정리만 한 번
+        self.raster_cache.evict()
+        return rasters
 
     def _calculate_subtitle_position(self, position: str, video_width: int, video_height: int,
                                       img_width: int, img_height: int,
@@ -87,6 +240,677 @@ class VideoGenerator:
 
         return clip_x + offset_x_px, clip_y + offset_y_px
 
+    def _build_subtitle_overlay(self, subtitle_timings: list, pil_font, subtitle_position: str,
+                                video_width: int, video_height: int,
+                                offset_x: float, offset_y: float,
+                                progress_callback=None) -> SubtitleOverlay:
+        """자막 타이밍 → 구간 인덱스 오버레이 레이어"""
+        overlay = SubtitleOverlay(video_width, video_height)
+
+        # 서로 다른 줄의 래스터를 합성 전에 한 번에 준비
+        rasters = self._prerender_subtitle_rasters(
+            [timing['text'] for timing in subtitle_timings], pil_font,
+            progress_callback=progress_callback
+        )
+
+        for i, timing in enumerate(subtitle_timings):
+            line = timing['text']
+
+            if not line or line not in rasters:
+                continue
+
+            try:
+                if not overlay.has_raster(line):
+                    premul, alpha, crop_x, crop_y, img_width, img_height = rasters[line]
+                    clip_x, clip_y = self._calculate_subtitle_position(
+                        subtitle_position, video_width, video_height,
+                        img_width, img_height, offset_x, offset_y
+                    )
+                    overlay.add_premultiplied(line, premul, alpha, clip_x + crop_x, clip_y + crop_y)
+
+                overlay.add(timing['start'], timing['end'], line)
+
+            except Exception as e:
+                print(f"자막 클립 생성 실패 [{i}]: {e}")
+
+        return overlay.build()
+
+    def _normalize_layout(self, font_size, offset_x, offset_y, shape_x1, shape_y1,
+                          shape_x2, shape_y2, shape_opacity) -> tuple:
+        """
+        레이아웃 숫자 값 기본값/범위 처리 (None이면 기본값)
+
+        Returns:
+            (font_size, offset_x, offset_y, shape_x1, shape_y1, shape_x2, shape_y2, shape_opacity)
+        """
+        font_size = max(10, min(200, int(font_size) if font_size else 70))
+        offset_x = max(-50, min(50, float(offset_x) if offset_x is not None else 0))
+        offset_y = max(-50, min(50, float(offset_y) if offset_y is not None else 0))
+        shape_x1 = max(-10, min(110, float(shape_x1) if shape_x1 is not None else 0))
+        shape_y1 = max(-10, min(110, float(shape_y1) if shape_y1 is not None else 0))
+        shape_x2 = max(-10, min(110, float(shape_x2) if shape_x2 is not None else 100))
+        shape_y2 = max(-10, min(110, float(shape_y2) if shape_y2 is not None else 100))
+        shape_opacity = max(0.0, min(1.0, float(shape_opacity) if shape_opacity is not None else 0.5))
+        return font_size, offset_x, offset_y, shape_x1, shape_y1, shape_x2, shape_y2, shape_opacity
+
+    def _calculate_shape_rect(self, video_width: int, video_height: int,
+                              shape_x1: float, shape_y1: float,
+                              shape_x2: float, shape_y2: float):
+        """도형 좌표(%) → 픽셀 사각형 (x1, y1, x2, y2), 크기가 0이면 None"""
+        if shape_x1 == shape_x2 or shape_y1 == shape_y2:
+            return None
+
+        px_x1 = int(video_width * min(shape_x1, shape_x2) / 100)
+        px_y1 = int(video_height * min(shape_y1, shape_y2) / 100)
+        px_x2 = int(video_width * max(shape_x1, shape_x2) / 100)
+        px_y2 = int(video_height * max(shape_y1, shape_y2) / 100)
+
+        if px_x2 - px_x1 <= 0 or px_y2 - px_y1 <= 0:
+            return None
+        return px_x1, px_y1, px_x2, px_y2
+
+    def _prepare_background_video(self, background_path: str, video_width: int,
+                                  video_height: int, fps: int = 30, progress_callback=None,
+                                  workspace: JobWorkspace = None) -> str:
+        """
+        배경 동영상을 목표 해상도/fps로 한 번만 변환해 캐시 (이후 렌더링은 디코딩 시 스케일 없음)
+
+        키: (경로, 수정 시간, 크기, 해상도, fps) - 원본이 바뀌면 새로 변환.
+        1초 GOP로 인코딩해 구간 분할 렌더링의 탐색이 빠름. 변환 실패 시 원본 경로 반환.
+        """
+        size = (video_width, video_height)
+        return self._prepare_background_videos(background_path, [size], fps, progress_callback,
+                                               workspace)[size]
+
+    def _prepare_background_videos(self, background_path: str, sizes: list,
+                                   fps: int = 30, progress_callback=None,
+                                   workspace: JobWorkspace = None) -> dict:
+        """
+        배경 동영상을 여러 해상도로 변환해 캐시 - 캐시에 없는 해상도들은
+        원본을 한 번만 디코딩하고 split 필터로 나눠 동시에 인코딩
+
+        workspace를 주면 캐시 항목을 작업 폴더에 하드 링크한 경로를 돌려줌
+        (렌더링 도중 다른 작업의 캐시 정리로 배경 파일이 지워지지 않도록)
+
+        Returns:
+            {(너비, 높이): 경로} - 변환 실패 시 원본 경로
+        """
+        sizes = list(dict.fromkeys(sizes))
+        try:
+            st = os.stat(background_path)
+        except OSError:
+            return {size: background_path for size in sizes}
+
+        cache = self.background_cache
+
+        def pin(path, size):
+            if workspace is None:
+                return path
+            return cache.pin(path, workspace.file(f"background_{size[0]}x{size[1]}_{fps}.mp4"))
+
+        result = {}
+        missing = []
+        for video_width, video_height in sizes:
+            key = make_key('background', os.path.abspath(background_path), st.st_mtime, st.st_size,
+                           video_width, video_height, fps)
+            cached = cache.get_file(key, '.mp4')
+            if cached:
+                result[(video_width, video_height)] = pin(cached, (video_width, video_height))
+            else:
+                missing.append(((video_width, video_height), key))
+
+        if result:
+            print(f"배경 캐시 사용: {os.path.basename(background_path)} ({len(result)}개 해상도)")
+        if not missing:
+            return result
+
+        if progress_callback:
+            progress_callback(58, "배경 영상 변환 중... (최초 1회)")
+
+        labels = ''.join(f"[s{i}]" for i in range(len(missing)))
+        graph = [f"[0:v]split={len(missing)}{labels}"]
+        outputs = []
+        tmp_paths = []
+        for i, ((video_width, video_height), key) in enumerate(missing):
+            graph.append(f"[s{i}]scale={video_width}:{video_height},setsar=1,fps={fps}[o{i}]")
+            tmp_path = cache.tmp_path(key, '.mp4')
+            tmp_paths.append(tmp_path)
+            outputs += [
+                '-map', f"[o{i}]",
+                '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '18',
+                '-g', str(fps), '-pix_fmt', 'yuv420p',
+                '-f', 'mp4', tmp_path
+            ]
+
+        try:
+            run_ffmpeg(['-i', background_path, '-an', '-filter_complex', ';'.join(graph)] + outputs)
+        except RuntimeError as e:
+            print(f"배경 영상 변환 실패, 원본 사용: {e}")
+            for tmp_path in tmp_paths:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            for size, _ in missing:
+                result[size] = background_path
+            return result
+
+        for (size, key), tmp_path in zip(missing, tmp_paths):
+            result[size] = pin(cache.set_file(key, '.mp4', tmp_path), size)
+        return result
+
+    def _load_static_background(self, background_path: str,
+                                video_width: int, video_height: int) -> np.ndarray:
+        """이미지 배경(없으면 기본 단색) → (H, W, 3) uint8 프레임"""
+        if background_path:
+            with PILImage.open(background_path) as img:
+                img = img.convert('RGB').resize((video_width, video_height), PILImage.LANCZOS)
+                return np.array(img, dtype=np.uint8)
+        return np.full((video_height, video_width, 3), (26, 26, 46), dtype=np.uint8)
+
+    def _build_static_base(self, background_path: str, video_width: int, video_height: int,
+                           shape: ShapeLayer = None) -> np.ndarray:
+        """정지 배경(이미지/단색) + 도형을 한 번만 합성한 기본 프레임"""
+        base_frame = self._load_static_background(background_path, video_width, video_height)
+        if shape is not None:
+            shape.apply(base_frame)
+        return base_frame
+
+    def _encode_still_segments(self, base_frame: np.ndarray, overlay: SubtitleOverlay,
+                               duration: float, audio_path: str, filepath: str,
+                               workspace: JobWorkspace, progress_callback=None,
+                               preset: str = None, extra_args: list = None, fps: int = 30):
+        """
+        정지 구간 인코딩 - 자막 구간마다 합성 이미지 1장을 만들고
+        ffmpeg concat demuxer(구간별 duration)로 가변 프레임레이트 영상 생성
+
+        인코딩 비용이 영상 길이가 아니라 자막 변경 횟수에 비례함
+        """
+        segments = overlay.segments(duration)
+
+        # 같은 자막(래스터)은 같은 이미지 재사용
+        stills = {}
+        lines = []
+        for i, (start, end, raster_id) in enumerate(segments):
+            if raster_id not in stills:
+                if progress_callback and len(stills) % 50 == 0:
+                    prog = 75 + int((i / len(segments)) * 10)
+                    progress_callback(prog, f"정지 화면 생성 중... [{i + 1}/{len(segments)}]")
+
+                frame = overlay.composite_raster(base_frame.copy(), raster_id)
+                name = f"still_{len(stills):05d}.png"
+                PILImage.fromarray(frame).save(workspace.file(name), compress_level=1)
+                stills[raster_id] = name
+
+            lines.append(f"file '{stills[raster_id]}'")
+            lines.append(f"duration {end - start:.6f}")
+
+        # concat demuxer는 마지막 항목의 duration을 무시하므로 마지막 파일을 한 번 더 기록
+        if segments:
+            lines.append(f"file '{stills[segments[-1][2]]}'")
+
+        list_path = workspace.file("stills.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        if progress_callback:
+            progress_callback(85, f"영상 인코딩 중... (정지 구간 {len(segments)}개, CPU)")
+
+        # 타임스탬프는 fps 격자(기본 1/30초)로 맞춤 - 프레임 복제 없이 MoviePy 경로와 같은 전환 시점
+        run_ffmpeg([
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+        ] + audio_input_args(audio_path) + [
+            '-map', '0:v', '-map', '1:a',
+            '-vsync', 'vfr', '-enc_time_base', f'1/{fps}',
+            '-c:v', 'libx264', '-tune', 'stillimage', '-pix_fmt', 'yuv420p',
+        ] + (['-preset', preset] if preset else []) + list(extra_args or []) + [
+            '-c:a', 'aac',
+            '-t', f"{duration:.3f}",
+            '-movflags', '+faststart',
+            filepath
+        ], cwd=workspace.path, audio=audio_path)
+
+    def _encode_pipe(self, background_path: str, background_type: str,
+                     video_width: int, video_height: int,
+                     shape: ShapeLayer, overlay: SubtitleOverlay,
+                     duration: float, audio_path: str,
+                     filepath: str, workspace: JobWorkspace, fps: int = 30,
+                     threads: int = None, segments: int = None, progress_callback=None,
+                     preset: str = 'medium', extra_args: list = None):
+        """
+        원시 프레임 파이프 인코딩 - 배경/도형/자막을 재사용 프레임 버퍼 하나에 합성하여
+        rgb24 바이트를 ffmpeg stdin으로 바로 전송 (MoviePy 경유 없음)
+
+        segments > 1 이면 자막 전환 시점에서 구간을 나눠 워커 프로세스에서 병렬 인코딩 후
+        스트림 복사로 이어 붙이고, 오디오는 마지막에 한 번만 합침
+        """
+        if progress_callback:
+            progress_callback(75, "배경 준비 중...")
+
+        n_frames = int(np.ceil(duration * fps))
+
+        # 정지 배경은 도형까지 미리 합성한 기본 프레임 하나를 모든 프레임에 재사용
+        base_frame = None
+        if background_type != 'video':
+            base_frame = self._build_static_base(background_path, video_width, video_height, shape)
+
+        if segments is None:
+            segments = 1
+            if duration >= SEGMENTED_MIN_DURATION:
+                segments = max(1, min(8, (os.cpu_count() or 2) // 2))
+
+        plan = plan_segments(overlay, duration, fps, segments)
+        if len(plan) > 1:
+            self._encode_segmented(
+                plan, background_path if background_type == 'video' else None,
+                base_frame, shape, overlay, audio_path, filepath, workspace,
+                fps, threads, progress_callback, preset, extra_args
+            )
+            return
+
+        if progress_callback:
+            progress_callback(80, "영상 인코딩 중... (CPU)")
+
+        def progress(done):
+            if progress_callback:
+                progress_callback(80 + int((done / n_frames) * 19),
+                                  f"영상 인코딩 중... {done}/{n_frames} 프레임")
+
+        reader = None
+        if background_type == 'video':
+            # fps 변환 반올림으로 프레임이 모자라지 않도록 1프레임 여유
+            reader = FrameReader(background_path, video_width, video_height, fps,
+                                 (n_frames + 1) / fps, read_ahead=READ_AHEAD_FRAMES)
+
+        try:
+            with FrameWriter(filepath, video_width, video_height, fps,
+                             audio_path=audio_path, threads=threads,
+                             preset=preset, extra_args=extra_args) as writer:
+                render_frames(writer, 0, n_frames, fps, overlay,
+                              base_frame=base_frame, reader=reader, shape=shape,
+                              progress=progress)
+        finally:
+            if reader is not None:
+                reader.close()
+
+    def _encode_segmented(self, plan: list, background_path: str, base_frame: np.ndarray,
+                          shape: ShapeLayer, overlay: SubtitleOverlay, audio_path: str,
+                          filepath: str, workspace: JobWorkspace, fps: int = 30,
+                          threads: int = None, progress_callback=None,
+                          preset: str = 'medium', extra_args: list = None):
+        """구간별 병렬 인코딩 → concat 스트림 복사 + 오디오 1회 합성"""
+        max_workers = len(plan)
+        if not threads:
+            threads = max(1, (os.cpu_count() or 1) // max_workers)
+
+        background_duration = probe_duration(background_path) if background_path else None
+
+        print(f"구간 분할 인코딩: {len(plan)}개 구간, 구간당 인코더 스레드 {threads}개")
+        if progress_callback:
+            progress_callback(80, f"영상 인코딩 중... ({len(plan)}개 구간 병렬, CPU)")
+
+        segment_paths = [workspace.file(f"segment_{i:03d}.mp4") for i in range(len(plan))]
+
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_pool_context()) as pool:
+            futures = [
+                pool.submit(render_segment_worker, path, first_frame, last_frame, fps,
+                            overlay, base_frame, background_path, background_duration,
+                            shape, threads, preset, extra_args)
+                for path, (first_frame, last_frame) in zip(segment_paths, plan)
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if progress_callback:
+                    progress_callback(80 + int((done / len(plan)) * 15),
+                                      f"영상 인코딩 중... 구간 {done}/{len(plan)}")
+
+        if progress_callback:
+            progress_callback(96, "구간 합치는 중...")
+
+        self._concat_segments(segment_paths, audio_path, filepath, workspace)
+
+    def _build_ass_events(self, subtitle_timings: list, pil_font, subtitle_position: str,
+                          video_width: int, video_height: int,
+                          offset_x: float, offset_y: float, outline_width: int = 3) -> list:
+        """
+        자막 타이밍 → ASS 이벤트 (_create_subtitle_image + _calculate_subtitle_position 과 같은 위치)
+
+        PIL 경로의 텍스트 잉크 상단 위치를 구한 뒤, libass 줄 상자 상단(어센트 기준)으로 환산
+        """
+        events = []
+        for timing in subtitle_timings:
+            line = timing['text']
+            if not line or timing['end'] <= timing['start']:
+                continue
+
+            bbox = pil_font.getbbox(line)
+            img_width = (bbox[2] - bbox[0]) + outline_width * 2 + 20
+            img_height = (bbox[3] - bbox[1]) + outline_width * 2 + 20
+            clip_x, clip_y = self._calculate_subtitle_position(
+                subtitle_position, video_width, video_height,
+                img_width, img_height, offset_x, offset_y
+            )
+
+            ink_top = clip_y + (img_height - (bbox[3] - bbox[1])) // 2
+            events.append({
+                'start': timing['start'],
+                'end': timing['end'],
+                'text': line,
+                'x': clip_x + img_width // 2,
+                'y': ink_top - bbox[1],
+            })
+        return events
+
+    def _encode_ass(self, background_path: str, background_type: str,
+                    video_width: int, video_height: int,
+                    shape: ShapeLayer, subtitle_timings: list, pil_font, subtitle_position: str,
+                    offset_x: float, offset_y: float, duration: float, audio_path: str,
+                    filepath: str, workspace: JobWorkspace, fps: int = 30,
+                    threads: int = None, progress_callback=None):
+        """
+        ASS 자막 번인 인코딩 - 배경 스케일, 도형, 자막(libass)을 ffmpeg 필터 그래프 하나로 처리
+
+        자막 래스터화/합성이 모두 ffmpeg 안에서 이루어지므로 Python 프레임 처리가 없음
+        """
+        if progress_callback:
+            progress_callback(75, "ASS 자막 파일 생성 중...")
+
+        ass_path = workspace.file("subtitles.ass")
+        events = self._build_ass_events(
+            subtitle_timings, pil_font, subtitle_position,
+            video_width, video_height, offset_x, offset_y
+        )
+        fonts_dir = write_ass_file(ass_path, events, video_width, video_height, pil_font)
+
+        # 배경 입력
+        if background_type == 'video':
+            inputs = ['-stream_loop', '-1', '-t', f"{duration:.3f}", '-i', background_path]
+        elif background_type == 'image':
+            inputs = ['-loop', '1', '-framerate', str(fps), '-t', f"{duration:.3f}", '-i', background_path]
+        else:
+            inputs = ['-f', 'lavfi', '-i',
+                      f"color=c=0x1a1a2e:s={video_width}x{video_height}:r={fps}:d={duration:.3f}"]
+
+        # 필터 그래프: 스케일 → 도형 → 자막
+        filters = [f"scale={video_width}:{video_height}", "setsar=1", f"fps={fps}"]
+        if shape is not None:
+            px_x1, px_y1, px_x2, px_y2 = shape.rect
+            r, g, b = shape.rgb
+            filters.append(
+                f"drawbox=x={px_x1}:y={px_y1}:w={px_x2 - px_x1}:h={px_y2 - px_y1}"
+                f":color=0x{r:02x}{g:02x}{b:02x}@{shape.opacity:.3f}:t=fill"
+            )
+        subtitle_filter = f"subtitles=filename={escape_filter_path(ass_path)}"
+        if fonts_dir:
+            subtitle_filter += f":fontsdir={escape_filter_path(fonts_dir)}"
+        filters.append(subtitle_filter)
+
+        if progress_callback:
+            progress_callback(80, "영상 인코딩 중... (libass, CPU)")
+
+        args = inputs + audio_input_args(audio_path) + ['-filter_complex', f"[0:v]{','.join(filters)}[v]",
+                         '-map', '[v]', '-map', '1:a',
+                         '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-c:a', 'aac']
+        if threads:
+            args += ['-threads', str(int(threads))]
+        args += ['-t', f"{duration:.3f}", '-movflags', '+faststart', filepath]
+
+        run_ffmpeg(args, audio=audio_path)
+
+    def _encode_moviepy(self, background_path: str, background_type: str,
+                        video_width: int, video_height: int,
+                        shape: ShapeLayer, overlay: SubtitleOverlay,
+                        duration: float, audio_path: str,
+                        filepath: str, workspace: JobWorkspace, threads: int = None,
+                        progress_callback=None):
+        """MoviePy 프레임 합성 인코딩 (30fps)"""
+        from moviepy.editor import ImageClip, VideoFileClip, AudioFileClip
+
+        if progress_callback:
+            progress_callback(75, "배경 영상 준비 중...")
+
+        if background_path and background_type == 'video':
+            bg_clip = VideoFileClip(background_path)
+            if bg_clip.duration < duration:
+                bg_clip = bg_clip.loop(duration=duration)
+            else:
+                bg_clip = bg_clip.subclip(0, duration)
+            if tuple(bg_clip.size) != (video_width, video_height):
+                bg_clip = bg_clip.resize((video_width, video_height))
+
+            # 도형은 클립 합성 대신 미리 계산한 계수로 프레임마다 한 번에 합성
+            if shape is not None:
+                base_clip = bg_clip.fl(
+                    lambda get_frame, t: shape.apply(np.array(get_frame(t), dtype=np.uint8, copy=True))
+                )
+            else:
+                base_clip = bg_clip
+        else:
+            # 정지 배경은 배경 + 도형을 한 번만 합성한 이미지 하나로 사용
+            bg_clip = ImageClip(
+                self._build_static_base(background_path, video_width, video_height, shape)
+            ).set_duration(duration)
+            base_clip = bg_clip
+
+        # 자막은 프레임마다 활성 라인 하나만 합성
+        final_clip = base_clip.fl(overlay.moviepy_filter)
+
+        if progress_callback:
+            progress_callback(78, "오디오 추가 중...")
+
+        if isinstance(audio_path, PCMAudio):
+            from moviepy.audio.AudioClip import AudioArrayClip
+            samples = audio_path.samples.reshape(len(audio_path.samples), -1)
+            audio_clip = AudioArrayClip(samples, fps=audio_path.sample_rate)
+        else:
+            audio_clip = AudioFileClip(audio_path)
+        final_clip = final_clip.set_audio(audio_clip)
+
+        if progress_callback:
+            progress_callback(80, "영상 인코딩 중... (CPU)")
+
+        try:
+            # CPU 인코딩 (libx264 고정)
+            final_clip.write_videofile(
+                filepath,
+                fps=30,
+                codec='libx264',  # CPU 인코딩 고정
+                audio_codec='aac',
+                temp_audiofile=workspace.file("video_audio.m4a"),
+                threads=threads or None,
+                verbose=True,
+                logger='bar'
+            )
+        finally:
+            # 리소스 정리
+            final_clip.close()
+            audio_clip.close()
+            bg_clip.close()
+
+    def _render_timeline(self, render_mode: str, background_path: str, background_type: str,
+                         video_width: int, video_height: int, shape: ShapeLayer,
+                         subtitle_timings: list, pil_font, subtitle_position: str,
+                         offset_x: float, offset_y: float, duration: float, audio_path: str,
+                         filepath: str, workspace: JobWorkspace, encoder_threads: int = None,
+                         segments: int = None, progress_callback=None, fps: int = 30,
+                         preset: str = None, extra_args: list = None):
+        """
+        자막 타이밍 + 오디오 → render_mode에 맞는 경로로 영상 인코딩
+
+        audio_path는 오디오 파일 경로 또는 PCMAudio (메모리 PCM 직접 입력).
+        fps/preset/extra_args는 'still'/'pipe' 방식에만 적용 (초안 렌더링용)
+        """
+        # libass 번인은 PIL 자막 래스터가 필요 없음
+        if render_mode == 'ass':
+            self._encode_ass(
+                background_path, background_type, video_width, video_height,
+                shape, subtitle_timings, pil_font,
+                subtitle_position, offset_x, offset_y, duration,
+                audio_path, filepath, workspace, threads=encoder_threads,
+                progress_callback=progress_callback
+            )
+            return
+
+        # 자막 오버레이 생성 (텍스트별 래스터 1회 생성 + 구간 인덱스)
+        if progress_callback:
+            progress_callback(60, "자막 클립 생성 중...")
+
+        overlay = self._build_subtitle_overlay(
+            subtitle_timings, pil_font, subtitle_position,
+            video_width, video_height, offset_x, offset_y, progress_callback
+        )
+
+        if render_mode == 'still':
+            if progress_callback:
+                progress_callback(75, "배경 이미지 준비 중...")
+
+            base_frame = self._build_static_base(
+                background_path, video_width, video_height, shape
+            )
+            self._encode_still_segments(
+                base_frame, overlay, duration, audio_path,
+                filepath, workspace, progress_callback, preset, extra_args, fps
+            )
+        elif render_mode == 'moviepy':
+            self._encode_moviepy(
+                background_path, background_type, video_width, video_height,
+                shape, overlay, duration,
+                audio_path, filepath, workspace, encoder_threads, progress_callback
+            )
+        else:
+            self._encode_pipe(
+                background_path, background_type, video_width, video_height,
+                shape, overlay, duration,
+                audio_path, filepath, workspace, fps=fps, threads=encoder_threads,
+                segments=segments, progress_callback=progress_callback,
+                preset=preset or 'medium', extra_args=extra_args
+            )
+
+    def _create_video_pipelined(self, tts_text: str, language: str, voice_name: str,
+                                speed: float, quality: int,
+                                background_path: str, background_type: str,
+                                video_width: int, video_height: int, shape: ShapeLayer,
+                                pil_font, subtitle_position: str, offset_x: float, offset_y: float,
+                                filepath: str, workspace: JobWorkspace,
+                                threads: int = None, progress_callback=None, fps: int = 30,
+                                preset: str = 'medium', extra_args: list = None):
+        """
+        파이프라인 영상 생성 - 줄 단위로 합성이 끝나는 대로 자막 구간을 정하고,
+        PIPELINE_SEGMENT_SEC 이상 쌓이면 그 구간을 워커 프로세스에서 바로 인코딩
+
+        합성과 인코딩이 겹치므로 전체 시간이 (합성 + 인코딩)이 아니라 둘 중 긴 쪽에 가까워짐.
+        자막 구간은 줄별 오디오 길이로 정하므로 정렬(Whisper)을 거치지 않음.
+        fps/preset/extra_args는 구간 인코더에 그대로 적용 (초안 렌더링용)
+
+        Returns:
+            (전체 오디오 길이(초), 오디오 배열, 자막 타이밍), 합성된 오디오가 없으면 None
+        """
+        lines = [line.strip() for line in tts_text.split('\n') if line.strip()]
+        sample_rate = self.tts_engine.sample_rate
+        gap = 0.3
+        silence = np.zeros(int(gap * sample_rate), dtype=np.float32)
+
+        base_frame = None
+        background_duration = None
+        if background_type == 'video':
+            background_duration = probe_duration(background_path)
+            video_background = background_path
+        else:
+            base_frame = self._build_static_base(background_path, video_width, video_height, shape)
+            video_background = None
+
+        # TTS가 코어를 함께 쓰므로 인코더 워커/스레드는 여유를 남김
+        max_workers = max(1, min(4, (os.cpu_count() or 2) // 2))
+        if not threads:
+            threads = max(1, (os.cpu_count() or 1) // (max_workers + 1))
+
+        audio_parts = []
+        segment_paths = []
+        futures = []
+        segment_start = 0.0
+        segment_timings = []
+        all_timings = []
+        t = 0.0
+
+        def submit_segment(pool, end_time: float, final: bool):
+            first_frame = int(round(segment_start * fps))
+            last_frame = int(np.ceil(end_time * fps)) if final else int(round(end_time * fps))
+            if last_frame <= first_frame:
+                return
+
+            overlay = self._build_subtitle_overlay(
+                segment_timings, pil_font, subtitle_position,
+                video_width, video_height, offset_x, offset_y
+            )
+            path = workspace.file(f"segment_{len(segment_paths):03d}.mp4")
+            futures.append(pool.submit(
+                render_segment_worker, path, first_frame, last_frame, fps,
+                overlay, base_frame, video_background, background_duration, shape, threads,
+                preset, extra_args
+            ))
+            segment_paths.append(path)
+
+        print(f"파이프라인 영상 생성: {len(lines)}줄, 인코딩 워커 {max_workers}개")
+
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_pool_context()) as pool:
+            for i, wav in self.tts_engine.iter_synthesize_lines(
+                    lines, language, voice_name, speed, quality):
+                if i > 0:
+                    audio_parts.append(silence)
+                    t += gap
+
+                # 줄 경계에서 구간이 충분히 길면 지금까지를 인코딩 시작
+                if t - segment_start >= PIPELINE_SEGMENT_SEC:
+                    submit_segment(pool, t, final=False)
+                    segment_start = t
+                    segment_timings = []
+
+                start = t
+                audio_parts.append(wav)
+                t += len(wav) / sample_rate
+                segment_timings.append({'text': lines[i], 'start': start, 'end': t})
+                all_timings.append(segment_timings[-1])
+
+                if progress_callback:
+                    progress_callback(10 + int(((i + 1) / len(lines)) * 60),
+                                      f"음성 [{i + 1}/{len(lines)}] + 인코딩 구간 {len(segment_paths)}개 진행 중")
+
+            if not audio_parts:
+                return None
+
+            submit_segment(pool, t, final=True)
+
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if progress_callback:
+                    progress_callback(75 + int((done / len(futures)) * 20),
+                                      f"영상 인코딩 중... 구간 {done}/{len(futures)}")
+
+        if progress_callback:
+            progress_callback(96, "구간 합치는 중...")
+
+        audio_array = np.concatenate(audio_parts)
+        with PCMAudio(audio_array, sample_rate) as audio:
+            self._concat_segments(segment_paths, audio, filepath, workspace)
+        return t, audio_array, all_timings
+
+    def _concat_segments(self, segment_paths: list, audio_path: str, filepath: str,
+                         workspace: JobWorkspace):
+        """구간 영상들을 concat 스트림 복사로 잇고 오디오(AAC)를 한 번에 합침"""
+        list_path = workspace.file("segments.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in segment_paths:
+                f.write(f"file '{os.path.basename(path)}'\n")
+
+        run_ffmpeg([
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+        ] + audio_input_args(audio_path) + [
+            '-map', '0:v', '-map', '1:a',
+            '-c:v', 'copy', '-c:a', 'aac',
+            '-movflags', '+faststart',
+            filepath
+        ], cwd=workspace.path, audio=audio_path)
+
     def create_video(self, tts_text: str, subtitle_text: str,
                      voice_name: str, language: str, speed: float, quality: int,
                      background_path: str, resolution: str,
@@ -95,13 +919,27 @@ class VideoGenerator:
                      use_shape: bool, shape_x1: float, shape_y1: float,
                      shape_x2: float, shape_y2: float,
                      shape_color: str, shape_opacity: float,
-                     output_name: str = None, progress_callback=None) -> tuple:
-        """영상 생성 메인 함수"""
-        from moviepy.editor import (
-            ImageClip, VideoFileClip, AudioFileClip,
-            CompositeVideoClip, ColorClip
-        )
-
+                     output_name: str = None, progress_callback=None,
+                     render_mode: str = 'auto', encoder_threads: int = None,
+                     segments: int = None, pipelined: bool = False,
+                     draft: bool = False, draft_id: str = None) -> tuple:
+        """
+        영상 생성 메인 함수
+
+        render_mode:
+            'auto' - 이미지/단색 배경은 'still', 동영상 배경은 'pipe'
+            'still' - 자막 구간별 정지 화면 + 가변 프레임레이트 인코딩 (동영상 배경 불가)
+            'pipe' - 재사용 프레임 버퍼 합성 + ffmpeg 원시 프레임 파이프 (30fps)
+            'ass' - ASS 자막 파일 + ffmpeg 필터 그래프(scale/drawbox/subtitles) 번인 (libass)
+            'moviepy' - MoviePy 합성 인코딩 (30fps)
+        encoder_threads: libx264 스레드 수 (None/0 = 자동)
+        segments: 'pipe' 모드 병렬 구간 수 (None = 긴 영상만 CPU 수에 맞춰 자동 분할)
+        pipelined: 줄 단위 합성과 구간 인코딩을 겹쳐 실행 (자막 = TTS 텍스트일 때, 'pipe' 방식)
+        draft: 검토용 초안 (해상도 절반, 15fps, ultrafast, 낮은 비트레이트).
+            음성/자막 타이밍을 초안 캐시에 저장함 (메시지에 초안 ID 포함)
+        draft_id: 초안 캐시의 음성/자막 타이밍을 재사용할 초안 ID (finalize_video 등).
+            지정한 경우에만 캐시를 확인하고, 없으면 매번 새로 합성함
+        """
         if not tts_text or not tts_text.strip():
             return None, "TTS 텍스트를 입력해주세요."
 
@@ -109,23 +947,47 @@ class VideoGenerator:
             subtitle_text = tts_text
 
         # 기본값 처리
-        font_size = max(10, min(200, int(font_size) if font_size else 70))
         resolution = resolution or "1920x1080"
-        shape_x1 = max(-10, min(110, float(shape_x1) if shape_x1 is not None else 0))
-        shape_y1 = max(-10, min(110, float(shape_y1) if shape_y1 is not None else 0))
-        shape_x2 = max(-10, min(110, float(shape_x2) if shape_x2 is not None else 100))
-        shape_y2 = max(-10, min(110, float(shape_y2) if shape_y2 is not None else 100))
-        shape_opacity = max(0.0, min(1.0, float(shape_opacity) if shape_opacity is not None else 0.5))
-        offset_x = max(-50, min(50, float(offset_x) if offset_x is not None else 0))
-        offset_y = max(-50, min(50, float(offset_y) if offset_y is not None else 0))
+        (font_size, offset_x, offset_y, shape_x1, shape_y1,
+         shape_x2, shape_y2, shape_opacity) = self._normalize_layout(
+            font_size, offset_x, offset_y, shape_x1, shape_y1, shape_x2, shape_y2, shape_opacity
+        )
 
         shape_rgb = hex_to_rgb(shape_color)
         video_width, video_height = map(int, resolution.split('x'))
 
+        # finalize_video가 같은 설정으로 다시 렌더링할 수 있도록 보관
+        layout = {
+            'background_path': background_path, 'resolution': resolution,
+            'font_size': font_size, 'subtitle_position': subtitle_position,
+            'offset_x': offset_x, 'offset_y': offset_y,
+            'use_shape': use_shape, 'shape_x1': shape_x1, 'shape_y1': shape_y1,
+            'shape_x2': shape_x2, 'shape_y2': shape_y2,
+            'shape_color': shape_color, 'shape_opacity': shape_opacity,
+        }
+
+        # 초안은 해상도/폰트를 같은 비율로 줄임 (위치/도형은 % 기준이라 그대로)
+        if draft:
+            video_width = max(2, int(video_width * DRAFT_SCALE) // 2 * 2)
+            video_height = max(2, int(video_height * DRAFT_SCALE) // 2 * 2)
+            font_size = max(10, int(round(font_size * DRAFT_SCALE)))
+
+        workspace = JobWorkspace('video')
+        audio_source = None
+
         try:
             if progress_callback:
                 progress_callback(5, "준비 중...")
 
+            # 초안 ID를 받은 경우에만 저장된 음성/자막 타이밍 재사용
+            draft_audio = draft_job = audio_array = None
+            if draft_id:
+                draft_audio = self.draft_cache.get_file(draft_id, '.wav')
+                draft_job = self.draft_cache.get_json(draft_id) if draft_audio else None
+            if draft:
+                draft_id = draft_id or self.draft_key(tts_text, subtitle_text, voice_name,
+                                                      language, speed, quality)
+
             # 배경 타입 확인
             background_type = None
             if background_path:
@@ -135,174 +997,377 @@ class VideoGenerator:
                 else:
                     background_type = 'image'
 
-            # 음성 생성
-            if progress_callback:
-                progress_callback(10, "TTS 모델 로드 중...")
+            # 도형 레이어 (알파 계수 미리 계산)
+            shape = None
+            if use_shape:
+                shape_rect = self._calculate_shape_rect(
+                    video_width, video_height, shape_x1, shape_y1, shape_x2, shape_y2
+                )
+                if shape_rect:
+                    shape = ShapeLayer(shape_rect, shape_rgb, shape_opacity)
 
-            audio_array, audio_duration = self.tts_engine.synthesize_to_array(
-                tts_text, language, voice_name, speed, quality, progress_callback
-            )
+            # 출력 파일명
+            if output_name:
+                filename = f"{output_name}.mp4"
+            else:
+                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f"video_{timestamp}.mp4"
 
-            if audio_array is None:
-                return None, "음성 생성 실패"
+            filepath = os.path.join(OUTPUT_DIR, filename)
 
-            if progress_callback:
-                progress_callback(40, "오디오 파일 저장 중...")
+            # 정지 배경(이미지/단색)은 자막이 바뀔 때만 화면이 바뀌므로 정지 구간 인코딩
+            if render_mode == 'auto' or draft:
+                render_mode = 'pipe' if background_type == 'video' else 'still'
+            if render_mode == 'still' and background_type == 'video':
+                render_mode = 'pipe'
 
-            temp_audio_path = os.path.join(TEMP_DIR, "temp_video_audio.wav")
-            sf.write(temp_audio_path, audio_array, self.tts_engine.sample_rate)
+            fps, preset, extra_args = 30, None, None
+            if draft:
+                fps, preset, extra_args = DRAFT_FPS, DRAFT_PRESET, DRAFT_VIDEO_ARGS
 
-            # 자막 타이밍 생성
-            subtitle_timings = self.subtitle_gen.generate_timings(
-                audio_array, self.tts_engine.sample_rate,
-                subtitle_text, language, progress_callback
-            )
+            pil_font = get_font_path(font_size)
 
-            # 배경 클립 생성
-            if progress_callback:
-                progress_callback(55, "배경 영상 준비 중...")
+            # 파이프라인 모드는 자막 줄 = TTS 줄일 때만 (줄별 합성 길이로 자막 구간을 정함)
+            if pipelined and subtitle_text.strip() != tts_text.strip():
+                print("자막 텍스트가 TTS 텍스트와 달라 파이프라인 모드를 사용하지 않습니다.")
+                pipelined = False
+            # 초안 음성을 재사용할 때는 합성할 것이 없으므로 파이프라인 불필요
+            if pipelined and draft_job is not None:
+                pipelined = False
+
+            if pipelined:
+                if background_type == 'video':
+                    background_path = self._prepare_background_video(
+                        background_path, video_width, video_height, fps, progress_callback, workspace
+                    )
 
-            if background_path and background_type == 'video':
-                bg_clip = VideoFileClip(background_path)
-                if bg_clip.duration < audio_duration:
-                    bg_clip = bg_clip.loop(duration=audio_duration)
-                else:
-                    bg_clip = bg_clip.subclip(0, audio_duration)
-                bg_clip = bg_clip.resize((video_width, video_height))
-            elif background_path and background_type == 'image':
-                bg_clip = ImageClip(background_path).set_duration(audio_duration)
-                bg_clip = bg_clip.resize((video_width, video_height))
+                result = self._create_video_pipelined(
+                    tts_text, language, voice_name, speed, quality,
+                    background_path, background_type, video_width, video_height,
+                    shape, pil_font, subtitle_position, offset_x, offset_y,
+                    filepath, workspace, encoder_threads, progress_callback,
+                    fps, preset or 'medium', extra_args
+                )
+                if result is None:
+                    return None, "음성 생성 실패"
+                audio_duration, audio_array, subtitle_timings = result
             else:
-                bg_clip = ColorClip(
-                    size=(video_width, video_height),
-                    color=(26, 26, 46)
-                ).set_duration(audio_duration)
-
-            # 도형 클립 생성
-            shape_clip = None
-            if use_shape and shape_x1 != shape_x2 and shape_y1 != shape_y2:
-                px_x1 = int(video_width * min(shape_x1, shape_x2) / 100)
-                px_y1 = int(video_height * min(shape_y1, shape_y2) / 100)
-                px_x2 = int(video_width * max(shape_x1, shape_x2) / 100)
-                px_y2 = int(video_height * max(shape_y1, shape_y2) / 100)
+                if draft_job is not None:
+                    print("초안 음성/자막 타이밍 재사용 (TTS/정렬 생략)")
+                    audio = draft_audio
+                    audio_duration = draft_job['duration']
+                    subtitle_timings = draft_job['timings']
+                else:
+                    # 음성 생성
+                    if progress_callback:
+                        progress_callback(10, "TTS 모델 로드 중...")
 
-                shape_w = px_x2 - px_x1
-                shape_h = px_y2 - px_y1
+                    audio_array, audio_duration = self.tts_engine.synthesize_to_array(
+                        tts_text, language, voice_name, speed, quality, progress_callback
+                    )
 
-                if shape_w > 0 and shape_h > 0:
-                    shape_clip = ColorClip(
-                        size=(shape_w, shape_h),
-                        color=shape_rgb
-                    ).set_opacity(shape_opacity)
-                    shape_clip = shape_clip.set_duration(audio_duration)
-                    shape_clip = shape_clip.set_position((px_x1, px_y1))
+                    if audio_array is None:
+                        return None, "음성 생성 실패"
 
-            # 자막 클립 생성
-            if progress_callback:
-                progress_callback(60, "자막 클립 생성 중...")
+                    # 오디오는 파일로 쓰지 않고 PCM 그대로 인코더에 공급
+                    audio = audio_source = PCMAudio(audio_array, self.tts_engine.sample_rate)
 
-            pil_font = get_font_path(font_size)
-            subtitle_clips = []
-            subtitle_image_cache = {}
+                    # 자막 타이밍 생성
+                    subtitle_timings = self.subtitle_gen.generate_timings(
+                        audio_array, self.tts_engine.sample_rate,
+                        subtitle_text, language, progress_callback
+                    )
 
-            for i, timing in enumerate(subtitle_timings):
-                line = timing['text']
-                start_time = timing['start']
-                end_time = timing['end']
+                # 배경 동영상은 목표 해상도로 미리 변환된 캐시 사용
+                if background_type == 'video':
+                    background_path = self._prepare_background_video(
+                        background_path, video_width, video_height, fps, progress_callback, workspace
+                    )
 
-                if not line:
-                    continue
+                self._render_timeline(
+                    render_mode, background_path, background_type, video_width, video_height,
+                    shape, subtitle_timings, pil_font, subtitle_position, offset_x, offset_y,
+                    audio_duration, audio, filepath, workspace,
+                    encoder_threads, segments, progress_callback, fps, preset, extra_args
+                )
+
+            # 초안은 새로 합성한 음성(재사용했으면 None)과 자막 타이밍/설정 저장
+            if draft:
+                self._store_draft(draft_id, audio_array, {
+                    'tts_text': tts_text, 'subtitle_text': subtitle_text,
+                    'voice_name': voice_name, 'language': language,
+                    'speed': speed, 'quality': quality,
+                    'layout': layout, 'duration': audio_duration,
+                    'timings': subtitle_timings,
+                })
 
-                if i % 50 == 0 and progress_callback:
-                    prog = 60 + int((i / len(subtitle_timings)) * 15)
-                    progress_callback(prog, f'자막 클립 [{i + 1}/{len(subtitle_timings)}]')
+            if progress_callback:
+                progress_callback(100, "완료!")
 
-                try:
-                    # 캐싱된 자막 이미지 사용
-                    if line not in subtitle_image_cache:
-                        subtitle_image_cache[line] = self._create_subtitle_image(line, pil_font)
+            message = f"영상 생성 완료!\n파일: {filename}\n길이: {audio_duration:.1f}초"
+            if draft:
+                message = f"초안 {message}\n초안 ID: {draft_id}"
+            return filepath, message
 
-                    img_array, img_width, img_height = subtitle_image_cache[line]
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            return None, f"오류 발생: {str(e)}"
 
-                    txt_clip = ImageClip(img_array, ismask=False, transparent=True)
-                    txt_clip = txt_clip.set_duration(end_time - start_time)
+        finally:
+            workspace.cleanup()
+            if audio_source is not None:
+                audio_source.close()
 
-                    clip_x, clip_y = self._calculate_subtitle_position(
-                        subtitle_position, video_width, video_height,
-                        img_width, img_height, offset_x, offset_y
-                    )
+    def draft_key(self, tts_text: str, subtitle_text: str, voice_name: str,
+                  language: str, speed: float, quality: int) -> str:
+        """초안 캐시 키 (음성/자막 타이밍을 결정하는 입력만 포함)"""
+        if not subtitle_text or not subtitle_text.strip():
+            subtitle_text = tts_text
+        return make_key('draft', tts_text, subtitle_text, voice_name, language,
+                        float(speed), int(quality))
+
+    def _store_draft(self, draft_id: str, audio_array: np.ndarray = None, job: dict = None):
+        """초안 캐시에 음성(WAV)과 자막 타이밍/설정(JSON) 저장 (None인 쪽은 건너뜀)"""
+        if audio_array is not None:
+            tmp_path = self.draft_cache.tmp_path(draft_id, '.wav')
+            sf.write(tmp_path, audio_array, self.tts_engine.sample_rate, format='WAV')
+            self.draft_cache.set_file(draft_id, '.wav', tmp_path)
+        if job is not None:
+            self.draft_cache.set_json(draft_id, job)
+
+    def finalize_video(self, draft_id: str, output_name: str = None, progress_callback=None,
+                       render_mode: str = 'auto', encoder_threads: int = None,
+                       segments: int = None, **layout) -> tuple:
+        """
+        초안을 최종 품질로 다시 렌더링 - 초안 캐시의 음성/자막 타이밍을 그대로 사용 (TTS/정렬 없음)
+
+        Args:
+            draft_id: 초안 생성 시 받은 ID (draft_key와 같음)
+            **layout: 초안의 화면 설정 중 바꿀 값 (resolution, font_size, shape_x1 등)
+        """
+        job = self.draft_cache.get_json(draft_id)
+        if job is None or not self.draft_cache.get_file(draft_id, '.wav'):
+            return None, "초안을 찾을 수 없습니다. 초안을 다시 생성해주세요."
+
+        params = dict(job['layout'])
+        params.update(layout)
+
+        return self.create_video(
+            job['tts_text'], job['subtitle_text'], job['voice_name'], job['language'],
+            job['speed'], job['quality'], output_name=output_name,
+            progress_callback=progress_callback, render_mode=render_mode,
+            encoder_threads=encoder_threads, segments=segments, draft_id=draft_id, **params
+        )
 
-                    txt_clip = txt_clip.set_position((clip_x, clip_y))
-                    txt_clip = txt_clip.set_start(start_time).set_end(end_time)
-                    subtitle_clips.append(txt_clip)
+    def create_renditions(self, tts_text: str, subtitle_text: str,
+                          voice_name: str, language: str, speed: float, quality: int,
+                          background_path: str, renditions: list,
+                          output_name: str = None, progress_callback=None,
+                          render_mode: str = 'auto', encoder_threads: int = None) -> tuple:
+        """
+        여러 출력 규격을 한 번에 생성 (예: 1920x1080, 1080x1920 쇼츠, 1280x720)
+
+        음성 합성/자막 정렬은 한 번만 하고 같은 타임라인으로 규격별 영상을 렌더링.
+        동영상 배경은 캐시에 없는 해상도들을 원본 디코딩 1회로 함께 변환함.
+
+        Args:
+            renditions: 출력 규격 목록 [{'resolution', 'font_size', 'subtitle_position',
+                'offset_x', 'offset_y', 'use_shape', 'shape_x1', 'shape_y1', 'shape_x2', 'shape_y2',
+                'shape_color', 'shape_opacity', 'name'}] - resolution 외에는 생략 가능
+            render_mode: create_video와 같음 ('pipe' 구간 분할은 자동)
+
+        Returns:
+            ([파일 경로], 메시지) 또는 (None, 오류 메시지)
+        """
+        if not tts_text or not tts_text.strip():
+            return None, "TTS 텍스트를 입력해주세요."
 
-                except Exception as e:
-                    print(f"자막 클립 생성 실패 [{i}]: {e}")
+        if not renditions:
+            return None, "출력 규격을 하나 이상 지정해주세요."
 
-            if progress_callback:
-                progress_callback(75, "영상 합성 중...")
+        if not subtitle_text or not subtitle_text.strip():
+            subtitle_text = tts_text
 
-            # 클립 합성
-            all_clips = [bg_clip]
-            if shape_clip is not None:
-                all_clips.append(shape_clip)
-            all_clips.extend(subtitle_clips)
+        # 규격별 기본값 처리
+        specs = []
+        for spec in renditions:
+            resolution = spec.get('resolution') or "1920x1080"
+            video_width, video_height = map(int, resolution.split('x'))
+            # create_video와 같은 기본값 처리 (값이 None인 항목도 기본값)
+            (font_size, offset_x, offset_y, shape_x1, shape_y1,
+             shape_x2, shape_y2, shape_opacity) = self._normalize_layout(
+                spec.get('font_size'), spec.get('offset_x'), spec.get('offset_y'),
+                spec.get('shape_x1'), spec.get('shape_y1'), spec.get('shape_x2'),
+                spec.get('shape_y2'), spec.get('shape_opacity')
+            )
 
-            final_clip = CompositeVideoClip(all_clips)
+            shape = None
+            if spec.get('use_shape'):
+                shape_rect = self._calculate_shape_rect(
+                    video_width, video_height, shape_x1, shape_y1, shape_x2, shape_y2
+                )
+                if shape_rect:
+                    shape = ShapeLayer(shape_rect, hex_to_rgb(spec.get('shape_color', '#000000')),
+                                       shape_opacity)
+
+            specs.append({
+                'name': spec.get('name') or resolution,
+                'width': video_width,
+                'height': video_height,
+                'font_size': font_size,
+                'subtitle_position': spec.get('subtitle_position') or '하단-중앙',
+                'offset_x': offset_x,
+                'offset_y': offset_y,
+                'shape': shape,
+            })
+
+        workspace = JobWorkspace('video')
+        audio_source = None
 
+        try:
             if progress_callback:
-                progress_callback(78, "오디오 추가 중...")
+                progress_callback(5, "준비 중...")
 
-            audio_clip = AudioFileClip(temp_audio_path)
-            final_clip = final_clip.set_audio(audio_clip)
+            background_type = None
+            if background_path:
+                ext = os.path.splitext(background_path)[1].lower()
+                if ext in ['.mp4', '.avi', '.mov', '.mkv', '.webm']:
+                    background_type = 'video'
+                else:
+                    background_type = 'image'
 
+            # 음성 생성 + 자막 타이밍 (모든 규격 공통)
             if progress_callback:
-                progress_callback(80, "영상 인코딩 중... (CPU)")
+                progress_callback(10, "TTS 모델 로드 중...")
 
-            # 출력 파일명
-            if output_name:
-                filename = f"{output_name}.mp4"
-            else:
-                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"video_{timestamp}.mp4"
+            audio_array, audio_duration = self.tts_engine.synthesize_to_array(
+                tts_text, language, voice_name, speed, quality, progress_callback
+            )
 
-            filepath = os.path.join(OUTPUT_DIR, filename)
+            if audio_array is None:
+                return None, "음성 생성 실패"
 
-            # CPU 인코딩 (libx264 고정)
-            final_clip.write_videofile(
-                filepath,
-                fps=30,
-                codec='libx264',  # CPU 인코딩 고정
-                audio_codec='aac',
-                verbose=True,
-                logger='bar'
-            )
+            # 모든 규격의 인코더가 같은 PCM을 직접 입력받음
+            audio_source = PCMAudio(audio_array, self.tts_engine.sample_rate)
 
-            # 리소스 정리
-            final_clip.close()
-            audio_clip.close()
-            if background_path and background_type == 'video':
-                bg_clip.close()
+            subtitle_timings = self.subtitle_gen.generate_timings(
+                audio_array, self.tts_engine.sample_rate,
+                subtitle_text, language, progress_callback
+            )
 
-            if os.path.exists(temp_audio_path):
-                os.remove(temp_audio_path)
+            # 동영상 배경은 필요한 해상도를 한 번에 변환
+            backgrounds = {}
+            if background_type == 'video':
+                backgrounds = self._prepare_background_videos(
+                    background_path, [(spec['width'], spec['height']) for spec in specs],
+                    30, progress_callback, workspace
+                )
+
+            mode = render_mode
+            if mode == 'auto':
+                mode = 'pipe' if background_type == 'video' else 'still'
+            if mode == 'still' and background_type == 'video':
+                mode = 'pipe'
+
+            if not output_name:
+                output_name = f"video_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+            filepaths = []
+            used_names = set()
+            for i, spec in enumerate(specs):
+                name = spec['name']
+                if name in used_names:
+                    name = f"{name}_{i + 1}"
+                used_names.add(name)
+                filepath = os.path.join(OUTPUT_DIR, f"{output_name}_{name}.mp4")
+
+                # 규격별 진행률을 60~99% 구간에 나눠 표시
+                def rendition_progress(pct, msg, i=i):
+                    if progress_callback:
+                        span = 39 / len(specs)
+                        progress_callback(60 + int(span * i + span * max(0, pct - 55) / 45),
+                                          f"[{i + 1}/{len(specs)}] {msg}")
+
+                print(f"출력 규격 {i + 1}/{len(specs)}: {spec['width']}x{spec['height']}")
+                self._render_timeline(
+                    mode, backgrounds.get((spec['width'], spec['height']), background_path),
+                    background_type, spec['width'], spec['height'], spec['shape'],
+                    subtitle_timings, get_font_path(spec['font_size']), spec['subtitle_position'],
+                    spec['offset_x'], spec['offset_y'], audio_duration, audio_source,
+                    filepath, workspace, encoder_threads, None, rendition_progress
+                )
+                filepaths.append(filepath)
 
             if progress_callback:
                 progress_callback(100, "완료!")
 
-            return filepath, f"영상 생성 완료!\n파일: {filename}\n길이: {audio_duration:.1f}초"
+            files = '\n'.join(f"파일: {os.path.basename(path)}" for path in filepaths)
+            return filepaths, f"영상 {len(filepaths)}개 생성 완료!\n{files}\n길이: {audio_duration:.1f}초"
 
         except Exception as e:
             import traceback
             traceback.print_exc()
             return None, f"오류 발생: {str(e)}"
 
+        finally:
+            workspace.cleanup()
+            if audio_source is not None:
+                audio_source.close()
+
+    def _encode_solid_replicated(self, bg_rgb: tuple, video_width: int, video_height: int,
+                                 total_seconds: int, filepath: str, workspace: JobWorkspace,
+                                 threads: int = None, progress_callback=None):
+        """
+        단색 영상 고속 생성 - SOLID_SEGMENT_SEC 길이의 GOP 정렬 구간을 한 번만 인코딩하고
+        concat demuxer 스트림 복사로 반복, 나머지 길이는 짧은 꼬리 구간으로 따로 인코딩
+
+        프레임 단위 인코딩이 없으므로 48시간 영상도 디스크 쓰기 속도로 생성됨
+        """
+        r, g, b = bg_rgb
+        color = f"0x{r:02x}{g:02x}{b:02x}"
+
+        def encode_segment(name: str, seconds: int) -> str:
+            # 1fps, 구간 전체가 GOP 하나 (첫 프레임만 키프레임)
+            path = workspace.file(name)
+            args = ['-f', 'lavfi',
+                    '-i', f"color=c={color}:s={video_width}x{video_height}:r=1:d={seconds}",
+                    '-c:v', 'libx264', '-tune', 'stillimage', '-pix_fmt', 'yuv420p',
+                    '-g', str(seconds)]
+            if threads:
+                args += ['-threads', str(int(threads))]
+            run_ffmpeg(args + [path])
+            return name
+
+        segment_sec = min(SOLID_SEGMENT_SEC, total_seconds)
+        repeats, tail_sec = divmod(total_seconds, segment_sec)
+
+        if progress_callback:
+            progress_callback(20, f"기본 구간 인코딩 중... ({segment_sec}초)")
+
+        entries = [encode_segment("solid_segment.mp4", segment_sec)] * repeats
+        if tail_sec:
+            entries.append(encode_segment("solid_tail.mp4", tail_sec))
+
+        if progress_callback:
+            progress_callback(50, f"구간 {len(entries)}개 이어 붙이는 중... (스트림 복사)")
+
+        list_path = workspace.file("solid.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for name in entries:
+                f.write(f"file '{name}'\n")
+
+        run_ffmpeg([
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-c', 'copy', '-movflags', '+faststart',
+            filepath
+        ], cwd=workspace.path)
+
     def create_solid_video(self, hours: int, minutes: int, seconds: int,
                            bg_color: str, resolution: str,
                            show_clock: bool, clock_color: str,
-                           progress_callback=None) -> tuple:
+                           progress_callback=None, encoder_threads: int = None) -> tuple:
         """단색 배경 영상 생성"""
-        from moviepy.editor import ColorClip, CompositeVideoClip, ImageClip
 
         try:
             if progress_callback:
@@ -322,71 +1387,33 @@ class VideoGenerator:
             bg_rgb = hex_to_rgb(bg_color)
             clock_rgb = hex_to_rgb(clock_color) if clock_color else (255, 255, 255)
 
-            if progress_callback:
-                progress_callback(10, "배경 클립 생성 중...")
-
-            bg_clip = ColorClip(
-                size=(video_width, video_height),
-                color=bg_rgb
-            ).set_duration(total_seconds)
-
-            if show_clock:
-                if progress_callback:
-                    progress_callback(15, "시계 프레임 생성 중...")
-
-                pil_font = get_font_path(120)
-                clock_clips = []
-
-                for i in range(total_seconds):
-                    if i % 60 == 0 and progress_callback:
-                        prog = 15 + int((i / total_seconds) * 70)
-                        progress_callback(prog, f"시계 프레임 생성 중... {i}/{total_seconds}초")
-
-                    h = i // 3600
-                    m = (i % 3600) // 60
-                    s = i % 60
-                    time_str = f"{h:02d}:{m:02d}:{s:02d}"
-
-                    img = PILImage.new('RGBA', (video_width, video_height), (0, 0, 0, 0))
-                    draw = ImageDraw.Draw(img)
-
-                    bbox = draw.textbbox((0, 0), time_str, font=pil_font)
-                    text_width = bbox[2] - bbox[0]
-                    text_height = bbox[3] - bbox[1]
-
-                    text_x = (video_width - text_width) // 2
-                    text_y = (video_height - text_height) // 2
-
-                    draw.text((text_x, text_y), time_str, font=pil_font, fill=(*clock_rgb, 255))
-
-                    clip = ImageClip(np.array(img), transparent=True).set_duration(1).set_start(i)
-                    clock_clips.append(clip)
-
-                if progress_callback:
-                    progress_callback(85, "영상 합성 중...")
-
-                final_clip = CompositeVideoClip([bg_clip] + clock_clips)
-            else:
-                final_clip = bg_clip
-
-            if progress_callback:
-                progress_callback(90, "영상 인코딩 중... (CPU)")
-
             timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"solid_{timestamp}.mp4"
             filepath = os.path.join(OUTPUT_DIR, filename)
 
-            # CPU 인코딩 고정
-            final_clip.write_videofile(
-                filepath,
-                fps=1,
-                codec='libx264',
-                audio=False,
-                verbose=True,
-                logger='bar'
-            )
+            if progress_callback:
+                progress_callback(10, "영상 인코딩 중... (CPU)")
+
+            if not show_clock:
+                # 시계 없는 단색 영상은 짧은 구간 하나만 인코딩해 스트림 복사로 반복
+                with JobWorkspace('video') as workspace:
+                    self._encode_solid_replicated(
+                        bg_rgb, video_width, video_height, total_seconds,
+                        filepath, workspace, encoder_threads, progress_callback
+                    )
+            else:
+                # 1fps 원시 프레임 파이프 - 시계는 글리프 아틀라스로 재사용 버퍼에 합성
+                clock = ClockRenderer(video_width, video_height, get_font_path(120),
+                                      bg_rgb, clock_rgb)
 
-            final_clip.close()
+                with FrameWriter(filepath, video_width, video_height, fps=1,
+                                 threads=encoder_threads) as writer:
+                    for i in range(total_seconds):
+                        if i % 60 == 0 and progress_callback:
+                            prog = 10 + int((i / total_seconds) * 88)
+                            progress_callback(prog, f"영상 인코딩 중... {i}/{total_seconds}초")
+
+                        writer.write(clock.render(i))
 
             if progress_callback:
                 progress_callback(100, "완료!")
@@ -399,12 +1426,17 @@ class VideoGenerator:
             traceback.print_exc()
             return None, f"오류 발생: {str(e)}"
 
-    def generate_preview(self, subtitle_text: str, background_path: str,
-                         resolution: str, font_size: int, subtitle_position: str,
-                         offset_x: float, offset_y: float,
-                         use_shape: bool, shape_x1: float, shape_y1: float,
-                         shape_x2: float, shape_y2: float, shape_opacity: float) -> str:
-        """자막 미리보기 이미지 생성"""
+    def generate_preview_image(self, subtitle_text: str, background_path: str,
+                               resolution: str, font_size: int, subtitle_position: str,
+                               offset_x: float, offset_y: float,
+                               use_shape: bool, shape_x1: float, shape_y1: float,
+                               shape_x2: float, shape_y2: float, shape_opacity: float,
+                               image_format: str = 'JPEG', quality: int = 85) -> bytes:
+        """
+        자막 미리보기 이미지 바이트 (JPEG/WebP/PNG)
+
+        배경/도형/자막 레이어를 세션 동안 유지하여 바뀐 레이어만 다시 합성 (슬라이더 조작용)
+        """
         try:
             font_size = max(10, min(200, int(font_size) if font_size else 70))
             offset_x = max(-50, min(50, float(offset_x) if offset_x is not None else 0))
@@ -418,65 +1450,58 @@ class VideoGenerator:
             resolution = resolution or "1920x1080"
             video_width, video_height = map(int, resolution.split('x'))
 
-            # 배경 이미지
-            if background_path and os.path.exists(background_path):
-                ext = os.path.splitext(background_path)[1].lower()
-                if ext in ['.mp4', '.avi', '.mov', '.mkv', '.webm']:
-                    from moviepy.editor import VideoFileClip
-                    clip = VideoFileClip(background_path)
-                    frame = clip.get_frame(0)
-                    clip.close()
-                    bg_img = PILImage.fromarray(frame)
-                    bg_img = bg_img.resize((video_width, video_height), PILImage.LANCZOS)
-                else:
-                    bg_img = PILImage.open(background_path)
-                    bg_img = bg_img.resize((video_width, video_height), PILImage.LANCZOS)
-                bg_img = bg_img.convert('RGBA')
-            else:
-                bg_img = PILImage.new('RGBA', (video_width, video_height), (26, 26, 46, 255))
-
-            # 자막 텍스트
-            if not subtitle_text or not subtitle_text.strip():
-                subtitle_text = "자막 미리보기 텍스트"
-
-            first_line = subtitle_text.strip().split('\n')[0]
-            pil_font = get_font_path(font_size)
-
-            # 도형 그리기
+            # 도형 (미리보기는 검은색, 끝 좌표 포함)
+            shape = None
             if use_shape and shape_x1 != shape_x2 and shape_y1 != shape_y2:
                 px_x1 = int(video_width * min(shape_x1, shape_x2) / 100)
                 px_y1 = int(video_height * min(shape_y1, shape_y2) / 100)
                 px_x2 = int(video_width * max(shape_x1, shape_x2) / 100)
                 px_y2 = int(video_height * max(shape_y1, shape_y2) / 100)
+                shape = ShapeLayer((px_x1, px_y1, px_x2 + 1, px_y2 + 1), (0, 0, 0),
+                                   int(255 * shape_opacity) / 255)
 
-                overlay = PILImage.new('RGBA', bg_img.size, (0, 0, 0, 0))
-                overlay_draw = ImageDraw.Draw(overlay)
-                alpha = int(255 * shape_opacity)
-                overlay_draw.rectangle([px_x1, px_y1, px_x2, px_y2], fill=(0, 0, 0, alpha))
-                bg_img = PILImage.alpha_composite(bg_img.convert('RGBA'), overlay)
+            # 자막 텍스트
+            if not subtitle_text or not subtitle_text.strip():
+                subtitle_text = "자막 미리보기 텍스트"
 
-            # 자막 그리기
-            img_array, img_width, img_height = self._create_subtitle_image(first_line, pil_font)
-            subtitle_img = PILImage.fromarray(img_array)
+            first_line = subtitle_text.strip().split('\n')[0]
 
-            clip_x, clip_y = self._calculate_subtitle_position(
-                subtitle_position, video_width, video_height,
-                img_width, img_height, offset_x, offset_y
+            return self.preview_engine.render(
+                first_line, background_path, resolution, font_size, subtitle_position,
+                offset_x, offset_y, shape, image_format=image_format, quality=quality
             )
 
-            bg_img.paste(subtitle_img, (clip_x, clip_y), subtitle_img)
-
-            # 미리보기 저장
-            preview_path = os.path.join(TEMP_DIR, "preview.png")
-            bg_img.convert('RGB').save(preview_path)
-
-            return preview_path
-
         except Exception as e:
             import traceback
             traceback.print_exc()
             return None
 
+    def generate_preview(self, subtitle_text: str, background_path: str,
+                         resolution: str, font_size: int, subtitle_position: str,
+                         offset_x: float, offset_y: float,
+                         use_shape: bool, shape_x1: float, shape_y1: float,
+                         shape_x2: float, shape_y2: float, shape_opacity: float) -> str:
+        """자막 미리보기 이미지 생성 (PNG 파일 경로)"""
+        image_bytes = self.generate_preview_image(
+            subtitle_text, background_path, resolution, font_size, subtitle_position,
+            offset_x, offset_y, use_shape, shape_x1, shape_y1, shape_x2, shape_y2,
+            shape_opacity, image_format='PNG'
+        )
+        if image_bytes is None:
+            return None
+
+        # 미리보기 저장 (호출별 작업 폴더, 최근 4개만 유지)
+        workspace = JobWorkspace('preview', keep=True)
+        self._preview_workspaces.append(workspace)
+        while len(self._preview_workspaces) > 4:
+            self._preview_workspaces.popleft().cleanup()
+
+        preview_path = workspace.file("preview.png")
+        with open(preview_path, 'wb') as f:
+            f.write(image_bytes)
+
+        return preview_path
+
 
 # 싱글톤 인스턴스
 _video_generator = None
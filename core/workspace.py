@@ -0,0 +1,135 @@
+"""
+Supertonic Job Workspace
+작업별 격리 임시 폴더 및 병렬 작업 스케줄러
+"""
+import os
+import atexit
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import TEMP_DIR
+
+
+# 작업 종류별 동시 실행 수 (TTS는 ONNX 세션이 코어를 모두 사용하므로 1개,
+# 정렬/음성 인식은 공유 Whisper 모델이 스레드 안전하지 않으므로 1개 - 병렬화는 내부 프로세스 풀에서)
+DEFAULT_JOB_LIMITS = {
+    'synthesis': 1,
+    'alignment': 1,
+    'video': 2,
+    'preview': 4,
+}
+
+_live_workspaces = set()
+_live_lock = threading.Lock()
+
+
+def get_pool_context():
+    """
+    앱 프로세스에서 여는 프로세스 풀의 시작 방식 (forkserver, 없으면 spawn)
+
+    fork는 부모의 모든 fd를 복제하므로, 다른 작업이 ffmpeg에 넘기려고 열어 둔
+    PCMAudio 파이프 쓰기 쪽이 워커에 남아 ffmpeg가 오디오 끝(EOF)을 받지 못함
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class JobWorkspace:
+    """작업별 격리 임시 폴더 (with 블록 종료 또는 프로세스 종료 시 자동 정리)"""
+
+    def __init__(self, kind: str = 'job', keep: bool = False):
+        self.kind = kind
+        self.keep = keep
+        self.path = tempfile.mkdtemp(prefix=f"{kind}_", dir=TEMP_DIR)
+        self.job_id = os.path.basename(self.path)
+
+        with _live_lock:
+            _live_workspaces.add(self)
+
+    def file(self, name: str) -> str:
+        """작업 폴더 내 파일 경로 반환"""
+        return os.path.join(self.path, name)
+
+    def cleanup(self):
+        """작업 폴더 삭제"""
+        shutil.rmtree(self.path, ignore_errors=True)
+        with _live_lock:
+            _live_workspaces.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.keep:
+            self.cleanup()
+        return False
+
+    def __repr__(self):
+        return f"JobWorkspace({self.job_id!r})"
+
+
+@atexit.register
+def _cleanup_all_workspaces():
+    """프로세스 종료 시 남은 작업 폴더 정리 (keep=True 포함)"""
+    with _live_lock:
+        workspaces = list(_live_workspaces)
+    for workspace in workspaces:
+        workspace.cleanup()
+
+
+class JobScheduler:
+    """
+    작업 종류별 동시 실행 수를 제한하는 병렬 작업 스케줄러
+
+    종류마다 제한 수만큼의 스레드 풀을 따로 두므로 한 종류의 작업이 많이 쌓여도
+    다른 종류의 작업은 기다리지 않음
+    """
+
+    def __init__(self, limits: dict = None):
+        self.limits = dict(DEFAULT_JOB_LIMITS)
+        if limits:
+            self.limits.update(limits)
+
+        self._executors = {}
+        self._executors_lock = threading.Lock()
+
+    def _executor(self, kind: str) -> ThreadPoolExecutor:
+        """종류별 스레드 풀 (제한이 정해지지 않은 종류는 1개씩)"""
+        with self._executors_lock:
+            executor = self._executors.get(kind)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=self.limits.get(kind, 1),
+                                              thread_name_prefix=f'job-{kind}')
+                self._executors[kind] = executor
+            return executor
+
+    def submit(self, kind: str, fn, *args, **kwargs):
+        """
+        작업 제출 - fn(workspace, *args, **kwargs) 형태로 호출
+
+        각 작업은 전용 JobWorkspace를 받으며, 작업 종료 시 폴더가 정리됨
+        """
+        def run():
+            with JobWorkspace(kind) as workspace:
+                return fn(workspace, *args, **kwargs)
+
+        return self._executor(kind).submit(run)
+
+    def shutdown(self, wait: bool = True):
+        with self._executors_lock:
+            executors = list(self._executors.values())
+        for executor in executors:
+            executor.shutdown(wait=wait)
+
+
+# 싱글톤 인스턴스
+_job_scheduler = None
+
+def get_job_scheduler() -> JobScheduler:
+    global _job_scheduler
+    if _job_scheduler is None:
+        _job_scheduler = JobScheduler()
+    return _job_scheduler
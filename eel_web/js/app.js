@@ -2412,9 +2412,36 @@ async function exportVrewProject() {
                 subtitleTimecodes = whisperResult.timecodes;
             }
         } else if (hasGeneratedAudio) {
-            // TTS 생성된 파일이 있으면 병합 시도
+            // 모든 문장의 음성 파일이 남아 있으면 문장별 WAV로 병렬 분석 (바뀐 문장만 다시 정렬)
+            const clipFiles = await eel.filter_existing_files(validFiles)();
+            let clipTimecodes = null;
+            if (clipFiles.length === voiceSentences.length) {
+                updateProgress(0, '문장별 Whisper 분석 중...');
+                const clipResult = await eel.generate_clip_subtitle_timecodes(
+                    clipFiles,
+                    subtitleSentences,
+                    voiceSentences.map(clip => clip.text),
+                    elements.language.value
+                )();
+                if (clipResult.success && clipResult.timecodes.length === subtitleSentences.length) {
+                    clipTimecodes = clipResult.timecodes;
+                }
+            }
+
+            // TTS 생성된 파일이 있으면 병합 시도 (다음 내보내기의 문장별 재정렬을 위해 문장별 파일 유지)
             updateProgress(0, '음성 파일 병합 중...');
-            const mergeResult = await eel.export_merged_audio(validFiles, wavFileName, wavFolder)();
+            const mergeResult = await eel.export_merged_audio(clipFiles, wavFileName, wavFolder, false)();
+
+            // 문장별 파일은 출력 폴더 대신 앱 종료 시 지워지는 임시 폴더로 옮겨 보관
+            if (mergeResult.success && clipFiles.length > 0) {
+                const movedFiles = await eel.stash_clip_files(clipFiles)();
+                const movedByPath = new Map(clipFiles.map((path, i) => [path, movedFiles[i]]));
+                voiceSentences.forEach(clip => {
+                    if (movedByPath.has(audioFiles[clip.id])) {
+                        audioFiles[clip.id] = movedByPath.get(audioFiles[clip.id]);
+                    }
+                });
+            }
 
             if (!mergeResult.success) {
                 // 병합 실패 시 (파일이 삭제된 경우) 기존 병합 WAV 확인
@@ -2428,19 +2455,23 @@ async function exportVrewProject() {
                 audioFilePath = mergeResult.filepath;
             }
 
-            updateProgress(30, 'Whisper 분석 중...');
+            if (clipTimecodes) {
+                subtitleTimecodes = clipTimecodes;
+            } else {
+                updateProgress(30, 'Whisper 분석 중...');
+
+                // Whisper 분석으로 타임코드 생성
+                const whisperResult = await eel.generate_subtitle_timecodes(
+                    audioFilePath,
+                    subtitleSentences
+                )();
 
-            // Whisper 분석으로 타임코드 생성
-            const whisperResult = await eel.generate_subtitle_timecodes(
-                audioFilePath,
-                subtitleSentences
-            )();
+                if (!whisperResult.success) {
+                    throw new Error(whisperResult.message);
+                }
 
-            if (!whisperResult.success) {
-                throw new Error(whisperResult.message);
+                subtitleTimecodes = whisperResult.timecodes;
             }
-
-            subtitleTimecodes = whisperResult.timecodes;
         } else if (hasExistingMergedWav) {
             // 기존 병합 WAV 파일만 있는 경우
             updateProgress(10, '기존 WAV 파일 사용...');
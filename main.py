@@ -33,6 +33,34 @@ from core.tts import get_tts_engine
 eel.init(os.path.join(BASE_DIR, 'eel_web'))
 
 
+def run_job(kind, fn, *args):
+    """
+    작업 스케줄러(종류별 동시 실행 수 제한)의 작업 스레드에서 fn(workspace, progress, *args) 실행
+
+    Eel 노출 함수는 gevent 그린렛에서 실행되므로 결과를 기다리는 동안 eel.sleep으로 양보해
+    다른 호출과 UI 이벤트가 계속 처리되게 함. progress(pct, msg)는 작업 스레드에서 불러도 되며
+    이 그린렛에서 eel.updateProgress로 전달됨 (Eel 호출은 작업 스레드에서 하면 안 됨)
+    """
+    import queue
+    from core.workspace import get_job_scheduler
+
+    updates = queue.Queue()
+
+    def progress(pct, msg):
+        updates.put((pct, msg))
+
+    def flush():
+        while not updates.empty():
+            eel.updateProgress(*updates.get())()
+
+    future = get_job_scheduler().submit(kind, fn, progress, *args)
+    while not future.done():
+        flush()
+        eel.sleep(0.05)
+    flush()
+    return future.result()
+
+
 # ========== Eel Exposed Functions ==========
 
 @eel.expose
@@ -175,103 +203,86 @@ def select_video_file():
 @eel.expose
 def transcribe_video(video_path, language='ko'):
     """동영상/오디오 파일에서 음성을 텍스트로 변환 (Whisper 사용)"""
+    return run_job('alignment', _transcribe_video_job, video_path, language)
+
+
+def _transcribe_video_job(workspace, progress, video_path, language):
+    """음성→텍스트 변환 작업 (작업 스레드에서 실행)"""
     from core.subtitle import get_subtitle_generator
-    from core.utils import TEMP_DIR
+    from core.utils import hash_file
 
     try:
         if not video_path or not os.path.exists(video_path):
             return {"success": False, "message": "파일을 찾을 수 없습니다."}
 
         print(f"음성→텍스트 변환 시작: {video_path}")
-        eel.updateProgress(10, "파일 분석 중...")()
-
-        ext = os.path.splitext(video_path)[1].lower()
-        audio_path = video_path
-
-        # 동영상인 경우 오디오 추출
-        video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
-        if ext in video_extensions:
-            eel.updateProgress(20, "동영상에서 오디오 추출 중...")()
-            print("동영상 파일 감지, 오디오 추출 중...")
-
-            temp_audio_path = os.path.join(TEMP_DIR, "temp_video_audio.wav")
-            os.makedirs(TEMP_DIR, exist_ok=True)
-
-            # ffmpeg로 오디오 추출 (16kHz mono WAV)
-            import subprocess
-            result = subprocess.run([
-                'ffmpeg', '-y', '-i', video_path,
-                '-vn',  # 비디오 제외
-                '-ar', '16000',  # 샘플레이트 16kHz
-                '-ac', '1',  # 모노
-                '-c:a', 'pcm_s16le',  # WAV 포맷
-                temp_audio_path
-            ], capture_output=True, text=True)
-
-            if result.returncode != 0:
-                print(f"ffmpeg 오류: {result.stderr}")
-                return {"success": False, "message": f"오디오 추출 실패: {result.stderr[:200]}"}
-
-            audio_path = temp_audio_path
-            print(f"오디오 추출 완료: {temp_audio_path}")
-
-        # MP3인 경우 WAV로 변환
-        elif ext == '.mp3':
-            eel.updateProgress(20, "MP3를 WAV로 변환 중...")()
-            print("MP3 파일 감지, WAV로 변환 중...")
+        progress(10, "파일 분석 중...")
 
-            temp_audio_path = os.path.join(TEMP_DIR, "temp_mp3_audio.wav")
-            os.makedirs(TEMP_DIR, exist_ok=True)
+        # 같은 파일을 다시 변환하면 캐시된 결과 사용 (오디오 추출 생략)
+        generator = get_subtitle_generator()
+        media_hash = hash_file(video_path)
+        sentences = generator.get_cached_sentences(media_hash, language)
 
-            import subprocess
-            result = subprocess.run([
-                'ffmpeg', '-y', '-i', video_path,
-                '-ar', '16000', '-ac', '1',
-                temp_audio_path
-            ], capture_output=True, text=True)
+        if sentences is None:
+            ext = os.path.splitext(video_path)[1].lower()
+            audio_path = video_path
 
-            if result.returncode != 0:
-                return {"success": False, "message": f"MP3 변환 실패: {result.stderr[:200]}"}
+            # 동영상인 경우 오디오 추출
+            video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
+            if ext in video_extensions:
+                progress(20, "동영상에서 오디오 추출 중...")
+                print("동영상 파일 감지, 오디오 추출 중...")
 
-            audio_path = temp_audio_path
+                temp_audio_path = workspace.file("video_audio.wav")
 
-        eel.updateProgress(30, "Whisper 모델 로드 중...")()
+                # ffmpeg로 오디오 추출 (16kHz mono WAV)
+                import subprocess
+                result = subprocess.run([
+                    'ffmpeg', '-y', '-i', video_path,
+                    '-vn',  # 비디오 제외
+                    '-ar', '16000',  # 샘플레이트 16kHz
+                    '-ac', '1',  # 모노
+                    '-c:a', 'pcm_s16le',  # WAV 포맷
+                    temp_audio_path
+                ], capture_output=True, text=True)
 
-        # Whisper로 텍스트 변환
-        generator = get_subtitle_generator()
-        generator.init_model()
+                if result.returncode != 0:
+                    print(f"ffmpeg 오류: {result.stderr}")
+                    return {"success": False, "message": f"오디오 추출 실패: {result.stderr[:200]}"}
 
-        eel.updateProgress(50, "음성 인식 중... (시간이 걸릴 수 있습니다)")()
+                audio_path = temp_audio_path
+                print(f"오디오 추출 완료: {temp_audio_path}")
 
-        # stable_whisper의 transcribe 사용
-        lang_map = {'ko': 'ko', 'en': 'en', 'es': 'es', 'pt': 'pt', 'fr': 'fr'}
-        whisper_lang = lang_map.get(language, 'ko')
+            # MP3인 경우 WAV로 변환
+            elif ext == '.mp3':
+                progress(20, "MP3를 WAV로 변환 중...")
+                print("MP3 파일 감지, WAV로 변환 중...")
 
-        result = generator.stable_model.transcribe(
-            audio_path,
-            language=whisper_lang,
-            word_timestamps=True,
-            vad=True
-        )
+                temp_audio_path = workspace.file("mp3_audio.wav")
+
+                import subprocess
+                result = subprocess.run([
+                    'ffmpeg', '-y', '-i', video_path,
+                    '-ar', '16000', '-ac', '1',
+                    temp_audio_path
+                ], capture_output=True, text=True)
 
-        eel.updateProgress(80, "텍스트 추출 중...")()
+                if result.returncode != 0:
+                    return {"success": False, "message": f"MP3 변환 실패: {result.stderr[:200]}"}
 
-        # 결과에서 텍스트 추출
-        sentences = []
-        for segment in result.segments:
-            text = segment.text.strip() if hasattr(segment, 'text') else ''
-            if text:
-                sentences.append(text)
+                audio_path = temp_audio_path
 
-        # 임시 파일 정리
-        if audio_path != video_path:
-            try:
-                if os.path.exists(audio_path):
-                    os.remove(audio_path)
-            except:
-                pass
+            progress(30, "Whisper 모델 로드 중...")
 
-        eel.updateProgress(90, "텍스트 파일 저장 중...")()
+            # Whisper로 텍스트 변환
+            generator.init_model()
+
+            progress(50, "음성 인식 중... (시간이 걸릴 수 있습니다)")
+
+            # stable_whisper의 transcribe 사용 (세그먼트별 문장 추출)
+            sentences = generator.transcribe_sentences(audio_path, language, audio_hash=media_hash)
+
+        progress(90, "텍스트 파일 저장 중...")
 
         if not sentences:
             return {"success": False, "message": "음성을 인식하지 못했습니다."}
@@ -290,7 +301,7 @@ def transcribe_video(video_path, language='ko'):
             print(f"대본 파일 저장 실패: {save_err}")
             txt_path = None
 
-        eel.updateProgress(100, "변환 완료!")()
+        progress(100, "변환 완료!")
 
         print(f"음성→텍스트 변환 완료: {len(sentences)}개 문장")
 
@@ -399,7 +410,7 @@ def synthesize_sentence(text, language, voice_name, speed, quality, output_name,
     """단일 문장 음성 합성 (진행률 콜백 없음)"""
     try:
         engine = get_tts_engine()
-        filepath, message = engine.synthesize(
+        filepath, message = run_job('synthesis', lambda workspace, progress: engine.synthesize(
             text=text,
             language=language,
             voice_name=voice_name,
@@ -408,7 +419,7 @@ def synthesize_sentence(text, language, voice_name, speed, quality, output_name,
             output_name=output_name,
             output_dir=output_dir,
             progress_callback=None
-        )
+        ))
 
         if filepath:
             # 오디오 파일 길이 계산
@@ -433,6 +444,7 @@ def export_merged_audio(file_paths, output_name, output_dir=None, delete_temp_fi
     """여러 WAV 파일을 하나로 병합"""
     import numpy as np
     import soundfile as sf
+    from core.subtitle import mergeable_clips, CLIP_GAP_SEC
 
     try:
         if not file_paths:
@@ -442,23 +454,19 @@ def export_merged_audio(file_paths, output_name, output_dir=None, delete_temp_fi
         sample_rate = None
         valid_files = []  # 병합에 사용된 파일 목록
 
-        for filepath in file_paths:
-            if not filepath or not os.path.exists(filepath):
-                continue
-
-            data, sr = sf.read(filepath)
-            if sample_rate is None:
-                sample_rate = sr
-            elif sr != sample_rate:
-                # 샘플레이트가 다르면 리샘플링 필요 (여기서는 스킵)
-                print(f"샘플레이트 불일치: {sr} != {sample_rate}")
+        # 없는 파일/샘플레이트가 다른 파일은 스킵 (문장별 정렬 오프셋과 같은 규칙)
+        for filepath, ok in zip(file_paths, mergeable_clips(file_paths)):
+            if not ok:
+                if filepath and os.path.exists(filepath):
+                    print(f"샘플레이트 불일치로 제외: {filepath}")
                 continue
 
+            data, sample_rate = sf.read(filepath)
             all_audio.append(data)
             valid_files.append(filepath)
 
             # 문장 사이 짧은 묵음 추가 (0.3초)
-            silence = np.zeros(int(0.3 * sample_rate), dtype=data.dtype)
+            silence = np.zeros(int(CLIP_GAP_SEC * sample_rate), dtype=data.dtype)
             all_audio.append(silence)
 
         if not all_audio:
@@ -503,6 +511,50 @@ def export_merged_audio(file_paths, output_name, output_dir=None, delete_temp_fi
         return {"success": False, "message": str(e)}
 
 
+@eel.expose
+def filter_existing_files(file_paths):
+    """존재하는 파일 경로만 순서대로 반환"""
+    return [p for p in (file_paths or []) if p and os.path.exists(p)]
+
+
+# 문장별 WAV 보관 폴더 (앱 실행 동안 유지, 종료 시 자동 삭제)
+_clip_workspace = None
+
+
+@eel.expose
+def stash_clip_files(file_paths):
+    """
+    문장별 WAV를 앱 실행 동안만 유지되는 작업 폴더로 이동 → 이동된 경로 목록 (같은 순서)
+
+    다음 내보내기의 문장별 재정렬에는 계속 쓸 수 있고, 출력 폴더에는 쌓이지 않음.
+    이동하지 못한 파일은 원래 경로 그대로 반환
+    """
+    import shutil
+    from core.workspace import JobWorkspace
+
+    global _clip_workspace
+    if _clip_workspace is None:
+        _clip_workspace = JobWorkspace('clips', keep=True)
+
+    moved = []
+    for path in file_paths or []:
+        if not path or not os.path.exists(path):
+            moved.append(path)
+            continue
+        if os.path.dirname(os.path.abspath(path)) == os.path.abspath(_clip_workspace.path):
+            # 이미 보관 폴더에 있는 파일
+            moved.append(path)
+            continue
+        target = _clip_workspace.file(f"{len(os.listdir(_clip_workspace.path)):05d}_{os.path.basename(path)}")
+        try:
+            shutil.move(path, target)
+            moved.append(target.replace("\\", "/"))
+        except OSError as e:
+            print(f"문장별 파일 이동 실패: {path} - {e}")
+            moved.append(path)
+    return moved
+
+
 @eel.expose
 def check_merged_wav_exists(file_name, wav_folder):
     """병합된 WAV 파일이 이미 존재하는지 확인"""
@@ -586,10 +638,20 @@ def open_file(file_path):
 
 
 @eel.expose
-def analyze_external_audio(audio_path, subtitle_lines, language='ko'):
-    """외부 오디오 파일(WAV/MP3) 분석하여 Forced Alignment 자막 타임코드 생성"""
+def analyze_external_audio(audio_path, subtitle_lines, language='ko', method='stable_ts'):
+    """
+    외부 오디오 파일(WAV/MP3) 분석하여 Forced Alignment 자막 타임코드 생성
+
+    method: 'stable_ts' (Whisper) 또는 'dtw' (로컬 TTS 참조 음성 DTW, CPU에서 수 초)
+    """
+    return run_job('alignment', _analyze_external_audio_job,
+                   audio_path, subtitle_lines, language, method)
+
+
+def _analyze_external_audio_job(workspace, progress, audio_path, subtitle_lines, language, method):
+    """외부 오디오 Forced Alignment 작업 (작업 스레드에서 실행)"""
     from core.subtitle import get_subtitle_generator
-    from core.utils import TEMP_DIR
+    from core.utils import hash_file
 
     try:
         if not audio_path or not os.path.exists(audio_path):
@@ -611,14 +673,14 @@ def analyze_external_audio(audio_path, subtitle_lines, language='ko'):
             try:
                 from pydub import AudioSegment
                 audio = AudioSegment.from_mp3(audio_path)
-                temp_wav_path = os.path.join(TEMP_DIR, "temp_external_audio.wav")
+                temp_wav_path = workspace.file("external_audio.wav")
                 audio.export(temp_wav_path, format="wav")
                 analysis_path = temp_wav_path
                 print(f"WAV 변환 완료: {temp_wav_path}")
             except ImportError:
                 # pydub 없으면 ffmpeg 직접 사용
                 print("pydub 없음, ffmpeg 직접 사용...")
-                temp_wav_path = os.path.join(TEMP_DIR, "temp_external_audio.wav")
+                temp_wav_path = workspace.file("external_audio.wav")
                 import subprocess
                 subprocess.run([
                     'ffmpeg', '-y', '-i', audio_path,
@@ -636,8 +698,10 @@ def analyze_external_audio(audio_path, subtitle_lines, language='ko'):
         generator = get_subtitle_generator()
         subtitle_text = '\n'.join(subtitle_lines)
 
+        # 원본 파일 해시로 캐싱 (MP3 변환본이 아닌 원본 기준)
         timings = generator.generate_timings_from_file(
-            analysis_path, subtitle_text, language
+            analysis_path, subtitle_text, language,
+            audio_hash=hash_file(audio_path), method=method
         )
         print(f"Forced Alignment 완료, 타임코드 수: {len(timings)}")
 
@@ -649,15 +713,6 @@ def analyze_external_audio(audio_path, subtitle_lines, language='ko'):
                 'end': seconds_to_srt_time(timing['end'])
             })
 
-        # 임시 WAV 파일 정리
-        if ext == '.mp3':
-            try:
-                temp_wav_path = os.path.join(TEMP_DIR, "temp_external_audio.wav")
-                if os.path.exists(temp_wav_path):
-                    os.remove(temp_wav_path)
-            except:
-                pass
-
         return {
             "success": True,
             "timecodes": srt_timecodes,
@@ -687,7 +742,63 @@ def generate_subtitle_timecodes(audio_path, subtitle_lines):
         generator = get_subtitle_generator()
         subtitle_text = '\n'.join(subtitle_lines)
 
-        timings = generator.generate_timings_from_file(audio_path, subtitle_text, 'ko')
+        timings = run_job('alignment', lambda workspace, progress: generator.generate_timings_from_file(
+            audio_path, subtitle_text, 'ko'
+        ))
+
+        # SRT 형식 타임코드로 변환
+        srt_timecodes = []
+        for timing in timings:
+            srt_timecodes.append({
+                'start': seconds_to_srt_time(timing['start']),
+                'end': seconds_to_srt_time(timing['end'])
+            })
+
+        return {
+            "success": True,
+            "timecodes": srt_timecodes,
+            "message": f"{len(srt_timecodes)}개 자막 타임코드 생성 완료"
+        }
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"success": False, "message": str(e)}
+
+
+@eel.expose
+def generate_clip_subtitle_timecodes(clip_paths, subtitle_lines, clip_texts=None, language='ko'):
+    """
+    문장별 WAV로 병렬 Forced Alignment 자막 타임코드 생성
+
+    subtitle_lines가 클립별 목록(list of list)이면 그대로 사용하고,
+    평면 목록이면 clip_texts(음성 문장)를 기준으로 클립별로 분배
+    """
+    from core.subtitle import get_subtitle_generator
+
+    try:
+        if not clip_paths or not all(p and os.path.exists(p) for p in clip_paths):
+            return {"success": False, "message": "문장별 오디오 파일을 찾을 수 없습니다."}
+
+        if not subtitle_lines:
+            return {"success": False, "message": "자막 텍스트가 없습니다."}
+
+        generator = get_subtitle_generator()
+
+        if isinstance(subtitle_lines[0], list):
+            clip_lines = subtitle_lines
+        elif clip_texts and len(clip_texts) == len(clip_paths):
+            clip_lines = generator.partition_lines_to_clips(subtitle_lines, clip_texts)
+        else:
+            return {"success": False, "message": "클립별 자막을 나눌 수 없습니다."}
+
+        if len(clip_lines) != len(clip_paths):
+            return {"success": False, "message": "클립 수와 자막 목록 수가 다릅니다."}
+
+        clip_lines = [[line.strip() for line in lines if line.strip()] for lines in clip_lines]
+        timings = run_job('alignment', lambda workspace, progress: generator.align_clips(
+            clip_paths, clip_lines, language
+        ))
 
         # SRT 형식 타임코드로 변환
         srt_timecodes = []
@@ -1157,4 +1268,7 @@ def main():
 
 
 if __name__ == '__main__':
+    # PyInstaller EXE에서 정렬 워커 프로세스 실행 지원
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()